@@ -8,51 +8,55 @@ import Plot from "react-plotly.js";
 
 import { get } from "../utils/api";
 
-export const ChampionshipProgression = () => {
+// One season of `/dashboard/championship_progression?shape=matrix`:
+// points[i][j] is the total of driver driver_ids[i] (named drivers[i])
+// after rounds[j]; names are not unique, ids are
+export interface ProgressionMatrix {
+  season: number;
+  rounds: number[];
+  race_names: string[];
+  driver_ids: number[];
+  drivers: string[];
+  points: (number | null)[][];
+}
+
+// `initialData` (the latest season, from the dashboard bundle) is shown
+// until another season is picked
+export const ChampionshipProgression = ({
+  initialData,
+}: {
+  initialData: ProgressionMatrix | null;
+}) => {
   const theme = useTheme();
   const [season, setSeason] = useState<number | null>(null);
-  const [data, setData] = useState<Record<string, unknown>[] | null>(null);
+  const [fetched, setFetched] = useState<ProgressionMatrix | null>(null);
+  const data = season === null ? initialData : fetched;
 
   useEffect(() => {
-    setData(null);
-    get(
-      "/dashboard/championship_progression",
-      season ? { season } : undefined,
-    ).then(setData);
+    if (season === null) return;
+    setFetched(null);
+    get("/dashboard/championship_progression", {
+      shape: "matrix",
+      season,
+    }).then((matrices: ProgressionMatrix[]) => setFetched(matrices[0] ?? null));
   }, [season]);
 
-  if (!data || data.length === 0) return null;
-
-  const drivers = [...new Set(data.map((d) => d.driver_name as string))];
-  const rounds = [...new Set(data.map((d) => d.round as number))].sort(
-    (a, b) => a - b,
-  );
-  const currentSeason = season ?? (data[0].season as number);
-
-  // Find top 10 drivers by final round points
-  const finalRound = rounds[rounds.length - 1];
-  const finalStandings = data
-    .filter((d) => d.round === finalRound)
-    .sort((a, b) => (b.points as number) - (a.points as number))
-    .slice(0, 10)
-    .map((d) => d.driver_name as string);
+  if (!data) return null;
 
-  const topDrivers = drivers.filter((name) => finalStandings.includes(name));
+  const currentSeason = season ?? data.season;
 
   const fontColor = theme.palette.mode === "dark" ? "#fff" : "#333";
 
-  const traces = topDrivers.map((driver) => {
-    const driverData = data
-      .filter((d) => d.driver_name === driver)
-      .sort((a, b) => (a.round as number) - (b.round as number));
-    return {
-      x: driverData.map((d) => d.round),
-      y: driverData.map((d) => d.points),
-      name: driver,
-      type: "scatter" as const,
-      mode: "lines+markers" as const,
-    };
-  });
+  // Drivers come ordered by final points; plot the top 10
+  const traces = data.drivers.slice(0, 10).map((driver, i) => ({
+    x: data.rounds,
+    y: data.points[i],
+    text: data.race_names,
+    name: driver,
+    uid: String(data.driver_ids[i]),
+    type: "scatter" as const,
+    mode: "lines+markers" as const,
+  }));
 
   const seasons = Array.from(
     { length: currentSeason - 1950 + 1 },
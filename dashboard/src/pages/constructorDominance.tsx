@@ -1,18 +1,15 @@
-import React, { useState, useEffect } from "react";
+import React from "react";
 import Box from "@mui/material/Box";
 import Typography from "@mui/material/Typography";
 import { useTheme } from "@mui/material/styles";
 import Plot from "react-plotly.js";
 
-import { get } from "../utils/api";
-
-export const ConstructorDominance = () => {
+export const ConstructorDominance = ({
+  data,
+}: {
+  data: Record<string, unknown>[] | null;
+}) => {
   const theme = useTheme();
-  const [data, setData] = useState<Record<string, unknown>[] | null>(null);
-
-  useEffect(() => {
-    get("/dashboard/constructor_wins_by_era").then(setData);
-  }, []);
 
   if (!data || data.length === 0) return null;
 
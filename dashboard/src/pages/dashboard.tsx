@@ -8,15 +8,22 @@ import Plot from "react-plotly.js";
 import { Title, useList, ListContextProvider, DataTable } from "react-admin";
 
 import { get } from "../utils/api";
-import { ChampionshipProgression } from "./championshipProgression";
+import {
+  ChampionshipProgression,
+  ProgressionMatrix,
+} from "./championshipProgression";
 import { ConstructorDominance } from "./constructorDominance";
 
-const TopDriversByWins = () => {
-  const [data, setData] = useState(null);
-  useEffect(() => {
-    get("/dashboard/top_drivers_by_wins", { range: "[0, 9]" }).then(setData);
-  }, []);
-  const listContext = useList({ data });
+type Rows = Record<string, unknown>[];
+
+// `/dashboard/bundle` response; failed widgets carry `error`, not `data`
+// (per-widget timings are in the Server-Timing header)
+interface DashboardBundle {
+  widgets: Record<string, { data?: unknown; error?: string; status?: number }>;
+}
+
+const TopDriversByWins = ({ data }: { data: Rows | null }) => {
+  const listContext = useList({ data: data ?? undefined });
   if (data) {
     return (
       <ListContextProvider value={listContext}>
@@ -50,33 +57,48 @@ const BasicChart = () => {
   );
 };
 
-export const Dashboard = () => (
-  <Card sx={{ m: 2, p: 2 }}>
-    <Title title="F1 Dashboard" />
-    <Box sx={{ flexGrow: 1 }}>
-      <Grid container spacing={2}>
-        <Grid size={6}>
-          <Typography variant="h4" gutterBottom sx={{ textAlign: "left" }}>
-            Top Drivers by Wins
-          </Typography>
-          <TopDriversByWins />
-        </Grid>
-        <Grid size={6}>
-          <BasicChart />
-        </Grid>
-        <Grid size={12} sx={{ my: 2 }}>
-          <Divider />
-        </Grid>
-        <Grid size={12}>
-          <ChampionshipProgression />
-        </Grid>
-        <Grid size={12} sx={{ my: 2 }}>
-          <Divider />
-        </Grid>
-        <Grid size={12}>
-          <ConstructorDominance />
+export const Dashboard = () => {
+  const [bundle, setBundle] = useState<DashboardBundle | null>(null);
+  useEffect(() => {
+    get("/dashboard/bundle", { range: "[0, 9]", shape: "matrix" }).then(
+      setBundle,
+    );
+  }, []);
+
+  const widget = <T,>(name: string) =>
+    (bundle?.widgets[name]?.data as T | undefined) ?? null;
+  const topDrivers = widget<Rows>("top_drivers_by_wins");
+  const progression = widget<ProgressionMatrix[]>("championship_progression");
+  const constructorWins = widget<Rows>("constructor_wins_by_era");
+
+  return (
+    <Card sx={{ m: 2, p: 2 }}>
+      <Title title="F1 Dashboard" />
+      <Box sx={{ flexGrow: 1 }}>
+        <Grid container spacing={2}>
+          <Grid size={6}>
+            <Typography variant="h4" gutterBottom sx={{ textAlign: "left" }}>
+              Top Drivers by Wins
+            </Typography>
+            <TopDriversByWins data={topDrivers} />
+          </Grid>
+          <Grid size={6}>
+            <BasicChart />
+          </Grid>
+          <Grid size={12} sx={{ my: 2 }}>
+            <Divider />
+          </Grid>
+          <Grid size={12}>
+            <ChampionshipProgression initialData={progression?.[0] ?? null} />
+          </Grid>
+          <Grid size={12} sx={{ my: 2 }}>
+            <Divider />
+          </Grid>
+          <Grid size={12}>
+            <ConstructorDominance data={constructorWins} />
+          </Grid>
         </Grid>
-      </Grid>
-    </Box>
-  </Card>
-);
+      </Box>
+    </Card>
+  );
+};
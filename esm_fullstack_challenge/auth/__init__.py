@@ -1,8 +1,10 @@
 # flake8: noqa
 from esm_fullstack_challenge.auth.service import (
     authenticate_user, create_access_token, get_current_user, require_admin,
-    hash_password, verify_password, get_user_by_username, get_user_by_id,
+    get_user_by_username, get_user_by_id,
+    auth_cache, invalidate_cached_users,
 )
+from esm_fullstack_challenge.auth.hashing import HashingBusy, PasswordHasher, password_hasher
 from esm_fullstack_challenge.auth.schemas import (
     Token, LoginRequest, UserResponse, CreateUserRequest,
     UpdateUserRequest, UpdateProfileRequest, ChangePasswordRequest,
@@ -0,0 +1,149 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+import bcrypt
+
+from esm_fullstack_challenge.config import (
+    BCRYPT_MAX_QUEUE, BCRYPT_QUEUE_TIMEOUT, BCRYPT_ROUNDS, BCRYPT_WORKERS,
+)
+from esm_fullstack_challenge.timing import timed
+
+T = TypeVar("T")
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing pool is saturated."""
+
+
+def get_rounds(hashed_password: str) -> int | None:
+    """Returns the cost factor of a bcrypt hash (`$2b$<rounds>$...`)."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+
+class _Job:
+    """Start/abandon state of one queued hashing job, guarded by the hasher's lock."""
+    __slots__ = ("started", "abandoned")
+
+    def __init__(self):
+        self.started = False
+        self.abandoned = False
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, bounded thread pool with admission control.
+
+    bcrypt releases the GIL, so threads hash in parallel without taking
+    slots from the anyio threadpool or the DB executor. At most
+    `max_workers` hashes run at once and `max_queue` wait; beyond that,
+    or when a caller has waited longer than `queue_timeout` seconds for
+    a worker, `HashingBusy` is raised (served as 503 with Retry-After).
+    """
+    def __init__(
+        self,
+        max_workers: int = BCRYPT_WORKERS,
+        max_queue: int = BCRYPT_MAX_QUEUE,
+        queue_timeout: float = BCRYPT_QUEUE_TIMEOUT,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.rounds = rounds
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _run(self, job: "_Job", func: Callable[..., T], *args) -> T:
+        try:
+            with self._lock:
+                if job.abandoned:
+                    raise HashingBusy(f"Password hashing queue wait exceeded {self.queue_timeout}s")
+                job.started = True
+                self._running += 1
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self.completed += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Runs `func(*args)` in the hashing pool.
+
+        A caller waits at most `queue_timeout` seconds for a worker; a job
+        given up on that way is skipped when a worker reaches it.
+
+        Raises:
+            HashingBusy: If the pool and its queue are full, or the job waited too long.
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise HashingBusy("Too many password hashing requests")
+            self._pending += 1
+        job = _Job()
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        try:
+            future = loop.run_in_executor(self.executor, ctx.run, self._run, job, func, *args)
+        except RuntimeError:  # executor shut down; the job never runs to release its slot
+            with self._lock:
+                self._pending -= 1
+            raise
+        with timed("bcrypt"):
+            try:
+                # Shielded, so a timeout leaves the job queued to release its slot
+                return await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                with self._lock:
+                    if not job.started:
+                        job.abandoned = True
+                        self.timed_out += 1
+                if job.abandoned:
+                    raise HashingBusy(f"Password hashing queue wait exceeded {self.queue_timeout}s")
+            return await future
+
+    def hash_sync(self, password: str) -> str:
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=self.rounds)).decode()
+
+    async def hash(self, password: str) -> str:
+        return await self.run(self.hash_sync, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self.run(bcrypt.checkpw, password.encode(), hashed_password.encode())
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Whether a hash was made with a different cost factor than `rounds`."""
+        return get_rounds(hashed_password) != self.rounds
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "rounds": self.rounds,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+            }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher()
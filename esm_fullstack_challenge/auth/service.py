@@ -1,32 +1,43 @@
+import hashlib
 import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-import bcrypt
 from jose import JWTError, jwt
 
+from esm_fullstack_challenge.auth.hashing import HashingBusy, password_hasher
+from esm_fullstack_challenge.cache import MISSING, TTLCache
 from esm_fullstack_challenge.config import (
-    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, AUTH_CACHE_MAX_BYTES, AUTH_CACHE_TTL,
 )
 from esm_fullstack_challenge.db import DB
 from esm_fullstack_challenge.dependencies import get_db
 from esm_fullstack_challenge.auth.schemas import UserResponse
+from esm_fullstack_challenge.timing import timed
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Verified token (sha256) -> user fields, tagged with the users generation
+auth_cache = TTLCache("auth", max_bytes=AUTH_CACHE_MAX_BYTES, ttl=AUTH_CACHE_TTL)
+_users_generation = 0
+# Invalidations also come from sync endpoints running in the threadpool
+_users_generation_lock = threading.Lock()
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode(), hashed_password.encode(),
-    )
 
+def invalidate_cached_users():
+    """Drops every cached token verification; call after a users change is committed.
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(
-        password.encode(), bcrypt.gensalt(),
-    ).decode()
+    Bumping the generation also discards lookups that were in flight
+    during the change, so they cannot cache the old row.
+    """
+    global _users_generation
+    with _users_generation_lock:
+        _users_generation += 1
+    auth_cache.clear()
 
 
 def get_user_by_username(conn: sqlite3.Connection, username: str) -> Optional[dict]:
@@ -45,12 +56,38 @@ def get_user_by_id(conn: sqlite3.Connection, user_id: int) -> Optional[dict]:
     return dict(row) if row else None
 
 
-def authenticate_user(conn: sqlite3.Connection, username: str, password: str) -> Optional[dict]:
-    user = get_user_by_username(conn, username)
+def update_password_hash(
+        conn: sqlite3.Connection, user_id: int, hashed_password: str, previous_hash: str,
+) -> bool:
+    """Replaces a password hash only if it is still `previous_hash`.
+
+    Returns False (and changes nothing) when the password was changed
+    meanwhile, so an upgrade of the old hash cannot overwrite it.
+    """
+    cursor = conn.execute(
+        "UPDATE users SET hashed_password = ? WHERE id = ? AND hashed_password = ?",
+        (hashed_password, user_id, previous_hash),
+    )
+    return cursor.rowcount == 1
+
+
+async def authenticate_user(db: DB, username: str, password: str) -> Optional[dict]:
+    """Checks a password on the hashing pool, upgrading the stored hash if BCRYPT_ROUNDS changed.
+
+    Raises:
+        HashingBusy: If the hashing pool is saturated.
+    """
+    user = await db.aio.run(get_user_by_username, username)
     if not user:
         return None
-    if not verify_password(password, user["hashed_password"]):
+    if not await password_hasher.verify(password, user["hashed_password"]):
         return None
+    if password_hasher.needs_rehash(user["hashed_password"]):
+        try:
+            hashed_password = await password_hasher.hash(password)
+        except HashingBusy:
+            return user  # upgrade on a later login
+        await db.aio.run(update_password_hash, user["id"], hashed_password, user["hashed_password"])
     return user
 
 
@@ -63,10 +100,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: DB = Depends(get_db),
 ) -> UserResponse:
+    with timed("auth"):
+        return await _get_user_for_token(token, db)
+
+
+async def _get_user_for_token(token: str, db: DB) -> UserResponse:
+    key = hashlib.sha256(token.encode()).digest()
+    generation = _users_generation
+    cached = auth_cache.get(key, tag=generation)
+    if cached is not MISSING:
+        return UserResponse(**cached)
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -80,12 +128,11 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    with db.get_connection() as conn:
-        user = get_user_by_username(conn, username)
+    user = await db.aio.run(get_user_by_username, username)
     if user is None:
         raise credentials_exception
 
-    return UserResponse(
+    current_user = UserResponse(
         id=user["id"],
         username=user["username"],
         full_name=user["full_name"],
@@ -94,6 +141,11 @@ def get_current_user(
         must_change_password=bool(user["must_change_password"]),
         is_active=bool(user["is_active"]),
     )
+    ttl = AUTH_CACHE_TTL
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    auth_cache.set(key, current_user.model_dump(), tag=generation, ttl=ttl)
+    return current_user
 
 
 def require_admin(
@@ -0,0 +1,163 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Iterable, Tuple
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from esm_fullstack_challenge.timing import timed
+
+# The app's bulkheads by name (see `register_bulkheads`), for /stats/bulkheads and /metrics
+BULKHEADS: Dict[str, 'Bulkhead'] = {}
+
+
+class BulkheadFull(Exception):
+    """Raised when a request cannot be admitted before its class's queue deadline."""
+
+
+class Bulkhead:
+    """Concurrency limit with a bounded, deadline-aware FIFO queue.
+
+    At most `limit` requests run at once and `max_queue` wait. A request
+    is shed up front when the queue is full or when the expected wait
+    (queue position x average service time / limit) exceeds
+    `queue_timeout`, and while waiting if the deadline passes. Used from
+    the event loop only.
+    """
+    def __init__(self, name: str, limit: int, max_queue: int, queue_timeout: float):
+        if limit < 1:
+            raise ValueError(f'Invalid bulkhead limit: {limit}')
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._service_time = 0.0  # moving average, seconds
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+
+    def expected_wait(self) -> float:
+        """Estimated seconds a request joining the queue now waits for a slot."""
+        return (len(self._waiters) + 1) * self._service_time / self.limit
+
+    async def acquire(self):
+        """Takes a slot, waiting in line if none is free.
+
+        Raises:
+            BulkheadFull: If the queue is full, the expected wait exceeds
+                          `queue_timeout`, or the wait actually does.
+        """
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            self.admitted += 1
+            return
+        if len(self._waiters) >= self.max_queue or self.expected_wait() > self.queue_timeout:
+            self.shed += 1
+            raise BulkheadFull(f'{self.name} requests are over capacity')
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._abandon(waiter)
+            self.timed_out += 1
+            raise BulkheadFull(f'{self.name} requests waited over {self.queue_timeout}s')
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+        self.admitted += 1
+
+    def _abandon(self, waiter: asyncio.Future):
+        if waiter.done():
+            self.release()  # the slot was handed over just as we gave up
+        else:
+            waiter.cancel()
+            self._waiters.remove(waiter)
+
+    def release(self, service_time: float | None = None):
+        """Frees a slot, handing it straight to the next waiter if any."""
+        if service_time is not None:
+            self._service_time += 0.2 * (service_time - self._service_time)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> Dict[str, int | float]:
+        return {
+            'limit': self.limit,
+            'max_queue': self.max_queue,
+            'queue_timeout': self.queue_timeout,
+            'active': self._active,
+            'queued': len(self._waiters),
+            'avg_service_ms': round(self._service_time * 1000, 3),
+            'admitted': self.admitted,
+            'shed': self.shed,
+            'timed_out': self.timed_out,
+        }
+
+
+def register_bulkheads(limits: Dict[str, Tuple[int, int, float]]) -> Dict[str, Bulkhead]:
+    """Builds one bulkhead per route class from `(limit, max_queue, queue_timeout)` and
+    registers them in `BULKHEADS`."""
+    bulkheads = {name: Bulkhead(name, *class_limits) for name, class_limits in limits.items()}
+    BULKHEADS.update(bulkheads)
+    return bulkheads
+
+
+class BulkheadMiddleware:
+    """Runs each HTTP request inside the bulkhead of its route class.
+
+    `route_classes` maps path prefixes to bulkhead names (None exempts
+    the path, e.g. health checks); the first matching prefix wins and
+    other paths use `default`. Shed requests get 503 with Retry-After.
+    The slot is held until the response body is fully sent.
+    """
+    def __init__(
+        self,
+        app: ASGIApp,
+        bulkheads: Dict[str, Bulkhead],
+        route_classes: Iterable[Tuple[str, str | None]] = (),
+        default: str = 'default',
+    ):
+        self.app = app
+        self.bulkheads = bulkheads
+        self.route_classes = list(route_classes)
+        self.default = default
+
+    def classify(self, path: str) -> str | None:
+        for prefix, name in self.route_classes:
+            if path == prefix or path.startswith(prefix.rstrip('/') + '/'):
+                return name
+        return self.default
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        name = self.classify(scope['path']) if scope['type'] == 'http' else None
+        bulkhead = self.bulkheads.get(name) if name else None
+        if bulkhead is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            with timed('queue'):
+                await bulkhead.acquire()
+        except BulkheadFull as e:
+            response = JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={'detail': str(e)},
+                headers={'Retry-After': str(max(1, round(bulkhead.queue_timeout)))},
+            )
+            await response(scope, receive, send)
+            return
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            bulkhead.release(loop.time() - start)
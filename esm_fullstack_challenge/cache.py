@@ -0,0 +1,113 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, NamedTuple
+
+# Sentinel returned by `TTLCache.get` on a miss, so None can be cached
+MISSING = object()
+
+# Every TTLCache by name, for /stats/cache
+CACHES: Dict[str, 'TTLCache'] = {}
+
+
+def estimate_size(obj: Any) -> int:
+    """Roughly estimates the memory held by nested lists, tuples and dicts of scalars."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(estimate_size(item) for item in obj)
+    return size
+
+
+class _Entry(NamedTuple):
+    value: Any
+    tag: Hashable
+    expires_at: float
+    size: int
+
+
+class TTLCache:
+    """Thread-safe LRU cache bounded by estimated memory, with per-entry TTL.
+
+    Entries can carry a tag (e.g. the versions of the tables a result was
+    read from); a lookup with a different tag is a miss and drops the
+    entry, which ties invalidation to writes without any explicit purge.
+    Caches register in `CACHES` unless created with `register=False`.
+    """
+    def __init__(self, name: str, max_bytes: int, ttl: float, register: bool = True):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        if register:
+            CACHES[name] = self
+
+    def _pop(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def get(self, key: Hashable, tag: Hashable = None) -> Any:
+        """Returns the cached value, or MISSING if absent, expired or tagged differently."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.tag != tag or entry.expires_at <= time.monotonic()):
+                self._pop(key)
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def set(self, key: Hashable, value: Any, tag: Hashable = None, ttl: float | None = None):
+        """Stores a value, evicting least recently used entries to stay under `max_bytes`.
+
+        Values larger than `max_bytes` on their own are not cached.
+        """
+        ttl = self.ttl if ttl is None else ttl
+        size = estimate_size(value)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+            self._entries[key] = _Entry(value, tag, time.monotonic() + ttl, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._pop(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int | float]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
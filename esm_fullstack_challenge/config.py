@@ -6,6 +6,104 @@ PORT = config('PORT', cast=int, default=8000)
 CORS_ORIGINS = config('CORS_ORIGINS', default='http://localhost:5173')
 DB_FILE = config('DB_FILE', default='data.db')
 
+# Optional JSON file caching the table schemas used to generate models, keyed by a schema hash,
+# and the OpenAPI document generated from them
+SCHEMA_SNAPSHOT_FILE = config('SCHEMA_SNAPSHOT_FILE', default='')
+# Seconds a cold `import esm_fullstack_challenge.main` may take (enforced by tests/test_startup.py)
+STARTUP_IMPORT_BUDGET = config('STARTUP_IMPORT_BUDGET', cast=float, default=2.0)
+
 SECRET_KEY = config('SECRET_KEY', default='dev-secret-key-change-in-production')
 ALGORITHM = 'HS256'
 ACCESS_TOKEN_EXPIRE_MINUTES = config('ACCESS_TOKEN_EXPIRE_MINUTES', cast=int, default=60)
+# Verified token -> user cache of `get_current_user` (never past the token's exp; 0 disables).
+# User changes made through the API drop it at once; the TTL bounds staleness across processes.
+AUTH_CACHE_TTL = config('AUTH_CACHE_TTL', cast=float, default=30.0)
+AUTH_CACHE_MAX_BYTES = config('AUTH_CACHE_MAX_BYTES', cast=int, default=4 * 1024 * 1024)
+
+# bcrypt runs on its own pool: BCRYPT_WORKERS at once, BCRYPT_MAX_QUEUE waiting for at most
+# BCRYPT_QUEUE_TIMEOUT seconds, beyond which requests get 503. Hashes with a cost factor other
+# than BCRYPT_ROUNDS are upgraded on the next successful login.
+BCRYPT_ROUNDS = config('BCRYPT_ROUNDS', cast=int, default=12)
+BCRYPT_WORKERS = config('BCRYPT_WORKERS', cast=int, default=2)
+BCRYPT_MAX_QUEUE = config('BCRYPT_MAX_QUEUE', cast=int, default=16)
+BCRYPT_QUEUE_TIMEOUT = config('BCRYPT_QUEUE_TIMEOUT', cast=float, default=2.0)
+
+# SQLite connection pool and the PRAGMA profile applied to every pooled connection
+DB_POOL_SIZE = config('DB_POOL_SIZE', cast=int, default=8)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', cast=float, default=10.0)
+# Prepared statements kept per connection; sized for ~3 query shapes per generated route
+DB_CACHED_STATEMENTS = config('DB_CACHED_STATEMENTS', cast=int, default=256)
+# Dedicated threads for the async DB API; keep below DB_POOL_SIZE to leave room for sync callers
+DB_EXECUTOR_WORKERS = config('DB_EXECUTOR_WORKERS', cast=int, default=4)
+DB_PRAGMAS = {
+    'journal_mode': config('DB_JOURNAL_MODE', default='wal'),
+    'cache_size': config('DB_CACHE_SIZE', cast=int, default=-65536),  # negative values are KiB
+    'mmap_size': config('DB_MMAP_SIZE', cast=int, default=268435456),
+    'temp_store': config('DB_TEMP_STORE', default='memory'),
+    'busy_timeout': config('DB_BUSY_TIMEOUT', cast=int, default=5000),
+}
+
+# Bulkheads: each route class gets (concurrent requests, queue depth, queue deadline in seconds).
+# Requests that would wait past the deadline are shed with 503.
+BULKHEADS_ENABLED = config('BULKHEADS_ENABLED', cast=bool, default=True)
+BULKHEAD_LIMITS = {
+    'default': (
+        config('BULKHEAD_DEFAULT_LIMIT', cast=int, default=32),
+        config('BULKHEAD_DEFAULT_QUEUE', cast=int, default=128),
+        config('BULKHEAD_DEFAULT_TIMEOUT', cast=float, default=2.0),
+    ),
+    'analytics': (
+        config('BULKHEAD_ANALYTICS_LIMIT', cast=int, default=4),
+        config('BULKHEAD_ANALYTICS_QUEUE', cast=int, default=32),
+        config('BULKHEAD_ANALYTICS_TIMEOUT', cast=float, default=5.0),
+    ),
+    'auth': (
+        config('BULKHEAD_AUTH_LIMIT', cast=int, default=8),
+        config('BULKHEAD_AUTH_QUEUE', cast=int, default=64),
+        config('BULKHEAD_AUTH_TIMEOUT', cast=float, default=3.0),
+    ),
+    # Streaming downloads last as long as the client reads; kept apart so they
+    # do not inflate the analytics service time and shed dashboard requests
+    'export': (
+        config('BULKHEAD_EXPORT_LIMIT', cast=int, default=2),
+        config('BULKHEAD_EXPORT_QUEUE', cast=int, default=8),
+        config('BULKHEAD_EXPORT_TIMEOUT', cast=float, default=5.0),
+    ),
+}
+
+# Server-Timing header and a JSON log line (logger esm_fullstack_challenge.timing, INFO)
+# with the time each request spent in auth, queueing, SQL, serialization, ...
+SERVER_TIMING = config('SERVER_TIMING', cast=bool, default=True)
+
+# Prometheus /metrics: request latency per route template, SQL latency per query shape and live
+# pool/cache/bulkhead stats. Distinct SQL shapes beyond METRICS_MAX_SQL_SHAPES are labelled 'other'.
+# The endpoint is only mounted once secured: scrapes must send METRICS_TOKEN as a bearer token.
+# Set METRICS_PUBLIC=true instead to explicitly serve it without a token (e.g. on a private network).
+METRICS_ENABLED = config('METRICS_ENABLED', cast=bool, default=True)
+METRICS_MAX_SQL_SHAPES = config('METRICS_MAX_SQL_SHAPES', cast=int, default=200)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_PUBLIC = config('METRICS_PUBLIC', cast=bool, default=False)
+
+# Log filter/sort columns from list requests that have no supporting index
+INDEX_ADVISOR = config('INDEX_ADVISOR', cast=bool, default=False)
+
+# Content-Range totals: cached per (table, filter) and invalidated by table writes.
+# With ESTIMATED_TOTALS, filtered totals on tables of at least ESTIMATED_TOTALS_MIN_ROWS
+# rows are estimated from sqlite_stat1 and flagged with X-Total-Estimated.
+TOTALS_CACHE_SIZE = config('TOTALS_CACHE_SIZE', cast=int, default=1024)
+ESTIMATED_TOTALS = config('ESTIMATED_TOTALS', cast=bool, default=False)
+ESTIMATED_TOTALS_MIN_ROWS = config('ESTIMATED_TOTALS_MIN_ROWS', cast=int, default=100000)
+
+# Result cache of the dashboard endpoints; entries are also dropped when a table they read changes
+DASHBOARD_CACHE_TTL = config('DASHBOARD_CACHE_TTL', cast=float, default=300.0)
+DASHBOARD_CACHE_MAX_BYTES = config('DASHBOARD_CACHE_MAX_BYTES', cast=int, default=32 * 1024 * 1024)
+
+# Serialize generated list/id route rows straight to JSON bytes with orjson, skipping
+# response_model validation (the OpenAPI schema still comes from the generated models)
+FAST_JSON_RESPONSES = config('FAST_JSON_RESPONSES', cast=bool, default=False)
+
+# Rows fetched per batch by the streaming /export routes
+EXPORT_BATCH_SIZE = config('EXPORT_BATCH_SIZE', cast=int, default=1000)
+# Exports read from their own small connection pool, so downloads neither hold the main
+# pool's connections nor open unbounded ones (with or without bulkheads)
+EXPORT_MAX_CONNECTIONS = config('EXPORT_MAX_CONNECTIONS', cast=int, default=2)
@@ -1,3 +1,3 @@
 # flake8: noqa
-from esm_fullstack_challenge.db.db import DB
+from esm_fullstack_challenge.db.db import DB, AsyncDB, ConnectionPool, PoolTimeout
 from esm_fullstack_challenge.db.utils import query_builder
@@ -0,0 +1,168 @@
+import sqlite3
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class Summary(NamedTuple):
+    """Derived table kept in sync with its source tables by triggers.
+
+    `select` produces the summary rows restricted by `{filter}`; triggers
+    on each source table run it for the keys their row touches, found by
+    the `sources` queries (written against `{row}`, i.e. NEW or OLD).
+    """
+    table: str
+    schema: str
+    columns: Tuple[str, ...]
+    key: str
+    key_expr: str
+    select: str
+    sources: Dict[str, str]
+    indexes: Tuple[Tuple[str, ...], ...] = ()  # columns, optionally with ASC/DESC
+
+
+SUMMARIES: List[Summary] = [
+    # Wins per driver (finished in first place)
+    Summary(
+        table='_driver_wins',
+        schema='driver_id INTEGER PRIMARY KEY, wins INTEGER NOT NULL',
+        columns=('driver_id', 'wins'),
+        key='driver_id',
+        key_expr='r.driver_id',
+        select=(
+            'SELECT r.driver_id, count(*) FROM results r'
+            ' JOIN status s ON r.status_id = s.id'
+            " WHERE s.status = 'Finished' AND r.position_order = 1 AND {filter}"
+            ' GROUP BY r.driver_id'
+        ),
+        sources={
+            'results': 'SELECT {row}.driver_id',
+            'status': 'SELECT driver_id FROM results WHERE status_id = {row}.id',
+        },
+        indexes=(('wins',),),
+    ),
+    # Driver standings after every round, with race and driver names
+    Summary(
+        table='_driver_progression',
+        schema=(
+            'race_id INTEGER NOT NULL, driver_id INTEGER NOT NULL, year INTEGER, round INTEGER,'
+            ' race_name TEXT, driver_name TEXT, points REAL'
+        ),
+        columns=('race_id', 'driver_id', 'year', 'round', 'race_name', 'driver_name', 'points'),
+        key='race_id',
+        key_expr='ds.race_id',
+        select=(
+            "SELECT ds.race_id, ds.driver_id, r.year, r.round, r.name, d.forename || ' ' || d.surname,"
+            ' ds.points FROM driver_standings ds'
+            ' JOIN races r ON ds.race_id = r.id'
+            ' JOIN drivers d ON ds.driver_id = d.id'
+            ' WHERE {filter}'
+        ),
+        sources={
+            'driver_standings': 'SELECT {row}.race_id',
+            'races': 'SELECT {row}.id',
+            'drivers': 'SELECT race_id FROM driver_standings WHERE driver_id = {row}.id',
+        },
+        indexes=(('race_id',), ('year', 'round', 'points DESC')),
+    ),
+    # Most wins per constructor (by name) in each season
+    Summary(
+        table='_constructor_season_wins',
+        schema='year INTEGER, constructor_name TEXT, wins INTEGER, PRIMARY KEY (year, constructor_name)',
+        columns=('year', 'constructor_name', 'wins'),
+        key='year',
+        key_expr='r.year',
+        select=(
+            'SELECT r.year, c.name, MAX(cs.wins) FROM constructor_standings cs'
+            ' JOIN races r ON cs.race_id = r.id'
+            ' JOIN constructors c ON cs.constructor_id = c.id'
+            ' WHERE {filter}'
+            ' GROUP BY r.year, c.name'
+            ' HAVING MAX(cs.wins) > 0'
+        ),
+        sources={
+            'constructor_standings': 'SELECT year FROM races WHERE id = {row}.race_id',
+            'races': 'SELECT {row}.year',
+            'constructors': (
+                'SELECT r.year FROM constructor_standings cs JOIN races r ON cs.race_id = r.id'
+                ' WHERE cs.constructor_id = {row}.id'
+            ),
+        },
+        indexes=(('year', 'wins DESC'),),
+    ),
+]
+
+_EVENT_ROWS = {
+    'insert': ('NEW',),
+    'update': ('OLD', 'NEW'),
+    'delete': ('OLD',),
+}
+
+
+def _trigger_name(summary: Summary, source: str, event: str) -> str:
+    return f'_analytics{summary.table}_{source}_{event}'
+
+
+def _refresh_sql(summary: Summary, keys: str | None = None) -> List[str]:
+    """Statements that recompute the summary rows for `keys` (all rows if None)."""
+    insert = f'INSERT INTO {summary.table} ({", ".join(summary.columns)}) ' + summary.select.format(
+        filter=f'{summary.key_expr} IN ({keys})' if keys else '1',
+    )
+    if keys is None:
+        return [f'DELETE FROM {summary.table}', insert]
+    return [f'DELETE FROM {summary.table} WHERE {summary.key} IN ({keys})', insert]
+
+
+def refresh_summary(conn: sqlite3.Connection, summary: Summary):
+    """Rebuilds a summary table from its sources."""
+    for sql in _refresh_sql(summary):
+        conn.execute(sql)
+
+
+def ensure_analytics(conn: sqlite3.Connection) -> List[str]:
+    """Creates the analytics summary tables and their incremental refresh triggers.
+
+    A summary is rebuilt in full when it is new or any of its triggers is
+    missing (e.g. the ingest script replaced a source table). From then
+    on, every insert, update or delete on a source table recomputes only
+    the summary rows for the keys (driver, race or season) it touches.
+    Summaries whose source tables are missing are skipped.
+
+    Returns:
+        List[str]: Summary tables that were rebuilt.
+    """
+    existing = {
+        row[0]: row[1]
+        for row in conn.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table', 'trigger')")
+    }
+    rebuilt = []
+    for summary in SUMMARIES:
+        if not all(existing.get(source) == 'table' for source in summary.sources):
+            continue
+        triggers = [
+            (source, event) for source in summary.sources for event in _EVENT_ROWS
+        ]
+        conn.execute(f'CREATE TABLE IF NOT EXISTS {summary.table} ({summary.schema})')
+        for columns in summary.indexes:
+            conn.execute(
+                f'CREATE INDEX IF NOT EXISTS idx{summary.table}_{"_".join(c.split()[0] for c in columns)}'
+                f' ON {summary.table} ({", ".join(columns)})'
+            )
+        if summary.table in existing and all(
+            _trigger_name(summary, source, event) in existing for source, event in triggers
+        ):
+            continue
+
+        for source, event in triggers:
+            keys = ' UNION '.join(
+                summary.sources[source].format(row=row) for row in _EVENT_ROWS[event]
+            )
+            body = ''.join(f' {sql};' for sql in _refresh_sql(summary, keys))
+            conn.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {_trigger_name(summary, source, event)}'
+                f' AFTER {event.upper()} ON {source} BEGIN{body} END'
+            )
+        refresh_summary(conn, summary)
+        rebuilt.append(summary.table)
+    for table in rebuilt:
+        conn.execute(f'ANALYZE {table}')
+    conn.commit()
+    return rebuilt
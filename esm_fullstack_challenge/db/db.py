@@ -1,18 +1,264 @@
+import asyncio
+import contextvars
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Sequence, Tuple, TypeVar
+
+from esm_fullstack_challenge.config import (
+    DB_CACHED_STATEMENTS, DB_EXECUTOR_WORKERS, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_PRAGMAS,
+    EXPORT_BATCH_SIZE, EXPORT_MAX_CONNECTIONS,
+)
+from esm_fullstack_challenge.db.totals import TotalsCache
+from esm_fullstack_challenge.timing import timed
+
+T = TypeVar('T')
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of SQLite connections.
+
+    Connections are opened lazily up to `max_size`, tuned once with the
+    PRAGMA profile and then reused, so requests skip the connect/schema
+    parse cost and keep a warm page cache. `busy_timeout` is applied before
+    any other PRAGMA, and WAL mode (persistent in the database file) is
+    switched on once when the pool is created rather than on every connect.
+    """
+    def __init__(
+        self,
+        db_file: str,
+        max_size: int = DB_POOL_SIZE,
+        timeout: float = DB_POOL_TIMEOUT,
+        pragmas: Dict[str, str | int] | None = None,
+    ):
+        if max_size < 1:
+            raise ValueError(f'Invalid pool size: {max_size}')
+        self.db_file = db_file
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = DB_PRAGMAS if pragmas is None else pragmas
+        self._cond = threading.Condition()
+        self._idle: List[sqlite3.Connection] = []
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._created = 0
+        self._closed = False
+        self._wal = str(self.pragmas.get('journal_mode', '')).lower() == 'wal'
+        if self._wal:
+            conn = self._open_connection()
+            try:
+                conn.execute('PRAGMA journal_mode = wal')
+            finally:
+                conn.close()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_file,
+            check_same_thread=False,
+            cached_statements=DB_CACHED_STATEMENTS,
+        )
+        if 'busy_timeout' in self.pragmas:
+            conn.execute(f'PRAGMA busy_timeout = {self.pragmas["busy_timeout"]}')
+        return conn
+
+    def connect(self) -> sqlite3.Connection:
+        """Opens a connection with the PRAGMA profile, not counted against the pool."""
+        conn = self._open_connection()
+        for name, value in self.pragmas.items():
+            if name == 'busy_timeout' or (name == 'journal_mode' and self._wal):
+                continue
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """Borrows a connection, opening a new one if the pool is not full.
+
+        Raises:
+            PoolTimeout: If the pool stays exhausted for `timeout` seconds.
+        """
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError('Connection pool is closed')
+                if self._idle:
+                    self._in_use += 1
+                    return self._idle.pop()
+                if self._open < self.max_size:
+                    self._open += 1
+                    self._in_use += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f'No connection available after {self.timeout}s')
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection):
+        """Returns a connection to the pool, resetting per-request state."""
+        discard = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = None
+        except sqlite3.Error:
+            discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._open -= 1
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        """Closes idle connections; borrowed ones are closed on release."""
+        with self._cond:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._open -= 1
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'open': self._open,
+                'idle': len(self._idle),
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'created': self._created,
+            }
 
 
 class DB:
     """Database class for managing SQLite connections."""
-    def __init__(self, db_file: str):
+    def __init__(
+        self,
+        db_file: str,
+        executor_workers: int = DB_EXECUTOR_WORKERS,
+        export_connections: int = EXPORT_MAX_CONNECTIONS,
+        **pool_kwargs,
+    ):
         self.db_file = db_file
+        self.pool = ConnectionPool(db_file, **pool_kwargs)
+        # Long-lived export cursors get their own bounded pool (see `AsyncDB.iter_batches`)
+        self.export_pool = ConnectionPool(
+            db_file, **{**pool_kwargs, 'max_size': export_connections},
+        )
+        self.aio = AsyncDB(self, max_workers=executor_workers)
+        self.totals = TotalsCache()
 
     @contextmanager
     def get_connection(self):
-        """Context manager for database connection."""
-        conn = sqlite3.connect(self.db_file)
+        """Context manager for a pooled database connection."""
+        with timed('db_wait'):
+            conn = self.pool.acquire()
         try:
             yield conn
             conn.commit()
         finally:
-            conn.close()
+            self.pool.release(conn)
+
+    def close(self):
+        self.aio.close()
+        self.pool.close()
+        self.export_pool.close()
+
+
+class AsyncDB:
+    """Async access to a DB that runs blocking SQLite work on its own executor.
+
+    Keeps slow queries off the event loop and out of the anyio threadpool
+    used for sync endpoints, with concurrency set by `max_workers`.
+    """
+    def __init__(self, db: DB, max_workers: int = DB_EXECUTOR_WORKERS):
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+
+    def _call(self, func: Callable[..., T], args: Sequence[Any]) -> T:
+        with self.db.get_connection() as conn:
+            return func(conn, *args)
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Runs `func(conn, *args)` on a pooled connection in the DB executor."""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, ctx.run, self._call, func, args)
+
+    async def call(self, func: Callable[..., T], *args) -> T:
+        """Runs `func(*args)` in the DB executor without a connection, e.g. to encode rows."""
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, ctx.run, func, *args)
+
+    async def iter_batches(
+            self,
+            sql: str,
+            params: Sequence[Any] = (),
+            batch_size: int = EXPORT_BATCH_SIZE,
+            transform: Callable[[Tuple[str, ...], List[tuple]], Any] | None = None,
+    ) -> AsyncIterator[Any]:
+        """Streams a query's rows in batches from a connection of the export pool.
+
+        Yields the column names first, then lists of at most `batch_size`
+        rows, or `transform(columns, rows)` of each. Every batch is fetched
+        (and transformed) in the DB executor. The connection comes from
+        `db.export_pool`, so slow downloads do not hold the main pool's
+        connections and concurrent exports are capped; it is returned when
+        the generator is exhausted or closed.
+
+        Raises:
+            PoolTimeout: If every export connection stays busy for the pool timeout.
+        """
+        export_pool = self.db.export_pool
+        conn = await self.call(export_pool.acquire)
+        try:
+            cur = await self.call(conn.execute, sql, params)
+            columns = tuple(d[0] for d in cur.description)
+            yield columns
+
+            def fetch_batch():
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    return None
+                return transform(columns, rows) if transform else rows
+
+            while (batch := await self.call(fetch_batch)) is not None:
+                yield batch
+        finally:
+            export_pool.release(conn)
+
+    async def fetch_all(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchall())
+
+    async def fetch_one(self, sql: str, params: Sequence[Any] = ()) -> tuple | None:
+        return await self.run(lambda conn: conn.execute(sql, params).fetchone())
+
+    def close(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,156 @@
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from esm_fullstack_challenge.db.utils import get_table_names
+
+logger = logging.getLogger(__name__)
+
+
+class Index(NamedTuple):
+    """Declarative index definition."""
+    table: str
+    columns: Tuple[str, ...]
+
+    @property
+    def name(self) -> str:
+        return f'idx_{self.table}_{"_".join(self.columns)}'
+
+
+# Join and filter columns used by the dashboard and the generated routes.
+# Id lookup indexes for every table are derived in `get_index_manifest`.
+INDEXES: List[Index] = [
+    Index('results', ('race_id',)),
+    Index('results', ('driver_id',)),
+    Index('results', ('constructor_id',)),
+    Index('results', ('status_id',)),
+    Index('races', ('year', 'round')),
+    Index('races', ('circuit_id',)),
+    Index('driver_standings', ('race_id',)),
+    Index('driver_standings', ('driver_id',)),
+    Index('constructor_standings', ('race_id',)),
+    Index('constructor_standings', ('constructor_id',)),
+    Index('constructor_results', ('race_id',)),
+    Index('qualifying', ('race_id',)),
+    Index('qualifying', ('driver_id',)),
+    Index('lap_times', ('race_id', 'driver_id', 'lap')),
+    Index('pit_stops', ('race_id', 'driver_id', 'stop')),
+    Index('sprint_results', ('race_id',)),
+    Index('sprint_results', ('driver_id',)),
+]
+
+
+def get_table_columns(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """Returns the columns of every data table."""
+    return {
+        table: [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        for table in get_table_names(conn)
+    }
+
+
+def get_rowid_aliases(conn: sqlite3.Connection, tables: Iterable[str]) -> Dict[str, str]:
+    """Returns the INTEGER PRIMARY KEY column of each table that has one."""
+    aliases = {}
+    for table in tables:
+        pk_cols = [row for row in conn.execute(f'PRAGMA table_info({table})') if row[5]]
+        if len(pk_cols) == 1 and pk_cols[0][2].upper() == 'INTEGER':
+            aliases[table] = pk_cols[0][1]
+    return aliases
+
+
+def get_lookup_column(columns: Iterable[str]) -> str | None:
+    """Returns the column used by the generated id routes (`id` or first `*_id`)."""
+    for col in columns:
+        if col == 'id' or col.endswith('_id'):
+            return col
+    return None
+
+
+def get_index_manifest(
+        table_columns: Dict[str, List[str]],
+        rowid_aliases: Dict[str, str] | None = None,
+) -> List[Index]:
+    """Returns the manifest indexes that apply to the given tables, plus one
+    lookup index per table unless a manifest index or the primary key
+    already covers it."""
+    manifest = [
+        index for index in INDEXES
+        if index.table in table_columns
+        and all(col in table_columns[index.table] for col in index.columns)
+    ]
+    leading = {(index.table, index.columns[0]) for index in manifest}
+    leading.update((rowid_aliases or {}).items())
+    for table, columns in table_columns.items():
+        lookup_col = get_lookup_column(columns)
+        if lookup_col and (table, lookup_col) not in leading:
+            manifest.append(Index(table, (lookup_col,)))
+    return manifest
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> List[str]:
+    """Idempotently creates the index manifest and refreshes planner statistics.
+
+    Returns:
+        List[str]: Names of the indexes that were created.
+    """
+    existing = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='index';")
+    }
+    table_columns = get_table_columns(conn)
+    created = []
+    for index in get_index_manifest(table_columns, get_rowid_aliases(conn, table_columns)):
+        if index.name in existing:
+            continue
+        conn.execute(
+            f'CREATE INDEX IF NOT EXISTS {index.name} ON {index.table} ({", ".join(index.columns)});'
+        )
+        created.append(index.name)
+
+    has_stats = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1';"
+    ).fetchone()
+    if created or not has_stats:
+        conn.execute('ANALYZE;')
+    else:
+        conn.execute('PRAGMA optimize;')
+    conn.commit()
+    return created
+
+
+class IndexAdvisor:
+    """Logs filter/sort columns that no index leads with, once per column."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._leading: Dict[str, Set[str]] = {}
+        self._reported: Set[Tuple[str, str]] = set()
+
+    def _leading_columns(self, conn: sqlite3.Connection, table: str) -> Set[str]:
+        if table not in self._leading:
+            leading = set(get_rowid_aliases(conn, [table]).values())
+            for index_row in conn.execute(f'PRAGMA index_list({table})').fetchall():
+                info = conn.execute(f'PRAGMA index_info({index_row[1]})').fetchall()
+                if info:
+                    leading.add(info[0][2])
+            self._leading[table] = leading
+        return self._leading[table]
+
+    def check(self, conn: sqlite3.Connection, table: str, columns: Iterable[str]) -> List[str]:
+        """Returns (and logs) the columns without a supporting index."""
+        with self._lock:
+            leading = self._leading_columns(conn, table)
+            missing = []
+            for col in dict.fromkeys(columns):
+                if col in leading or col == 'rowid':
+                    continue
+                missing.append(col)
+                if (table, col) not in self._reported:
+                    self._reported.add((table, col))
+                    logger.warning(
+                        'Index advisor: %s.%s is used to filter/sort but has no supporting index',
+                        table, col,
+                    )
+            return missing
+
+
+index_advisor = IndexAdvisor()
@@ -1,14 +1,10 @@
 import sqlite3
 
-import bcrypt
+from esm_fullstack_challenge.auth.hashing import password_hasher
 
 AVATAR_BASE_URL = "https://api.dicebear.com/9.x/identicon/svg"
 
 
-def _hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
-
-
 def init_users_table(conn: sqlite3.Connection):
     """Create the users table and seed default users if they don't exist."""
     conn.execute("""
@@ -39,7 +35,7 @@ def init_users_table(conn: sqlite3.Connection):
             (
                 "janedoe",
                 "Jane Doe",
-                _hash_password("password"),
+                password_hasher.hash_sync("password"),
                 f"{AVATAR_BASE_URL}?seed=janedoe",
                 "admin",
                 0,
@@ -47,7 +43,7 @@ def init_users_table(conn: sqlite3.Connection):
             (
                 "johndoe",
                 "John Doe",
-                _hash_password("password"),
+                password_hasher.hash_sync("password"),
                 f"{AVATAR_BASE_URL}?seed=johndoe",
                 "admin",
                 0,
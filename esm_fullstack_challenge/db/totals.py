@@ -0,0 +1,114 @@
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+from esm_fullstack_challenge.config import (
+    ESTIMATED_TOTALS, ESTIMATED_TOTALS_MIN_ROWS, TOTALS_CACHE_SIZE,
+)
+from esm_fullstack_challenge.db.tracking import get_row_count, get_table_versions
+from esm_fullstack_challenge.metrics import observe_query
+
+
+def estimate_filtered_count(
+        conn: sqlite3.Connection,
+        table: str,
+        filter_by: List[Tuple[str, Any]],
+        row_count: int,
+) -> int | None:
+    """Estimates the rows matching equality/IN filters from `sqlite_stat1`.
+
+    Each filter column needs an analyzed index that leads with it; the
+    average rows per key of that index gives the column's selectivity.
+    Returns None when any filter column cannot be estimated.
+    """
+    try:
+        stats = conn.execute(
+            'SELECT idx, stat FROM sqlite_stat1 WHERE tbl = ? AND idx IS NOT NULL', (table,),
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return None
+
+    rows_per_key = {}
+    for index_name, stat in stats:
+        info = conn.execute(f'PRAGMA index_info({index_name})').fetchall()
+        values = stat.split()
+        if info and len(values) > 1:
+            rows_per_key[info[0][2]] = (int(values[0]), int(values[1]))
+
+    estimate = float(row_count)
+    for col_tuple in filter_by:
+        column, value = col_tuple[0], col_tuple[-1]
+        if len(col_tuple) != 2 or column not in rows_per_key:
+            return None
+        total, per_key = rows_per_key[column]
+        keys = len(value) if isinstance(value, (list, tuple)) else 1
+        estimate *= min(1.0, keys * per_key / max(total, 1))
+    return round(estimate)
+
+
+class TotalsCache:
+    """Caches `Content-Range` totals per (table, normalized filter).
+
+    Entries are tagged with the table version from `_table_changes`, so any
+    write to the table invalidates them. Unfiltered totals come straight from
+    the trigger-maintained row count.
+    """
+    def __init__(self, max_entries: int = TOTALS_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Tuple[str, str], Tuple[int, int, bool]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_total(
+            self,
+            conn: sqlite3.Connection,
+            table: str,
+            count_query: Tuple[str, List[Any]],
+            filter_by: List[Tuple[str, Any]],
+    ) -> Tuple[int, bool]:
+        """Returns (total, estimated) for a list query.
+
+        Args:
+            conn (sqlite3.Connection): Connection to count with.
+            table (str): Table name.
+            count_query (Tuple[str, List[Any]]): Exact count query and params.
+            filter_by (List[Tuple[str, Any]]): Filters the count query applies.
+        """
+        version = get_table_versions(conn, [table]).get(table)
+        key = (table, json.dumps(sorted(filter_by, key=lambda f: f[0])))
+        if version is not None:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1], entry[2]
+        with self._lock:
+            self.misses += 1
+
+        total, estimated = None, False
+        row_count = get_row_count(conn, table) if version is not None else None
+        if row_count is not None and not filter_by:
+            total = row_count
+        elif ESTIMATED_TOTALS and row_count is not None and row_count >= ESTIMATED_TOTALS_MIN_ROWS:
+            total = estimate_filtered_count(conn, table, filter_by, row_count)
+            estimated = total is not None
+        if total is None:
+            sql, params = count_query
+            with observe_query(sql, phase=None):
+                total = conn.execute(sql, params).fetchone()[0]
+
+        if version is not None:
+            with self._lock:
+                self._entries[key] = (version, total, estimated)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return total, estimated
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,89 @@
+import sqlite3
+from typing import Dict, Iterable, List
+
+from esm_fullstack_challenge.db.utils import get_table_names
+
+
+CHANGES_TABLE = '_table_changes'
+
+_TRIGGERS = {
+    'insert': 'AFTER INSERT ON {table} BEGIN'
+              ' UPDATE {changes} SET version = version + 1, row_count = row_count + 1'
+              " WHERE name = '{table}'; END",
+    'update': 'AFTER UPDATE ON {table} BEGIN'
+              ' UPDATE {changes} SET version = version + 1'
+              " WHERE name = '{table}'; END",
+    'delete': 'AFTER DELETE ON {table} BEGIN'
+              ' UPDATE {changes} SET version = version + 1, row_count = row_count - 1'
+              " WHERE name = '{table}'; END",
+}
+
+
+def _trigger_name(table: str, event: str) -> str:
+    return f'_track_{table}_{event}'
+
+
+def ensure_change_tracking(conn: sqlite3.Connection) -> List[str]:
+    """Installs triggers that maintain a version and row count per data table.
+
+    Every insert, update or delete bumps the table's version in
+    `_table_changes`, whichever process performs it. Tables whose triggers
+    are missing (new, or recreated by the ingest script) get their row
+    count recomputed.
+
+    Returns:
+        List[str]: Tables that (re)started being tracked.
+    """
+    conn.execute(
+        f'CREATE TABLE IF NOT EXISTS {CHANGES_TABLE} ('
+        ' name TEXT PRIMARY KEY,'
+        ' version INTEGER NOT NULL DEFAULT 0,'
+        ' row_count INTEGER NOT NULL DEFAULT 0'
+        ')'
+    )
+    triggers = {
+        row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='trigger';")
+    }
+    tracked = []
+    for table in get_table_names(conn):
+        if all(_trigger_name(table, event) in triggers for event in _TRIGGERS):
+            continue
+        for event, body in _TRIGGERS.items():
+            conn.execute(
+                f'CREATE TRIGGER IF NOT EXISTS {_trigger_name(table, event)} '
+                + body.format(table=table, changes=CHANGES_TABLE)
+            )
+        row_count = conn.execute(f'SELECT count(*) FROM {table}').fetchone()[0]
+        conn.execute(
+            f'INSERT INTO {CHANGES_TABLE} (name, version, row_count) VALUES (?, 1, ?)'
+            ' ON CONFLICT(name) DO UPDATE SET version = version + 1, row_count = excluded.row_count',
+            (table, row_count),
+        )
+        tracked.append(table)
+    conn.commit()
+    return tracked
+
+
+def get_table_versions(conn: sqlite3.Connection, tables: Iterable[str]) -> Dict[str, int]:
+    """Returns the current version of each tracked table."""
+    tables = list(tables)
+    try:
+        rows = conn.execute(
+            f'SELECT name, version FROM {CHANGES_TABLE}'
+            f' WHERE name IN ({", ".join("?" for _ in tables)})',
+            tables,
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return dict(rows)
+
+
+def get_row_count(conn: sqlite3.Connection, table: str) -> int | None:
+    """Returns the trigger-maintained row count of a tracked table."""
+    try:
+        row = conn.execute(
+            f'SELECT row_count FROM {CHANGES_TABLE} WHERE name = ?', (table,),
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
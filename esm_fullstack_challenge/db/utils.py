@@ -1,6 +1,21 @@
+import sqlite3
 from typing import List, Tuple, Any
 
 
+def get_table_names(conn: sqlite3.Connection) -> List[str]:
+    """Returns the names of all data tables.
+
+    SQLite internals (`sqlite_*`) and the app's own bookkeeping tables
+    (`_*`) are skipped.
+    """
+    cursor = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table'"
+        " AND name NOT LIKE 'sqlite\\_%' ESCAPE '\\'"
+        " AND name NOT LIKE '\\_%' ESCAPE '\\';"
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
 def query_builder(
         table: str | None = None,
         columns: List[str] | None = None,
@@ -12,8 +27,12 @@ def query_builder(
         offset: int | None = None,
         filter_by: List[Tuple[str, Any] | Tuple[str, str, Any]] | None = None,
         count_only: bool | None = False,
-) -> str:
-    """Builds a SQL query string based on the provided parameters.
+        seek: Tuple[List[str], List[Any], str] | None = None,
+) -> Tuple[str, List[Any]]:
+    """Builds a parameterized SQL query based on the provided parameters.
+
+    Filter values, limit and offset are bound as `?` placeholders so that
+    queries of the same shape share one cached prepared statement.
 
     Args:
         table (str | None, optional): Name of table. Defaults to None.
@@ -32,9 +51,14 @@ def query_builder(
                                                                                      to filter by. Defaults to None.
         count_only (bool | None, optional): If True, query will return full count of query ignoring
                                             any limit or offset. Defaults to False.
+        seek (Tuple[List[str], List[Any], str] | None, optional): (columns, values, direction) for
+                                                                 keyset pagination; only rows strictly
+                                                                 after `values` in that order are
+                                                                 returned; the first column may be
+                                                                 NULL. Defaults to None.
 
     Returns:
-        str: SQL query string.
+        Tuple[str, List[Any]]: SQL query string and its bound parameters.
     """
     select_str = ''
     if custom_select:
@@ -65,6 +89,7 @@ def query_builder(
         "Where clause should not start with 'where' keyword"
 
     where_str = f' where {where}' if where else ''
+    where_params = []
     if filter_by:
         filter_str_list = []
         for col_tuple in filter_by:
@@ -72,20 +97,17 @@ def query_builder(
                 if len(col_tuple) == 2:
                     column, value = col_tuple
                     if isinstance(value, (list, tuple)):
-                        value = ', '.join(f'"{v}"' if isinstance(v, str) else str(v) for v in value)
-                        filter_str_list.append(f'{column} in ({value})')
+                        placeholders = ', '.join('?' for _ in value)
+                        filter_str_list.append(f'{column} in ({placeholders})')
+                        where_params.extend(value)
                     else:
-                        filter_str_list.append(
-                            f'{column}="{value}"' if isinstance(value, str) else
-                            f'{column}={value}'
-                        )
+                        filter_str_list.append(f'{column} = ?')
+                        where_params.append(value)
                 elif len(col_tuple) == 3:
                     column, operator, value = col_tuple
                     if operator.lower() in ['=', '!=', '<', '>', '<=', '>=']:
-                        filter_str_list.append(
-                            f'{column} {operator} "{value}"' if isinstance(value, str) else
-                            f'{column} {operator} {value}'
-                        )
+                        filter_str_list.append(f'{column} {operator} ?')
+                        where_params.append(value)
                     else:
                         raise ValueError(f'Invalid operator: {operator}')
                 else:
@@ -94,11 +116,47 @@ def query_builder(
                 raise ValueError(f'Invalid filter_by format: {tuple}')
         where_str += (' and ' if where_str else ' where ') + ' and '.join(filter_str_list)
 
+    if seek and not count_only:
+        seek_columns, seek_values, seek_direction = seek
+        if seek_direction.lower() not in ['asc', 'desc']:
+            raise ValueError(f'Invalid seek direction: {seek_direction}')
+        if len(seek_columns) != len(seek_values):
+            raise ValueError('Seek columns and values must have the same length')
+        ascending = seek_direction.lower() == 'asc'
+        operator = '>' if ascending else '<'
+
+        def row_after(cols: List[str]) -> str:
+            return '({columns}) {operator} ({placeholders})'.format(
+                columns=', '.join(cols), operator=operator, placeholders=', '.join('?' for _ in cols),
+            )
+
+        # The leading sort column may be NULL (the rest, e.g. rowid, may not). SQLite sorts
+        # NULLs first ascending and last descending, and row values never compare to NULL.
+        lead, rest = seek_columns[0], seek_columns[1:]
+        if not rest:
+            seek_str, seek_params = row_after(seek_columns), list(seek_values)
+        elif seek_values[0] is None and ascending:
+            seek_str = f'(({lead} is null and {row_after(rest)}) or {lead} is not null)'
+            seek_params = list(seek_values[1:])
+        elif seek_values[0] is None:
+            seek_str, seek_params = f'{lead} is null and {row_after(rest)}', list(seek_values[1:])
+        elif ascending:
+            seek_str, seek_params = row_after(seek_columns), list(seek_values)
+        else:
+            seek_str, seek_params = f'({row_after(seek_columns)} or {lead} is null)', list(seek_values)
+        where_str += (' and ' if where_str else ' where ') + seek_str
+        where_params.extend(seek_params)
+
     group_by_str = ''
     if group_by:
         group_by_str = ' group by ' + ', '.join(group_by)
 
     if not count_only:
+        params = list(where_params)
+        if limit is not None:
+            params.append(limit)
+        if offset is not None:
+            params.append(offset)
         query = (
             '{select}'
             '{where}'
@@ -113,10 +171,10 @@ def query_builder(
             where=where_str,
             group_by=group_by_str,
             order_by=order_by_str,
-            limit=f' limit {limit}' if limit is not None else '',
-            offset=f' offset {offset}' if offset is not None else '',
+            limit=' limit ?' if limit is not None else '',
+            offset=' offset ?' if offset is not None else '',
         )
-        return query
+        return query, params
     else:
         query = (
             'select count(*) from {table}'
@@ -127,4 +185,4 @@ def query_builder(
             table=table,
             where=where_str,
         )
-        return query
+        return query, list(where_params)
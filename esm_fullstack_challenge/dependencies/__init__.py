@@ -1,3 +1,5 @@
 # flake8: noqa
-from esm_fullstack_challenge.dependencies.common import CommonQueryParams
+from esm_fullstack_challenge.dependencies.common import CommonQueryParams, encode_cursor, decode_cursor
 from esm_fullstack_challenge.dependencies.db import get_db
+from esm_fullstack_challenge.dependencies.etag import conditional_get
+from esm_fullstack_challenge.dependencies.format import ResponseFormat, get_response_format
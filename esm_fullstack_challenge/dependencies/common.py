@@ -1,8 +1,10 @@
+import base64
+import binascii
 import json
 from enum import Enum
-from typing import Optional, List, Tuple
+from typing import Any, Optional, List, Tuple
 
-from fastapi import Query
+from fastapi import HTTPException, Query, status
 
 
 class SortDirection(str, Enum):
@@ -20,17 +22,53 @@ class SortDirection(str, Enum):
             raise ValueError(f"Invalid sort direction: {value}")
 
 
+def encode_cursor(columns: List[str], values: List[Any], position: int = 0) -> str:
+    """Encodes the sort key of the last row of a page, and the number of
+    rows before the next page, as an opaque cursor."""
+    payload = json.dumps({'key': columns, 'after': values, 'pos': position}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, columns: List[str]) -> Tuple[List[Any], int]:
+    """Decodes a cursor produced by `encode_cursor` for the same sort key.
+
+    Returns:
+        Tuple[List[Any], int]: Sort key values to seek after, and the position of the next page.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        valid = (
+            payload['key'] == columns and len(payload['after']) == len(columns)
+            and isinstance(payload.get('pos', 0), int) and payload.get('pos', 0) >= 0
+        )
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        valid = False
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor for this sort order',
+        )
+    return payload['after'], payload.get('pos', 0)
+
+
 class CommonQueryParams:
-    """Class to handle common query parameters for filtering, sorting, and pagination."""
+    """Class to handle common query parameters for filtering, sorting, and pagination.
+
+    Passing `cursor` switches list routes to keyset pagination: an empty
+    cursor requests the first page and each response carries the cursor of
+    the next page, so `range` only determines the page size.
+    """
     def __init__(
         self,
         filter_param: Optional[str] = Query('{}', alias='filter'),
         range_param: Optional[str] = Query('[0, 24]', alias='range'),
         sort_param: Optional[str] = Query(None, alias='sort'),
+        cursor_param: Optional[str] = Query(None, alias='cursor'),
     ):
         self.filter = json.loads(filter_param or 'null')
         self.range = json.loads(range_param or 'null')
         self.sort = json.loads(sort_param or 'null')
+        self.cursor = cursor_param
 
     @property
     def order_by(self) -> List[Tuple[str, str]]:
@@ -61,4 +99,5 @@ class CommonQueryParams:
             'filter': self.filter,
             'range': self.range,
             'sort': self.sort,
+            'cursor': self.cursor,
         }
@@ -1,10 +1,8 @@
-from esm_fullstack_challenge.config import DB_FILE
+from fastapi import Request
+
 from esm_fullstack_challenge.db import DB
 
 
-def get_db():
-    try:
-        db = DB(DB_FILE)
-        yield db
-    finally:
-        pass
+def get_db(request: Request) -> DB:
+    """Returns the pooled DB owned by the app lifespan."""
+    return request.app.state.db
@@ -0,0 +1,55 @@
+import hashlib
+import json
+from typing import Callable, Dict
+
+from fastapi import Depends, HTTPException, Request, Response, status
+
+from esm_fullstack_challenge.db import DB
+from esm_fullstack_challenge.db.tracking import get_table_versions
+from esm_fullstack_challenge.dependencies.db import get_db
+
+
+def compute_etag(request: Request, versions: Dict[str, int]) -> str:
+    """Builds a weak ETag from the path, the normalized query, Accept and table versions."""
+    payload = json.dumps([
+        request.url.path,
+        sorted(request.query_params.multi_items()),
+        request.headers.get('accept', ''),
+        sorted(versions.items()),
+    ], separators=(',', ':'))
+    return f'W/"{hashlib.sha1(payload.encode()).hexdigest()}"'
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Weak comparison of an ETag against an If-None-Match header."""
+    candidates = {tag.strip() for tag in if_none_match.split(',')}
+    return '*' in candidates or bool({etag, etag.removeprefix('W/')} & candidates)
+
+
+def conditional_get(*tables: str) -> Callable:
+    """Returns a dependency that answers conditional GETs for data read from `tables`.
+
+    The validator changes whenever one of the tables is written (the
+    versions come from the triggers in `db.tracking`), so a matching
+    If-None-Match is answered with 304 before the endpoint runs any query.
+    Untracked tables disable the ETag.
+
+    Args:
+        *tables (str): Tables the endpoint reads.
+
+    Returns:
+        Callable: FastAPI dependency.
+    """
+    async def check_etag(request: Request, response: Response, db: DB = Depends(get_db)) -> str | None:
+        versions = await db.aio.run(get_table_versions, tables)
+        if len(versions) < len(set(tables)):
+            return None
+        etag = compute_etag(request, versions)
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache', 'Vary': 'Accept'}
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and etag_matches(etag, if_none_match):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return etag
+
+    return check_etag
@@ -0,0 +1,41 @@
+from enum import Enum
+
+from fastapi import Query, Request, Response
+
+
+class ResponseFormat(str, Enum):
+    """Response formats negotiated by the list and dashboard routes."""
+    JSON = 'json'
+    ARROW = 'arrow'
+    PARQUET = 'parquet'
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self]
+
+
+MEDIA_TYPES = {
+    ResponseFormat.JSON: 'application/json',
+    ResponseFormat.ARROW: 'application/vnd.apache.arrow.stream',
+    ResponseFormat.PARQUET: 'application/vnd.apache.parquet',
+}
+
+
+def get_response_format(
+    request: Request,
+    response: Response,
+    format_param: ResponseFormat | None = Query(None, alias='format'),
+) -> ResponseFormat:
+    """Picks the response format from `?format=` or, failing that, the Accept header.
+
+    Columnar formats are only chosen when explicitly requested, so browsers
+    and the admin UI keep getting JSON.
+    """
+    response.headers['Vary'] = 'Accept'
+    if format_param is not None:
+        return format_param
+    accept = request.headers.get('accept', '')
+    for fmt in (ResponseFormat.ARROW, ResponseFormat.PARQUET):
+        if fmt.media_type in accept:
+            return fmt
+    return ResponseFormat.JSON
@@ -1,20 +1,33 @@
 import os
 import shutil
-import sqlite3
 from contextlib import asynccontextmanager
 
-from fastapi import Depends, FastAPI
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from esm_fullstack_challenge import __version__
-from esm_fullstack_challenge.config import CORS_ORIGINS, DB_FILE
+from esm_fullstack_challenge.bulkheads import BulkheadMiddleware, register_bulkheads
+from esm_fullstack_challenge.config import (
+    BULKHEAD_LIMITS, BULKHEADS_ENABLED, CORS_ORIGINS, DB_FILE, METRICS_ENABLED, METRICS_PUBLIC,
+    METRICS_TOKEN, SCHEMA_SNAPSHOT_FILE, SERVER_TIMING,
+)
+from esm_fullstack_challenge.db import DB, PoolTimeout
+from esm_fullstack_challenge.db.analytics import ensure_analytics
+from esm_fullstack_challenge.db.indexes import ensure_indexes
 from esm_fullstack_challenge.db.init_auth import init_users_table
-from esm_fullstack_challenge.auth import get_current_user
+from esm_fullstack_challenge.db.tracking import ensure_change_tracking
+from esm_fullstack_challenge.auth import get_current_user, HashingBusy
+from esm_fullstack_challenge.metrics import MetricsMiddleware
+from esm_fullstack_challenge.openapi import get_cached_openapi
 from esm_fullstack_challenge.routers import (
-    basic_router, dashboard_router, drivers_router, races_router,
+    add_basic_routes, add_export_routes, dashboard_router, drivers_router, metrics_router, races_router,
+    stats_router,
+    BASIC_EXCLUDED_TABLES, EXPORT_EXCLUDED_TABLES,
 )
 from esm_fullstack_challenge.routers.auth import auth_router
 from esm_fullstack_challenge.routers.users import users_router
+from esm_fullstack_challenge.timing import TimedRoute, TimingMiddleware
 
 BUNDLED_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data.db')
 
@@ -26,15 +39,43 @@ async def lifespan(app: FastAPI):
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
         shutil.copy(BUNDLED_DB, DB_FILE)
-    conn = sqlite3.connect(DB_FILE)
-    try:
+    db = DB(DB_FILE)
+    with db.get_connection() as conn:
         init_users_table(conn)
+        ensure_indexes(conn)
+        ensure_change_tracking(conn)
+        ensure_analytics(conn)
+    app.state.db = db
+    try:
+        yield
     finally:
-        conn.close()
-    yield
+        db.close()
+
 
+# Path prefix -> bulkhead; None never waits (health checks, stats). Other paths use 'default'.
+ROUTE_CLASSES = [
+    ('/ping', None),
+    ('/stats', None),
+    ('/metrics', None),
+    ('/auth', 'auth'),
+    ('/dashboard', 'analytics'),
+    ('/export', 'export'),
+]
 
 app = FastAPI(title="F1 DATA API", version=__version__, lifespan=lifespan)
+app.router.route_class = TimedRoute
+if BULKHEADS_ENABLED:
+    # Added before CORS so that shed responses still carry CORS headers
+    app.add_middleware(
+        BulkheadMiddleware,
+        bulkheads=register_bulkheads(BULKHEAD_LIMITS),
+        route_classes=ROUTE_CLASSES,
+    )
+if SERVER_TIMING:
+    # Outside the bulkheads, so the time spent queued is reported too
+    app.add_middleware(TimingMiddleware)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=CORS_ORIGINS.split(','),
@@ -44,8 +85,26 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(PoolTimeout)
+def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={'detail': str(exc)},
+        headers={'Retry-After': '1'},
+    )
+
+
+@app.exception_handler(HashingBusy)
+def hashing_busy_handler(request: Request, exc: HashingBusy):
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={'detail': str(exc)},
+        headers={'Retry-After': '1'},
+    )
+
+
 @app.get("/")
-def root():
+async def root():
     return {
         'name': app.title,
         'version': app.version,
@@ -53,7 +112,7 @@ def root():
 
 
 @app.get("/ping")
-def ping():
+async def ping():
     return {"ping": "pong"}
 
 
@@ -61,7 +120,23 @@ auth_deps = [Depends(get_current_user)]
 
 app.include_router(auth_router, prefix='/auth', tags=['Auth'])
 app.include_router(users_router, prefix='/users', tags=['Users'], dependencies=auth_deps)
-app.include_router(basic_router, prefix='', tags=['Basic'], dependencies=auth_deps)
+add_basic_routes(app.router, exclude_tables=BASIC_EXCLUDED_TABLES, tags=['Basic'], dependencies=auth_deps)
+add_export_routes(
+    app.router, exclude_tables=EXPORT_EXCLUDED_TABLES, prefix='/export', tags=['Export'], dependencies=auth_deps,
+)
 app.include_router(drivers_router, prefix='/drivers', tags=['Drivers'], dependencies=auth_deps)
 app.include_router(races_router, prefix='/races', tags=['Races'], dependencies=auth_deps)
 app.include_router(dashboard_router, prefix='/dashboard', tags=['Dashboard'], dependencies=auth_deps)
+app.include_router(stats_router, prefix='/stats', tags=['Stats'], dependencies=auth_deps)
+# Never served open by accident: without a token the operator has to opt in with METRICS_PUBLIC
+if METRICS_ENABLED and (METRICS_TOKEN or METRICS_PUBLIC):
+    app.include_router(metrics_router, prefix='/metrics', tags=['Metrics'])
+
+
+def openapi():
+    if app.openapi_schema is None:
+        app.openapi_schema = get_cached_openapi(app, SCHEMA_SNAPSHOT_FILE)
+    return app.openapi_schema
+
+
+app.openapi = openapi
@@ -0,0 +1,116 @@
+import re
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Iterator
+
+from prometheus_client import CollectorRegistry, Gauge, Histogram
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from esm_fullstack_challenge.config import METRICS_MAX_SQL_SHAPES
+from esm_fullstack_challenge.timing import record
+
+# Request and SQL metrics; live pool/cache/bulkhead stats are collected per scrape (see routers/metrics.py)
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Time to serve a request, by method, route template and status.',
+    ['method', 'route', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    registry=REGISTRY,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Requests currently being served.',
+    registry=REGISTRY,
+)
+SQL_LATENCY = Histogram(
+    'db_query_duration_seconds',
+    'SQL execution and fetch time, by normalized query shape.',
+    ['shape'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+    registry=REGISTRY,
+)
+
+# Label of requests that matched no route, and of SQL shapes past METRICS_MAX_SQL_SHAPES
+UNMATCHED_ROUTE = 'unmatched'
+OTHER_SHAPE = 'other'
+
+_PLACEHOLDER_LIST = re.compile(r'\?(\s*,\s*\?)+')
+_NUMBER = re.compile(r'\b\d+(\.\d+)?\b')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_WHITESPACE = re.compile(r'\s+')
+_shapes = set()
+
+
+@lru_cache(maxsize=4096)
+def normalize_query(sql: str) -> str:
+    """Reduces a query to its shape: literals become `?`, `IN (?, ?, ...)` becomes `IN (?+)`."""
+    shape = _STRING.sub('?', sql)
+    shape = _NUMBER.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('?+', shape)
+    return _WHITESPACE.sub(' ', shape).strip().rstrip(';').strip()
+
+
+def get_query_shape(sql: str) -> str:
+    """Returns the shape label of a query, capping the number of distinct shapes."""
+    shape = normalize_query(sql)
+    if shape not in _shapes:
+        if len(_shapes) >= METRICS_MAX_SQL_SHAPES:
+            return OTHER_SHAPE
+        _shapes.add(shape)
+    return shape
+
+
+@contextmanager
+def observe_query(sql: str, phase: str | None = 'sql') -> Iterator[None]:
+    """Times the block into the SQL histogram under the query's shape.
+
+    The time is also reported as `phase` of the request timings, unless
+    `phase` is None (e.g. when the caller already times it).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        SQL_LATENCY.labels(get_query_shape(sql)).observe(elapsed)
+        if phase:
+            record(phase, elapsed)
+
+
+class MetricsMiddleware:
+    """Counts in-flight requests and observes their latency by route template.
+
+    The route label is the matched path template (e.g. `/results/{id}`),
+    so the number of series stays bounded by the number of routes.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get('route')
+            REQUEST_LATENCY.labels(
+                scope['method'],
+                getattr(route, 'path', UNMATCHED_ROUTE),
+                str(status_code),
+            ).observe(time.perf_counter() - start)
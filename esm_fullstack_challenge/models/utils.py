@@ -1,47 +1,128 @@
+import hashlib
+import json
+import logging
+import os
 import sqlite3
-from typing import List, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-import pandas as pd
 from pydantic import create_model, Field, BaseModel
 
+from esm_fullstack_challenge.config import SCHEMA_SNAPSHOT_FILE
+from esm_fullstack_challenge.db.indexes import get_rowid_aliases
+from esm_fullstack_challenge.db.utils import get_table_names
+
+logger = logging.getLogger(__name__)
+
+# (column name, declared type, nullable)
+ColumnSchema = Tuple[str, str, bool]
+
 
 def get_all_table_names(conn: sqlite3.Connection) -> List[str]:
-    cursor = conn.cursor()
-    query = "SELECT name FROM sqlite_master WHERE type='table';"
-    cursor.execute(query)
+    return get_table_names(conn)
+
+
+def get_python_type(declared_type: str) -> type:
+    """Maps a declared SQLite column type to a Python type, following SQLite's affinity rules."""
+    declared_type = declared_type.upper()
+    if 'INT' in declared_type:
+        return int
+    if any(t in declared_type for t in ('CHAR', 'CLOB', 'TEXT', 'DATE', 'TIME')):
+        return str
+    if 'BLOB' in declared_type:
+        return bytes
+    if not declared_type:
+        return Any
+    if 'BOOL' in declared_type:
+        return bool
+    return float  # REAL, FLOAT, DOUBLE and other numeric types
+
+
+def get_schema_hash(conn: sqlite3.Connection) -> str:
+    """Hashes the CREATE statements of all data tables."""
+    sql = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type='table';").fetchall())
+    payload = json.dumps([(table, sql[table]) for table in sorted(get_all_table_names(conn))])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_table_schemas(conn: sqlite3.Connection) -> Dict[str, List[ColumnSchema]]:
+    """Reads the columns of every data table with `PRAGMA table_info`, without touching any rows."""
+    tables = get_all_table_names(conn)
+    # An INTEGER PRIMARY KEY is the rowid and is never NULL
+    rowid_aliases = get_rowid_aliases(conn, tables)
+    schemas = {}
+    for table in tables:
+        schemas[table] = [
+            (name, declared_type, not notnull and name != rowid_aliases.get(table))
+            for _, name, declared_type, notnull, _, _ in conn.execute(f'PRAGMA table_info({table})')
+        ]
+    return schemas
+
+
+def load_schema_snapshot(path: str, schema_hash: str | None = None) -> Dict[str, Any] | None:
+    """Returns the snapshot at `path` if it was taken from a schema with `schema_hash` (any schema if None)."""
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return snapshot if schema_hash is None or snapshot.get('schema_hash') == schema_hash else None
 
-    return [row[0] for row in cursor.fetchall()]
 
+def save_schema_snapshot(path: str, snapshot: Dict[str, Any]):
+    """Atomically writes a schema snapshot; failures are logged, not raised."""
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning('Could not write schema snapshot %s: %s', path, e)
 
-def autogen_models(db: str = 'data.db') -> Dict[str, BaseModel]:
+
+def get_schemas(conn: sqlite3.Connection, snapshot_file: str = SCHEMA_SNAPSHOT_FILE) -> Dict[str, List[ColumnSchema]]:
+    """Returns the table schemas, from the snapshot file when it matches the database schema.
+
+    Args:
+        conn (sqlite3.Connection): Connection to the database.
+        snapshot_file (str, optional): Snapshot path; empty to always introspect.
+                                       Defaults to SCHEMA_SNAPSHOT_FILE.
+    """
+    if not snapshot_file:
+        return get_table_schemas(conn)
+    schema_hash = get_schema_hash(conn)
+    snapshot = load_schema_snapshot(snapshot_file, schema_hash)
+    if snapshot is None:
+        snapshot = {'schema_hash': schema_hash, 'tables': get_table_schemas(conn)}
+        save_schema_snapshot(snapshot_file, snapshot)
+    return {table: [tuple(col) for col in columns] for table, columns in snapshot['tables'].items()}
+
+
+def create_table_model(table: str, columns: List[ColumnSchema]) -> BaseModel:
+    """Creates the Pydantic model of a table; nullable columns are Optional but still required."""
+    fields = {}
+    for name, declared_type, nullable in columns:
+        python_type = get_python_type(declared_type)
+        fields[name] = (Optional[python_type] if nullable else python_type, Field())
+    return create_model(f'{"".join(table.replace("_", " ").title().split())}Model', **fields)
+
+
+def autogen_models(db: str = 'data.db', snapshot_file: str = SCHEMA_SNAPSHOT_FILE) -> Dict[str, BaseModel]:
     """Generate Pydantic models for all tables in the SQLite database.
 
+    Only the schema is read (declared column types and NOT NULL
+    constraints), so startup does not depend on the amount of data.
+
     Args:
         db (str, optional): Path to SQLite DB file. Defaults to 'data.db'.
+        snapshot_file (str, optional): Schema snapshot path; empty to disable.
+                                       Defaults to SCHEMA_SNAPSHOT_FILE.
 
     Returns:
         Dict[str, BaseModel]: Returns a dictionary where keys are table names and values are Pydantic models.
     """
     conn = sqlite3.connect(db)
-    tables = get_all_table_names(conn)
-    models = {}
-
-    type_map = {
-        'int64': int,
-        'float64': float,
-        'object': str,
-    }
-
-    for table in tables:
-        df = pd.read_sql_query(f"SELECT * FROM {table}", conn)
-        types = {
-            k: (type_map[str(v)], Field())
-            for k, v in df.dtypes.to_dict().items()
-        }
-        table_model = create_model(
-            f'{"".join(table.replace("_", " ").title().split())}Model',
-            **types,
-        )
-        models[table] = table_model
-
-    return models
+    try:
+        schemas = get_schemas(conn, snapshot_file)
+    finally:
+        conn.close()
+    return {table: create_table_model(table, columns) for table, columns in schemas.items()}
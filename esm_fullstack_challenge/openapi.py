@@ -0,0 +1,45 @@
+import hashlib
+import json
+from typing import Any, Dict
+
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+from esm_fullstack_challenge.config import SCHEMA_SNAPSHOT_FILE
+from esm_fullstack_challenge.models.utils import load_schema_snapshot, save_schema_snapshot
+
+
+def get_routes_fingerprint(app: FastAPI) -> str:
+    """Hashes the app version and the path, methods, endpoint and response model of every route."""
+    routes = sorted(
+        (route.path, sorted(route.methods), route.name, repr(route.response_model))
+        for route in app.routes if isinstance(route, APIRoute)
+    )
+    payload = json.dumps([app.title, app.version, routes])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_cached_openapi(app: FastAPI, snapshot_file: str = SCHEMA_SNAPSHOT_FILE) -> Dict[str, Any]:
+    """Returns the OpenAPI document of `app`, stored in the schema snapshot.
+
+    The document is generated once per schema and set of routes: the
+    snapshot is rewritten (without it) whenever the database schema
+    changes, and a stored document is only used while the routes
+    fingerprint matches. Without a snapshot file it is generated as usual.
+
+    Args:
+        app (FastAPI): Application to document.
+        snapshot_file (str, optional): Schema snapshot path; empty to disable.
+                                       Defaults to SCHEMA_SNAPSHOT_FILE.
+    """
+    snapshot = load_schema_snapshot(snapshot_file) if snapshot_file else None
+    fingerprint = get_routes_fingerprint(app)
+    cached = (snapshot or {}).get('openapi') or {}
+    if cached.get('fingerprint') == fingerprint:
+        return cached['document']
+
+    document = FastAPI.openapi(app)
+    if snapshot is not None:
+        snapshot['openapi'] = {'fingerprint': fingerprint, 'document': document}
+        save_schema_snapshot(snapshot_file, snapshot)
+    return document
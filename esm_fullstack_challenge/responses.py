@@ -0,0 +1,94 @@
+import io
+from typing import Any, Dict, Iterable, Sequence
+
+from fastapi import HTTPException, Response, status
+from fastapi.responses import ORJSONResponse
+
+from esm_fullstack_challenge.dependencies.format import ResponseFormat
+from esm_fullstack_challenge.timing import timed
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail='Columnar formats are not available on this server (pyarrow is not installed)',
+        )
+    return pyarrow
+
+
+def to_arrow_table(columns: Sequence[str], rows: Sequence[tuple]):
+    """Builds an Arrow table from tuple rows, dictionary-encoding string columns.
+
+    Columns beyond `len(columns)` in each row are dropped. Columns whose
+    values have mixed types (SQLite does not enforce them) are sent as strings.
+
+    Args:
+        columns (Sequence[str]): Column names.
+        rows (Sequence[tuple]): Rows as returned by the cursor.
+
+    Returns:
+        pyarrow.Table: Columnar table.
+    """
+    pa = _import_pyarrow()
+    values_by_column: Iterable[Sequence[Any]] = zip(*rows) if rows else ([] for _ in columns)
+    names, arrays = [], []
+    for name, values in zip(columns, values_by_column):
+        try:
+            array = pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            array = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+        if pa.types.is_string(array.type):
+            array = array.dictionary_encode()
+        names.append(name)
+        arrays.append(array)
+    return pa.Table.from_arrays(arrays, names=names)
+
+
+def encode_columnar(columns: Sequence[str], rows: Sequence[tuple], fmt: ResponseFormat) -> bytes:
+    """Encodes rows as an Arrow IPC stream or a Parquet file.
+
+    CPU-bound for large pages, so call it off the event loop (e.g. inside
+    the `db.aio.run` callable that fetched the rows).
+
+    Args:
+        columns (Sequence[str]): Column names.
+        rows (Sequence[tuple]): Rows as returned by the cursor.
+        fmt (ResponseFormat): ARROW or PARQUET.
+
+    Raises:
+        HTTPException: 406 if pyarrow is not installed.
+
+    Returns:
+        bytes: Encoded body.
+    """
+    pa = _import_pyarrow()
+    with timed('serialize'):
+        table = to_arrow_table(columns, rows)
+        if fmt is ResponseFormat.PARQUET:
+            import pyarrow.parquet as pq
+
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer)
+            return buffer.getvalue()
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+def columnar_response(body: bytes, fmt: ResponseFormat, headers: Dict[str, str] | None = None) -> Response:
+    """Wraps a body from `encode_columnar` in a response with the format's media type."""
+    return Response(content=body, media_type=fmt.media_type, headers=headers)
+
+
+def fast_json_response(content: Any, headers: Dict[str, str] | None = None) -> Response:
+    """Serializes trusted DB rows straight to JSON bytes with orjson.
+
+    Returning a Response skips the route's `response_model` validation, so
+    only use it for rows read from tables the route's model was generated from.
+    """
+    with timed('serialize'):
+        return ORJSONResponse(content=content, headers=headers)
@@ -1,8 +1,12 @@
 # flake8: noqa
-from esm_fullstack_challenge.routers.basic import basic_router
+from esm_fullstack_challenge.routers.basic import (
+    add_basic_routes, add_export_routes, BASIC_EXCLUDED_TABLES, EXPORT_EXCLUDED_TABLES,
+)
 from esm_fullstack_challenge.routers.dashboard import dashboard_router
 from esm_fullstack_challenge.routers.drivers import drivers_router
 from esm_fullstack_challenge.routers.races import races_router
 from esm_fullstack_challenge.routers.auth import auth_router
 from esm_fullstack_challenge.routers.users import users_router
-from esm_fullstack_challenge.routers.utils import get_route_list_function, get_route_id_function
+from esm_fullstack_challenge.routers.stats import stats_router
+from esm_fullstack_challenge.routers.metrics import metrics_router
+from esm_fullstack_challenge.routers.utils import get_route_list_function, get_route_id_function, get_route_export_function
@@ -1,21 +1,23 @@
+import sqlite3
+
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from esm_fullstack_challenge.db import DB
 from esm_fullstack_challenge.dependencies import get_db
 from esm_fullstack_challenge.auth import (
     authenticate_user, create_access_token, get_current_user,
-    verify_password, hash_password,
+    invalidate_cached_users, password_hasher,
     Token, LoginRequest, UserResponse, ChangePasswordRequest,
     UpdateProfileRequest,
 )
+from esm_fullstack_challenge.timing import TimedRoute
 
-auth_router = APIRouter()
+auth_router = APIRouter(route_class=TimedRoute)
 
 
 @auth_router.post("/login", response_model=Token)
-def login(form_data: LoginRequest, db: DB = Depends(get_db)):
-    with db.get_connection() as conn:
-        user = authenticate_user(conn, form_data.username, form_data.password)
+async def login(form_data: LoginRequest, db: DB = Depends(get_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -73,28 +75,34 @@ def update_profile(
             " must_change_password, is_active FROM users WHERE id = ?",
             (current_user.id,),
         ).fetchone()
+    invalidate_cached_users()
     return dict(row)
 
 
+def _get_password_hash(conn: sqlite3.Connection, user_id: int) -> str | None:
+    row = conn.execute("SELECT hashed_password FROM users WHERE id = ?", (user_id,)).fetchone()
+    return row[0] if row else None
+
+
+def _set_password(conn: sqlite3.Connection, user_id: int, hashed_password: str):
+    conn.execute(
+        "UPDATE users SET hashed_password = ?, must_change_password = 0 WHERE id = ?",
+        (hashed_password, user_id),
+    )
+
+
 @auth_router.put("/me/password")
-def change_password(
+async def change_password(
     body: ChangePasswordRequest,
     current_user: UserResponse = Depends(get_current_user),
     db: DB = Depends(get_db),
 ):
-    with db.get_connection() as conn:
-        conn.row_factory = None
-        row = conn.execute(
-            "SELECT hashed_password FROM users WHERE id = ?",
-            (current_user.id,),
-        ).fetchone()
-        if not row or not verify_password(body.current_password, row[0]):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Current password is incorrect",
-            )
-        conn.execute(
-            "UPDATE users SET hashed_password = ?, must_change_password = 0 WHERE id = ?",
-            (hash_password(body.new_password), current_user.id),
+    hashed_password = await db.aio.run(_get_password_hash, current_user.id)
+    if not hashed_password or not await password_hasher.verify(body.current_password, hashed_password):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Current password is incorrect",
         )
+    await db.aio.run(_set_password, current_user.id, await password_hasher.hash(body.new_password))
+    invalidate_cached_users()
     return {"detail": "Password updated successfully"}
@@ -1,22 +1,37 @@
-from typing import List
+from typing import Any, List
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
 from esm_fullstack_challenge.models import AutoGenModels
 from esm_fullstack_challenge.routers.utils import \
-    get_route_list_function, get_route_id_function
+    get_route_list_function, get_route_id_function, get_route_export_function
+
+
+# Tables served by their own routers, or not at all
+BASIC_EXCLUDED_TABLES = ['drivers', 'races', 'users', 'sqlite_sequence']
+EXPORT_EXCLUDED_TABLES = ['users', 'sqlite_sequence']
 
 
 def add_basic_routes(
         router: APIRouter,
-        exclude_tables: list[str] | None = None
+        exclude_tables: list[str] | None = None,
+        prefix: str = '',
+        **route_kwargs: Any,
 ):
     """Adds basic endpoint routes to a route for listing all items or
        getting a single item by id.
 
+    The app adds these straight to its own router (with `prefix`, `tags`
+    and `dependencies`) rather than including a prebuilt router, since
+    `include_router` rebuilds every route and the generated routes are
+    the bulk of startup time.
+
     Args:
         router (APIRouter): FastAPI router to add routes to
         exclude_tables (list[str] | None, optional): List of tables to skip. Defaults to None.
+        prefix (str, optional): Path prefix of the routes. Defaults to ''.
+        **route_kwargs: Extra `add_api_route` arguments, e.g. tags and dependencies.
     """
     for table, table_model in AutoGenModels.items():
         if exclude_tables and table in exclude_tables:
@@ -26,20 +41,46 @@ def add_basic_routes(
             table, table_model
         )
         router.add_api_route(
-            f'/{table}',
+            f'{prefix}/{table}',
             route_list_func,
             methods=["GET"],
             response_model=List[table_model],
+            **route_kwargs,
         )
 
         route_id_function = get_route_id_function(table, table_model)
         router.add_api_route(
-            f'/{table}/' + '{id}',
+            f'{prefix}/{table}/' + '{id}',
             route_id_function,
             methods=["GET"],
             response_model=table_model,
+            **route_kwargs,
         )
 
 
-basic_router = APIRouter()
-add_basic_routes(basic_router, exclude_tables=['drivers', 'races', 'users', 'sqlite_sequence'])
+def add_export_routes(
+        router: APIRouter,
+        exclude_tables: list[str] | None = None,
+        prefix: str = '',
+        **route_kwargs: Any,
+):
+    """Adds a streaming export route (NDJSON or CSV) for each table.
+
+    Args:
+        router (APIRouter): FastAPI router to add routes to
+        exclude_tables (list[str] | None, optional): List of tables to skip. Defaults to None.
+        prefix (str, optional): Path prefix of the routes. Defaults to ''.
+        **route_kwargs: Extra `add_api_route` arguments, e.g. tags and dependencies.
+    """
+    for table in AutoGenModels:
+        if exclude_tables and table in exclude_tables:
+            continue
+
+        router.add_api_route(
+            f'{prefix}/{table}',
+            get_route_export_function(table),
+            methods=["GET"],
+            response_class=StreamingResponse,
+            responses={200: {'content': {'application/x-ndjson': {}, 'text/csv': {}}}},
+            **route_kwargs,
+        )
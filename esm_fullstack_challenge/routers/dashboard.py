@@ -1,110 +1,372 @@
-from typing import Optional
+import asyncio
+import json
+import logging
+import sqlite3
+from typing import Any, Callable, Hashable, List, Optional, Sequence, Tuple
 
-import pandas as pd
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 
+from esm_fullstack_challenge.cache import MISSING, TTLCache
+from esm_fullstack_challenge.config import DASHBOARD_CACHE_MAX_BYTES, DASHBOARD_CACHE_TTL
 from esm_fullstack_challenge.db import DB, query_builder
-from esm_fullstack_challenge.dependencies import get_db, CommonQueryParams
+from esm_fullstack_challenge.db.tracking import get_table_versions
+from esm_fullstack_challenge.dependencies import (
+    conditional_get, get_db, get_response_format, CommonQueryParams, ResponseFormat,
+)
+from esm_fullstack_challenge.metrics import observe_query
+from esm_fullstack_challenge.responses import columnar_response, encode_columnar
+from esm_fullstack_challenge.routers.utils import fetch_columns
+from esm_fullstack_challenge.timing import timed, TimedRoute
 
 
-dashboard_router = APIRouter()
+logger = logging.getLogger(__name__)
 
+dashboard_router = APIRouter(route_class=TimedRoute)
 
-@dashboard_router.get("/top_drivers_by_wins")
-def get_top_drivers_by_wins(
+dashboard_cache = TTLCache('dashboard', max_bytes=DASHBOARD_CACHE_MAX_BYTES, ttl=DASHBOARD_CACHE_TTL)
+
+# Tables each endpoint reads; writes to them invalidate its ETags and cached results
+TOP_DRIVERS_TABLES = ('drivers', 'results', 'status')
+CHAMPIONSHIP_PROGRESSION_TABLES = ('driver_standings', 'races', 'drivers')
+CONSTRUCTOR_WINS_TABLES = ('constructor_standings', 'races', 'constructors')
+
+# The dashboard reads the summary tables maintained by `db.analytics`
+TOP_DRIVERS_BY_WINS_QUERY = (
+    "with driver_wins as (\n"
+    "    select d.id,\n"
+    "        d.forename || ' ' || d.surname as full_name,\n"
+    "        d.nationality,\n"
+    "        d.dob,\n"
+    "        date() - date(dob)             as age,\n"
+    "        d.url,\n"
+    "        w.wins                         as number_of_wins\n"
+    "    from _driver_wins w\n"
+    "          join drivers d on d.id = w.driver_id\n"
+    ")\n"
+    "select * from driver_wins"
+)
+
+LATEST_SEASON_QUERY = "SELECT MAX(year) FROM races"
+
+CHAMPIONSHIP_PROGRESSION_QUERY = (
+    "SELECT round, race_name, driver_id, driver_name, points, year AS season"
+    " FROM _driver_progression"
+    " WHERE year IN ({seasons})"
+    " ORDER BY year, round, points DESC"
+)
+
+# Most seasons a single championship progression request may ask for
+MAX_PROGRESSION_SEASONS = 10
+
+CONSTRUCTOR_WINS_BY_ERA_QUERY = (
+    "SELECT year AS season, constructor_name, wins"
+    " FROM _constructor_season_wins"
+    " ORDER BY year, wins DESC"
+)
+
+
+def get_top_drivers_by_wins_query(cqp: CommonQueryParams) -> Tuple[str, List[Any]]:
+    """Builds the top drivers by wins query for the given query params."""
+    return query_builder(
+        custom_select=TOP_DRIVERS_BY_WINS_QUERY,
+        order_by=cqp.order_by or [('number_of_wins', 'desc')],
+        limit=cqp.limit,
+        offset=cqp.offset,
+        filter_by=cqp.filter_by,
+    )
+
+
+def get_championship_progression_query(seasons: Sequence[int]) -> Tuple[str, List[Any]]:
+    """Builds the championship progression query for one or more seasons."""
+    return CHAMPIONSHIP_PROGRESSION_QUERY.format(seasons=', '.join('?' for _ in seasons)), list(seasons)
+
+
+def parse_seasons(seasons: str) -> List[int]:
+    """Parses a comma-separated list of seasons, e.g. `2019,2020`."""
+    try:
+        parsed = sorted({int(season) for season in seasons.split(',') if season.strip()})
+    except ValueError:
+        parsed = []
+    if not 0 < len(parsed) <= MAX_PROGRESSION_SEASONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'seasons must list 1 to {MAX_PROGRESSION_SEASONS} comma-separated years',
+        )
+    return parsed
+
+
+def progression_matrix(columns: Sequence[str], rows: List[tuple]) -> List[dict]:
+    """Pivots progression rows into one dense drivers x rounds points matrix per season.
+
+    Drivers (pivoted by id, so namesakes stay apart) are ordered by their
+    points after the last round. A round a driver missed carries their
+    previous points forward; rounds before their first start are null.
+    """
+    with timed('pandas'):
+        import pandas as pd  # only needed here; importing it costs more than the rest of the app
+
+        df = pd.DataFrame.from_records(rows, columns=columns)
+        matrices = []
+        for season, group in df.groupby('season', sort=True):
+            points = group.pivot_table(
+                index='driver_id', columns='round', values='points', aggfunc='max',
+            ).ffill(axis=1)
+            points = points.sort_values(points.columns[-1], ascending=False, na_position='last')
+            race_names = group.drop_duplicates('round').set_index('round')['race_name']
+            driver_names = group.drop_duplicates('driver_id').set_index('driver_id')['driver_name']
+            matrices.append({
+                'season': int(season),
+                'rounds': points.columns.tolist(),
+                'race_names': race_names.reindex(points.columns).tolist(),
+                'driver_ids': points.index.tolist(),
+                'drivers': driver_names.reindex(points.index).tolist(),
+                'points': points.astype(object).where(points.notna(), None).to_numpy().tolist(),
+            })
+    return matrices
+
+
+def cached_fetch(
+        conn: sqlite3.Connection,
+        key: Hashable,
+        tables: Sequence[str],
+        fetch: Callable[..., Any],
+        *args,
+) -> Any:
+    """Returns `fetch(conn, *args)` from the dashboard cache, tagged with the versions of `tables`.
+
+    Results of untracked tables are not cached.
+    """
+    versions = get_table_versions(conn, tables)
+    if len(versions) < len(set(tables)):
+        return fetch(conn, *args)
+    tag = tuple(sorted(versions.items()))
+    result = dashboard_cache.get(key, tag=tag)
+    if result is MISSING:
+        result = fetch(conn, *args)
+        dashboard_cache.set(key, result, tag=tag)
+    return result
+
+
+async def fetch_top_drivers_by_wins(db: DB, cqp: CommonQueryParams) -> Tuple[Tuple[str, ...], List[tuple]]:
+    """Returns the (cached) columns and rows of the top drivers by wins."""
+    query_str, params = get_top_drivers_by_wins_query(cqp)
+    key = ('top_drivers_by_wins', json.dumps(cqp.as_dict(), sort_keys=True))
+    return await db.aio.run(cached_fetch, key, TOP_DRIVERS_TABLES, fetch_columns, query_str, params)
+
+
+def fetch_progression(conn: sqlite3.Connection, season_list: Optional[List[int]]):
+    """Returns the progression columns and rows of the given seasons, or of the latest one."""
+    if season_list is None:
+        with observe_query(LATEST_SEASON_QUERY):
+            season_list = [conn.execute(LATEST_SEASON_QUERY).fetchone()[0]]
+    return fetch_columns(conn, *get_championship_progression_query(season_list))
+
+
+def get_progression_key(season_list: Optional[List[int]]) -> Hashable:
+    return ('championship_progression', tuple(season_list) if season_list else None)
+
+
+async def fetch_championship_progression(
+        db: DB,
+        season_list: Optional[List[int]],
+) -> Tuple[Tuple[str, ...], List[tuple]]:
+    """Returns the (cached) progression rows of the given seasons, or of the latest one."""
+    return await db.aio.run(
+        cached_fetch, get_progression_key(season_list), CHAMPIONSHIP_PROGRESSION_TABLES,
+        fetch_progression, season_list,
+    )
+
+
+async def fetch_progression_matrix(db: DB, season_list: Optional[List[int]]) -> List[dict]:
+    """Returns `progression_matrix` of the (cached) progression rows, pivoted in the DB executor."""
+    def fetch_matrix(conn: sqlite3.Connection) -> List[dict]:
+        columns, rows = cached_fetch(
+            conn, get_progression_key(season_list), CHAMPIONSHIP_PROGRESSION_TABLES,
+            fetch_progression, season_list,
+        )
+        return progression_matrix(columns, rows) if rows else []
+
+    return await db.aio.run(fetch_matrix)
+
+
+async def fetch_constructor_wins_by_era(db: DB) -> Tuple[Tuple[str, ...], List[tuple]]:
+    """Returns the (cached) constructor wins per season."""
+    return await db.aio.run(
+        cached_fetch, ('constructor_wins_by_era',), CONSTRUCTOR_WINS_TABLES,
+        fetch_columns, CONSTRUCTOR_WINS_BY_ERA_QUERY,
+    )
+
+
+def to_records(columns: Sequence[str], rows: List[tuple]) -> List[dict]:
+    return [dict(zip(columns, row)) for row in rows]
+
+
+async def format_rows(
+        db: DB,
+        columns: Sequence[str],
+        rows: List[tuple],
+        fmt: ResponseFormat,
+        response: Response,
+):
+    """Returns rows as JSON records or as a columnar response encoded in the DB executor."""
+    if fmt is ResponseFormat.JSON:
+        return to_records(columns, rows)
+    body = await db.aio.call(encode_columnar, columns, rows, fmt)
+    return columnar_response(body, fmt, headers=dict(response.headers))
+
+
+@dashboard_router.get(
+    "/top_drivers_by_wins",
+    dependencies=[Depends(conditional_get(*TOP_DRIVERS_TABLES))],
+)
+async def get_top_drivers_by_wins(
+    response: Response,
     cqp: CommonQueryParams = Depends(CommonQueryParams),
+    fmt: ResponseFormat = Depends(get_response_format),
     db: DB = Depends(get_db)
 ) -> list:
     """Gets top drivers by wins.
 
     Args:
+        response (Response): Response whose headers columnar responses keep.
         cqp (CommonQueryParams, optional): Common query params used for filtering.
                                            Defaults to Depends(CommonQueryParams).
+        fmt (ResponseFormat, optional): JSON, Arrow or Parquet.
+                                        Defaults to Depends(get_response_format).
         db (DB, optional): SQLite DB connection. Defaults to Depends(get_db).
 
     Returns:
         list: list of top drivers by wins.
     """
-    base_query_str = (
-        "with driver_wins as (\n"
-        "    select d.id,\n"
-        "        d.forename || ' ' || d.surname as full_name,\n"
-        "        d.nationality,\n"
-        "        d.dob,\n"
-        "        date() - date(dob)             as age,\n"
-        "        d.url\n"
-        "    from drivers d\n"
-        "          join results r on d.id = r.driver_id\n"
-        "          join status s on r.status_id = s.id\n"
-        "    where s.status = 'Finished'\n"
-        "    and r.position_order = 1\n"
-        ")\n"
-        "select\n"
-        "    *,\n"
-        "    count(*) as number_of_wins\n"
-        "from driver_wins"
-    )
-    query_str = query_builder(
-        custom_select=base_query_str,
-        order_by=cqp.order_by or [('number_of_wins', 'desc')],
-        limit=cqp.limit,
-        offset=cqp.offset,
-        filter_by=cqp.filter_by,
-        group_by=['id', 'full_name', 'nationality', 'dob', 'age', 'url']
-    )
-    with db.get_connection() as conn:
-        df = pd.read_sql_query(query_str, conn)
-        drivers = list(df.to_dict(orient='records'))
+    columns, rows = await fetch_top_drivers_by_wins(db, cqp)
+    return await format_rows(db, columns, rows, fmt, response)
 
-    return drivers
 
-
-@dashboard_router.get("/championship_progression")
-def get_championship_progression(
+@dashboard_router.get(
+    "/championship_progression",
+    dependencies=[Depends(conditional_get(*CHAMPIONSHIP_PROGRESSION_TABLES))],
+)
+async def get_championship_progression(
+    response: Response,
     season: Optional[int] = Query(None),
+    seasons: Optional[str] = Query(None, description='Comma-separated seasons, e.g. 2019,2020'),
+    shape: str = Query('rows', pattern='^(rows|matrix)$'),
+    fmt: ResponseFormat = Depends(get_response_format),
     db: DB = Depends(get_db),
 ) -> list:
-    """Get championship points progression by round for a season."""
-    with db.get_connection() as conn:
-        if season is None:
-            row = conn.execute(
-                "SELECT MAX(year) FROM races"
-            ).fetchone()
-            season = row[0]
-
-        df = pd.read_sql_query(
-            "SELECT r.round, r.name AS race_name,"
-            "       d.forename || ' ' || d.surname AS driver_name,"
-            "       ds.points"
-            " FROM driver_standings ds"
-            " JOIN races r ON ds.race_id = r.id"
-            " JOIN drivers d ON ds.driver_id = d.id"
-            " WHERE r.year = ?"
-            " ORDER BY r.round, ds.points DESC",
-            conn,
-            params=[season],
+    """Get championship points progression by round for one or more seasons.
+
+    Args:
+        response (Response): Response whose headers columnar responses keep.
+        season (Optional[int], optional): Season to return. Defaults to the latest season.
+        seasons (Optional[str], optional): Comma-separated seasons; overrides `season`.
+        shape (str, optional): `rows` for one record per (round, driver), or `matrix` for
+                               rounds, drivers and a dense points matrix per season.
+                               Defaults to 'rows'.
+        fmt (ResponseFormat, optional): JSON, Arrow or Parquet (rows only).
+                                        Defaults to Depends(get_response_format).
+        db (DB, optional): SQLite DB connection. Defaults to Depends(get_db).
+
+    Returns:
+        list: Progression records, or one matrix per season.
+    """
+    if shape == 'matrix' and fmt is not ResponseFormat.JSON:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='shape=matrix is only available as JSON',
         )
-    records = df.to_dict(orient='records')
-    for r in records:
-        r['season'] = season
-    return list(records)
+    season_list = parse_seasons(seasons) if seasons else ([season] if season is not None else None)
+    if shape == 'matrix':
+        return await fetch_progression_matrix(db, season_list)
+    columns, rows = await fetch_championship_progression(db, season_list)
+    return await format_rows(db, columns, rows, fmt, response)
 
 
-@dashboard_router.get("/constructor_wins_by_era")
-def get_constructor_wins_by_era(
+@dashboard_router.get(
+    "/constructor_wins_by_era",
+    dependencies=[Depends(conditional_get(*CONSTRUCTOR_WINS_TABLES))],
+)
+async def get_constructor_wins_by_era(
+    response: Response,
+    fmt: ResponseFormat = Depends(get_response_format),
     db: DB = Depends(get_db),
 ) -> list:
     """Get constructor race wins per season across all eras."""
-    with db.get_connection() as conn:
-        df = pd.read_sql_query(
-            "SELECT r.year AS season, c.name AS constructor_name,"
-            "       MAX(cs.wins) AS wins"
-            " FROM constructor_standings cs"
-            " JOIN races r ON cs.race_id = r.id"
-            " JOIN constructors c ON cs.constructor_id = c.id"
-            " GROUP BY r.year, c.name"
-            " HAVING MAX(cs.wins) > 0"
-            " ORDER BY r.year, wins DESC",
-            conn,
+    columns, rows = await fetch_constructor_wins_by_era(db)
+    return await format_rows(db, columns, rows, fmt, response)
+
+
+@dashboard_router.get(
+    "/bundle",
+    dependencies=[Depends(conditional_get(*sorted(set(
+        TOP_DRIVERS_TABLES + CHAMPIONSHIP_PROGRESSION_TABLES + CONSTRUCTOR_WINS_TABLES
+    ))))],
+)
+async def get_dashboard_bundle(
+    widgets: str = Query(
+        'top_drivers_by_wins,championship_progression,constructor_wins_by_era',
+        description='Comma-separated widget names',
+    ),
+    cqp: CommonQueryParams = Depends(CommonQueryParams),
+    season: Optional[int] = Query(None),
+    seasons: Optional[str] = Query(None, description='Comma-separated seasons, e.g. 2019,2020'),
+    shape: str = Query('rows', pattern='^(rows|matrix)$'),
+    db: DB = Depends(get_db),
+) -> dict:
+    """Gets several dashboard widgets in one request.
+
+    The widgets run concurrently, each on its own pooled connection. A
+    failing widget reports its error without failing the others. Each
+    widget's time is reported in the Server-Timing header as
+    `widget_<name>`, not in the body, so the body (and its ETag) only
+    changes with the data.
+
+    Args:
+        widgets (str, optional): Comma-separated widget names. Defaults to all widgets.
+        cqp (CommonQueryParams, optional): filter/range/sort for `top_drivers_by_wins`.
+                                           Defaults to Depends(CommonQueryParams).
+        season (Optional[int], optional): Season for `championship_progression`.
+        seasons (Optional[str], optional): Comma-separated seasons for `championship_progression`.
+        shape (str, optional): `rows` or `matrix` for `championship_progression`. Defaults to 'rows'.
+        db (DB, optional): SQLite DB connection. Defaults to Depends(get_db).
+
+    Returns:
+        dict: `{'widgets': {name: {'data': ...} | {'error': ..., 'status': ...}}}`.
+    """
+    async def top_drivers_by_wins():
+        return to_records(*await fetch_top_drivers_by_wins(db, cqp))
+
+    async def championship_progression():
+        season_list = parse_seasons(seasons) if seasons else ([season] if season is not None else None)
+        if shape == 'matrix':
+            return await fetch_progression_matrix(db, season_list)
+        return to_records(*await fetch_championship_progression(db, season_list))
+
+    async def constructor_wins_by_era():
+        return to_records(*await fetch_constructor_wins_by_era(db))
+
+    available = {
+        'top_drivers_by_wins': top_drivers_by_wins,
+        'championship_progression': championship_progression,
+        'constructor_wins_by_era': constructor_wins_by_era,
+    }
+    names = list(dict.fromkeys(name.strip() for name in widgets.split(',') if name.strip()))
+    unknown = [name for name in names if name not in available]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Unknown widgets: {unknown}; available: {list(available)}',
         )
-    return list(df.to_dict(orient='records'))
+
+    async def evaluate(name: str) -> Tuple[str, dict]:
+        with timed(f'widget_{name}'):
+            try:
+                return name, {'data': await available[name]()}
+            except HTTPException as exc:
+                return name, {'error': exc.detail, 'status': exc.status_code}
+            except Exception:
+                logger.exception('Dashboard widget %s failed', name)
+                return name, {'error': 'Internal server error', 'status': status.HTTP_500_INTERNAL_SERVER_ERROR}
+
+    results = await asyncio.gather(*(evaluate(name) for name in names))
+    return {'widgets': dict(results)}
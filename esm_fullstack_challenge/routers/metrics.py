@@ -0,0 +1,99 @@
+import secrets
+from typing import Iterator
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+
+from esm_fullstack_challenge.auth import password_hasher
+from esm_fullstack_challenge.bulkheads import BULKHEADS
+from esm_fullstack_challenge.cache import CACHES
+from esm_fullstack_challenge.config import METRICS_PUBLIC, METRICS_TOKEN
+from esm_fullstack_challenge.db import DB
+from esm_fullstack_challenge.dependencies import get_db
+from esm_fullstack_challenge.metrics import REGISTRY
+from esm_fullstack_challenge.timing import TimedRoute
+
+
+metrics_router = APIRouter(route_class=TimedRoute)
+
+
+class StatsCollector:
+    """Exposes the pool, cache, bulkhead and hashing stats of /stats as Prometheus metrics.
+
+    Read at scrape time from the live objects, so nothing is counted twice
+    on the request path.
+    """
+    def __init__(self, db: DB):
+        self.db = db
+
+    def collect(self) -> Iterator[Metric]:
+        pool = self.db.pool.stats()
+        connections = GaugeMetricFamily(
+            'db_pool_connections', 'Pooled SQLite connections by state.', labels=['state'],
+        )
+        for state in ('open', 'idle', 'in_use'):
+            connections.add_metric([state], pool[state])
+        yield connections
+        yield GaugeMetricFamily('db_pool_max_size', 'Connection pool size limit.', value=pool['max_size'])
+        yield GaugeMetricFamily('db_pool_waiting', 'Threads waiting for a pooled connection.', value=pool['waiting'])
+        yield CounterMetricFamily('db_pool_connections_created', 'Connections opened.', value=pool['created'])
+
+        caches = {name: cache.stats() for name, cache in CACHES.items()}
+        caches['totals'] = self.db.totals.stats()
+        counters = {
+            name: CounterMetricFamily(f'cache_{name}', f'Cache {name}.', labels=['cache'])
+            for name in ('hits', 'misses', 'evictions', 'invalidations')
+        }
+        gauges = {
+            'entries': GaugeMetricFamily('cache_entries', 'Cached entries.', labels=['cache']),
+            'bytes': GaugeMetricFamily('cache_bytes', 'Estimated cache memory.', labels=['cache']),
+        }
+        for cache, stats in caches.items():
+            for key, family in (*counters.items(), *gauges.items()):
+                if key in stats:
+                    family.add_metric([cache], stats[key])
+        yield from counters.values()
+        yield from gauges.values()
+
+        bulkhead_gauges = {
+            key: GaugeMetricFamily(f'bulkhead_{key}', f'Requests {key} per route class.', labels=['route_class'])
+            for key in ('active', 'queued')
+        }
+        bulkhead_counters = {
+            key: CounterMetricFamily(f'bulkhead_{key}', f'Requests {key} per route class.', labels=['route_class'])
+            for key in ('admitted', 'shed', 'timed_out')
+        }
+        for name, bulkhead in BULKHEADS.items():
+            stats = bulkhead.stats()
+            for key, family in (*bulkhead_gauges.items(), *bulkhead_counters.items()):
+                family.add_metric([name], stats[key])
+        yield from bulkhead_gauges.values()
+        yield from bulkhead_counters.values()
+
+        hashing = password_hasher.stats()
+        for key in ('running', 'queued'):
+            yield GaugeMetricFamily(f'password_hashing_{key}', f'Password hashes {key}.', value=hashing[key])
+        for key in ('completed', 'rejected', 'timed_out'):
+            yield CounterMetricFamily(f'password_hashing_{key}', f'Password hashes {key}.', value=hashing[key])
+
+
+def render_metrics(db: DB) -> bytes:
+    """Renders the request/SQL metrics and the live stats in the Prometheus text format."""
+    stats = CollectorRegistry(auto_describe=False)
+    stats.register(StatsCollector(db))
+    return generate_latest(REGISTRY) + generate_latest(stats)
+
+
+def check_metrics_token(authorization: str | None = Header(None)):
+    """Requires the METRICS_TOKEN bearer token, unless METRICS_PUBLIC opts into an open endpoint."""
+    if not METRICS_TOKEN and METRICS_PUBLIC:
+        return
+    if not METRICS_TOKEN or not secrets.compare_digest(authorization or '', f'Bearer {METRICS_TOKEN}'):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail='Invalid metrics token')
+
+
+@metrics_router.get('', dependencies=[Depends(check_metrics_token)], include_in_schema=False)
+def get_metrics(db: DB = Depends(get_db)) -> Response:
+    """Gets all metrics in the Prometheus text exposition format."""
+    return Response(content=render_metrics(db), media_type=CONTENT_TYPE_LATEST)
@@ -5,9 +5,10 @@ from fastapi import APIRouter
 from esm_fullstack_challenge.models import AutoGenModels
 from esm_fullstack_challenge.routers.utils import \
     get_route_list_function, get_route_id_function
+from esm_fullstack_challenge.timing import TimedRoute
 
 
-races_router = APIRouter()
+races_router = APIRouter(route_class=TimedRoute)
 
 table_model = AutoGenModels['races']
 
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends
+
+from esm_fullstack_challenge.auth import password_hasher
+from esm_fullstack_challenge.bulkheads import BULKHEADS
+from esm_fullstack_challenge.cache import CACHES
+from esm_fullstack_challenge.db import DB
+from esm_fullstack_challenge.dependencies import get_db
+from esm_fullstack_challenge.timing import TimedRoute
+
+
+stats_router = APIRouter(route_class=TimedRoute)
+
+
+@stats_router.get("/db")
+def get_db_stats(db: DB = Depends(get_db)) -> dict:
+    """Gets connection pool statistics (open, idle, in use, waiting, created)."""
+    return db.pool.stats()
+
+
+@stats_router.get("/totals")
+def get_totals_stats(db: DB = Depends(get_db)) -> dict:
+    """Gets Content-Range totals cache statistics."""
+    return db.totals.stats()
+
+
+@stats_router.get("/cache")
+def get_cache_stats() -> dict:
+    """Gets statistics of every in-process result cache, by name."""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+@stats_router.get("/hashing")
+def get_hashing_stats() -> dict:
+    """Gets password hashing pool statistics (running, queued, rejected, timed out)."""
+    return password_hasher.stats()
+
+
+@stats_router.get("/bulkheads")
+def get_bulkhead_stats() -> dict:
+    """Gets live concurrency and queue depth of every route class bulkhead, by name."""
+    return {name: bulkhead.stats() for name, bulkhead in BULKHEADS.items()}
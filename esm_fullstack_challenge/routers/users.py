@@ -1,17 +1,20 @@
 import secrets
+import sqlite3
 import string
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
 
 from esm_fullstack_challenge.db import DB
 from esm_fullstack_challenge.db.init_auth import AVATAR_BASE_URL
-from esm_fullstack_challenge.dependencies import get_db, CommonQueryParams
+from esm_fullstack_challenge.dependencies import conditional_get, get_db, CommonQueryParams
+from esm_fullstack_challenge.metrics import observe_query
 from esm_fullstack_challenge.auth import (
-    hash_password, get_user_by_id, require_admin,
+    get_user_by_id, invalidate_cached_users, password_hasher, require_admin,
     CreateUserRequest, UpdateUserRequest, UserResponse,
 )
+from esm_fullstack_challenge.timing import timed, TimedRoute
 
-users_router = APIRouter()
+users_router = APIRouter(route_class=TimedRoute)
 
 USER_COLUMNS = "id, username, full_name, avatar, role, must_change_password, is_active"
 
@@ -33,7 +36,7 @@ def _row_to_response(row: dict) -> dict:
     }
 
 
-@users_router.get("")
+@users_router.get("", dependencies=[Depends(conditional_get("users"))])
 def list_users(
     response: Response,
     cqp: CommonQueryParams = Depends(CommonQueryParams),
@@ -50,25 +53,32 @@ def list_users(
             order_clause = f" ORDER BY {col} {direction}"
 
         limit_clause = ""
+        params = []
         if cqp.limit is not None:
-            limit_clause = f" LIMIT {cqp.limit} OFFSET {cqp.offset}"
-
-        rows = conn.execute(
-            f"SELECT {USER_COLUMNS} FROM users WHERE is_active = 1{order_clause}{limit_clause}"
-        ).fetchall()
-
-        count = conn.execute("SELECT COUNT(*) FROM users WHERE is_active = 1").fetchone()[0]
+            limit_clause = " LIMIT ? OFFSET ?"
+            params = [cqp.limit, cqp.offset]
+
+        query_str = f"SELECT {USER_COLUMNS} FROM users WHERE is_active = 1{order_clause}{limit_clause}"
+        with observe_query(query_str):
+            rows = conn.execute(query_str, params).fetchall()
+
+        with timed("count"):
+            count, _ = db.totals.get_total(
+                conn, 'users',
+                ("SELECT COUNT(*) FROM users WHERE is_active = ?", [1]),
+                [('is_active', 1)],
+            )
 
     data = [_row_to_response(dict(r)) for r in rows]
 
-    response.headers['Access-Control-Expose-Headers'] = 'Content-Range'
+    response.headers['Access-Control-Expose-Headers'] = 'Content-Range, ETag'
     response.headers['Content-Range'] = (
         f'users {cqp.offset}-{cqp.offset + len(data) - 1}/{count}'
     )
     return data
 
 
-@users_router.get("/{user_id}")
+@users_router.get("/{user_id}", dependencies=[Depends(conditional_get("users"))])
 def get_user(user_id: int, db: DB = Depends(get_db)):
     with db.get_connection() as conn:
         user = get_user_by_id(conn, user_id)
@@ -77,41 +87,56 @@ def get_user(user_id: int, db: DB = Depends(get_db)):
     return _row_to_response(user)
 
 
+def _raise_if_username_taken(conn: sqlite3.Connection, username: str):
+    if conn.execute(
+        "SELECT 1 FROM users WHERE username = ? AND is_active = 1", (username,)
+    ).fetchone():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Username already exists",
+        )
+
+
+def _create_or_reactivate_user(
+    conn: sqlite3.Connection, body: CreateUserRequest, hashed_password: str, avatar: str,
+) -> dict:
+    # Re-checked here: another request may have taken the name while hashing
+    _raise_if_username_taken(conn, body.username)
+    existing = conn.execute(
+        "SELECT id FROM users WHERE username = ?", (body.username,)
+    ).fetchone()
+
+    role = body.role if body.role in ("admin", "member") else "member"
+    if existing:
+        # Reactivate previously deleted user with fresh data
+        conn.execute(
+            "UPDATE users SET full_name = ?, hashed_password = ?, avatar = ?,"
+            " role = ?, must_change_password = 1, is_active = 1 WHERE id = ?",
+            (body.full_name, hashed_password, avatar, role, existing[0]),
+        )
+        return get_user_by_id(conn, existing[0])
+    conn.execute(
+        "INSERT INTO users (username, full_name, hashed_password, avatar, role,"
+        " must_change_password) VALUES (?, ?, ?, ?, ?, 1)",
+        (body.username, body.full_name, hashed_password, avatar, role),
+    )
+    return get_user_by_id(conn, conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+
+
 @users_router.post("", status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     body: CreateUserRequest,
     admin: UserResponse = Depends(require_admin),
     db: DB = Depends(get_db),
 ):
+    # Cheap duplicate check first, so conflicts never pay for a hash
+    await db.aio.run(_raise_if_username_taken, body.username)
     initial_password = _generate_password()
     avatar = f"{AVATAR_BASE_URL}?seed={body.username}"
 
-    with db.get_connection() as conn:
-        existing = conn.execute(
-            "SELECT id, is_active FROM users WHERE username = ?", (body.username,)
-        ).fetchone()
-        if existing and existing[1]:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Username already exists",
-            )
-
-        role = body.role if body.role in ("admin", "member") else "member"
-        if existing:
-            # Reactivate previously deleted user with fresh data
-            conn.execute(
-                "UPDATE users SET full_name = ?, hashed_password = ?, avatar = ?,"
-                " role = ?, must_change_password = 1, is_active = 1 WHERE id = ?",
-                (body.full_name, hash_password(initial_password), avatar, role, existing[0]),
-            )
-            user = get_user_by_id(conn, existing[0])
-        else:
-            conn.execute(
-                "INSERT INTO users (username, full_name, hashed_password, avatar, role,"
-                " must_change_password) VALUES (?, ?, ?, ?, ?, 1)",
-                (body.username, body.full_name, hash_password(initial_password), avatar, role),
-            )
-            user = get_user_by_id(conn, conn.execute("SELECT last_insert_rowid()").fetchone()[0])
+    hashed_password = await password_hasher.hash(initial_password)
+    user = await db.aio.run(_create_or_reactivate_user, body, hashed_password, avatar)
+    invalidate_cached_users()
 
     result = _row_to_response(user)
     result["initial_password"] = initial_password
@@ -145,6 +170,8 @@ def update_user(
                 (*updates.values(), user_id),
             )
             user = get_user_by_id(conn, user_id)
+    if updates:
+        invalidate_cached_users()
 
     return _row_to_response(user)
 
@@ -160,4 +187,5 @@ def delete_user(
         if not user:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         conn.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
+    invalidate_cached_users()
     return {"id": user_id}
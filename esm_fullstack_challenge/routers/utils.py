@@ -1,14 +1,26 @@
+import csv
+import io
+import json
 import sqlite3
-from functools import lru_cache
-from typing import Callable
+from enum import Enum
+from functools import lru_cache, partial
+from typing import Any, AsyncIterator, Callable, Iterable, List, Tuple
 
-import pandas as pd
-from fastapi import Depends, Response, HTTPException, status
+from fastapi import Depends, Query, Response, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from esm_fullstack_challenge.config import FAST_JSON_RESPONSES, INDEX_ADVISOR
 from esm_fullstack_challenge.db import DB, query_builder
-from esm_fullstack_challenge.dependencies import get_db, CommonQueryParams
+from esm_fullstack_challenge.db.indexes import index_advisor
+from esm_fullstack_challenge.dependencies import (
+    conditional_get, get_db, get_response_format, CommonQueryParams, ResponseFormat,
+    encode_cursor, decode_cursor,
+)
+from esm_fullstack_challenge.metrics import observe_query
 from esm_fullstack_challenge.models import AutoGenModels
+from esm_fullstack_challenge.responses import columnar_response, encode_columnar, fast_json_response
+from esm_fullstack_challenge.timing import timed
 
 
 @lru_cache()
@@ -21,9 +33,160 @@ def get_id_column_name(table: str) -> str | None:
     return None
 
 
+@lru_cache()
+def get_column_names(table: str) -> Tuple[str, ...]:
+    """Returns the table's columns in `select *` order, as in its generated model."""
+    return tuple(AutoGenModels[table].model_fields)
+
+
+def fetch_rows(
+        conn: sqlite3.Connection,
+        table: str,
+        query_str: str,
+        params: List[Any] | Tuple[Any, ...] = (),
+) -> Tuple[List[dict], tuple | None]:
+    """Runs a `select *` query and maps its tuple rows to dicts in one pass.
+
+    Returns:
+        Tuple[List[dict], tuple | None]: Row dicts (ready for response validation)
+                                         and the last raw row, if any.
+    """
+    with observe_query(query_str):
+        cur = conn.execute(query_str, params)
+        columns = get_column_names(table)
+        if len(cur.description) < len(columns):
+            columns = tuple(d[0] for d in cur.description)
+        data, row = [], None
+        for row in cur:
+            data.append(dict(zip(columns, row)))
+    return data, row
+
+
+def fetch_columns(
+        conn: sqlite3.Connection,
+        query_str: str,
+        params: List[Any] | Tuple[Any, ...] = (),
+) -> Tuple[Tuple[str, ...], List[tuple]]:
+    """Runs a query and returns its column names and tuple rows."""
+    with observe_query(query_str):
+        cur = conn.execute(query_str, params)
+        return tuple(d[0] for d in cur.description), cur.fetchall()
+
+
+# Extra column selected in cursor mode; rowid breaks ties in the sort key
+CURSOR_ROWID_COLUMN = '_cursor_rowid'
+
+
+def get_cursor_key(cqp: CommonQueryParams) -> Tuple[List[str], str]:
+    """Returns the keyset columns and direction: the sort column plus rowid."""
+    if cqp.order_by:
+        col, direction = cqp.order_by[0]
+        return [col, 'rowid'], direction
+    return ['rowid'], 'asc'
+
+
+def get_list_query(table: str, cqp: CommonQueryParams) -> Tuple[str, List[Any]]:
+    """Builds the page query issued by the generated list route."""
+    if cqp.cursor is None:
+        return query_builder(
+            table=table,
+            order_by=cqp.order_by,
+            limit=cqp.limit,
+            offset=cqp.offset,
+            filter_by=cqp.filter_by,
+        )
+
+    key_columns, direction = get_cursor_key(cqp)
+    seek = None
+    if cqp.cursor:
+        seek = (key_columns, decode_cursor(cqp.cursor, key_columns)[0], direction)
+    return query_builder(
+        table=table,
+        columns=['*', f'rowid as {CURSOR_ROWID_COLUMN}'],
+        order_by=[(col, direction) for col in key_columns],
+        limit=cqp.limit,
+        filter_by=cqp.filter_by,
+        seek=seek,
+    )
+
+
+def get_count_query(table: str, cqp: CommonQueryParams) -> Tuple[str, List[Any]]:
+    """Builds the total count query issued by the generated list route."""
+    return query_builder(
+        table=table,
+        filter_by=cqp.filter_by,
+        count_only=True
+    )
+
+
+def get_id_query(table: str) -> str:
+    """Builds the lookup query issued by the generated id route."""
+    return f'SELECT * FROM {table} WHERE {get_id_column_name(table)} = ?;'
+
+
+def get_export_query(table: str, cqp: CommonQueryParams) -> Tuple[str, List[Any]]:
+    """Builds the unpaginated query streamed by the generated export route."""
+    return query_builder(
+        table=table,
+        order_by=cqp.order_by,
+        filter_by=cqp.filter_by,
+    )
+
+
+class ExportFormat(str, Enum):
+    """Output formats of the export routes."""
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+    @property
+    def media_type(self) -> str:
+        return 'application/x-ndjson' if self is ExportFormat.NDJSON else 'text/csv'
+
+
+def encode_ndjson(columns: Tuple[str, ...], rows: Iterable[tuple]) -> bytes:
+    """Encodes rows as newline-delimited JSON objects."""
+    return ''.join(
+        json.dumps(dict(zip(columns, row)), separators=(',', ':'), default=str) + '\n'
+        for row in rows
+    ).encode()
+
+
+def encode_csv(rows: Iterable[tuple]) -> bytes:
+    """Encodes rows (or a header) as CSV lines."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def encode_export_batch(fmt: ExportFormat, columns: Tuple[str, ...], rows: List[tuple]) -> bytes:
+    """Encodes one batch of exported rows."""
+    return encode_ndjson(columns, rows) if fmt is ExportFormat.NDJSON else encode_csv(rows)
+
+
+async def iter_export(
+        columns: Tuple[str, ...],
+        batches: AsyncIterator[bytes],
+        fmt: ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Writes the CSV header, then each batch encoded by `encode_export_batch`."""
+    try:
+        if fmt is ExportFormat.CSV:
+            yield encode_csv([columns])
+        async for chunk in batches:
+            yield chunk
+    finally:
+        await batches.aclose()
+
+
 def get_route_list_function(table: str, table_model: BaseModel) -> Callable:
     """Generates an enpoint function to list all items.
 
+    Rows are read as tuples and mapped to dicts with the table's column
+    names; the route's `response_model` validates and serializes them once.
+    Arrow and Parquet requests (see `get_response_format`) skip the dicts
+    and encode the tuple rows column by column, in the DB executor. With FAST_JSON_RESPONSES
+    the dicts are written with orjson instead of being validated again.
+
     Args:
         table (str): Table name.
         table_model (BaseModel): Pydantic model for the table.
@@ -31,44 +194,110 @@ def get_route_list_function(table: str, table_model: BaseModel) -> Callable:
     Returns:
         Callable: Endpoint function.
     """
-    def route_func_list_all(
+    async def route_func_list_all(
             response: Response,
             cqp: CommonQueryParams = Depends(CommonQueryParams),
+            fmt: ResponseFormat = Depends(get_response_format),
+            etag: str | None = Depends(conditional_get(table)),
             db: DB = Depends(get_db)
     ):
-        query_str = query_builder(
-            table=table,
-            order_by=cqp.order_by,
-            limit=cqp.limit,
-            offset=cqp.offset,
-            filter_by=cqp.filter_by,
-        )
-        count_query_str = query_builder(
-            table=table,
-            filter_by=cqp.filter_by,
-            count_only=True
-        )
+        query_str, params = get_list_query(table, cqp)
+        count_query_str, count_params = get_count_query(table, cqp)
+        # Cursor pages carry their running position in place of `range`'s offset
+        start = cqp.offset
+        if cqp.cursor is not None:
+            start = decode_cursor(cqp.cursor, get_cursor_key(cqp)[0])[1] if cqp.cursor else 0
 
-        with db.get_connection() as conn:
-            df = pd.read_sql_query(query_str, conn)
-            cur = conn.cursor()
-            cur.execute(count_query_str)
-            count = cur.fetchone()[0]
+        def fetch_page(conn: sqlite3.Connection):
+            if INDEX_ADVISOR:
+                index_advisor.check(
+                    conn, table,
+                    [f[0] for f in cqp.filter_by] + [col for col, _ in cqp.order_by],
+                )
+            if fmt is ResponseFormat.JSON:
+                columns = None
+                data, last_row = fetch_rows(conn, table, query_str, params)
+                last_item = data[-1] if data else None
+            else:
+                columns, data = fetch_columns(conn, query_str, params)
+                last_row = data[-1] if data else None
+                last_item = dict(zip(columns, last_row)) if data else None
+            with timed('count'):
+                count, estimated = db.totals.get_total(
+                    conn, table, (count_query_str, count_params), cqp.filter_by,
+                )
+            next_cursor = None
+            if cqp.cursor is not None and cqp.limit is not None and len(data) == cqp.limit:
+                key_columns, _ = get_cursor_key(cqp)
+                after = [last_row[-1] if col == 'rowid' else last_item[col] for col in key_columns]
+                next_cursor = encode_cursor(key_columns, after, start + len(data))
+            body = None
+            if fmt is not ResponseFormat.JSON:
+                # The keyset rowid column is the last one selected in cursor mode
+                if columns[-1] == CURSOR_ROWID_COLUMN:
+                    columns = columns[:-1]
+                body = encode_columnar(columns, data, fmt)
+            return data, body, count, estimated, next_cursor
 
-        data = [
-            table_model(**item)
-            for item in df.to_dict(orient='records')
-        ]
+        data, body, count, estimated, next_cursor = await db.aio.run(fetch_page)
 
-        response.headers['Access-Control-Expose-Headers'] = 'Content-Range'
+        response.headers['Access-Control-Expose-Headers'] = \
+            'Content-Range, X-Total-Estimated, X-Next-Cursor, ETag'
         response.headers['Content-Range'] = \
-            f'{table} {cqp.offset}-{cqp.offset + len(data) - 1}/{count}'
+            f'{table} {start}-{start + len(data) - 1}/{count}'
+        if estimated:
+            response.headers['X-Total-Estimated'] = 'true'
+        if next_cursor:
+            response.headers['X-Next-Cursor'] = next_cursor
 
+        # Responses returned directly do not inherit the headers set on `response`
+        if body is not None:
+            return columnar_response(body, fmt, headers=dict(response.headers))
+        if FAST_JSON_RESPONSES:
+            return fast_json_response(data, headers=dict(response.headers))
         return data
 
     return route_func_list_all
 
 
+def get_route_export_function(table: str) -> Callable:
+    """Generates an endpoint function that streams a whole table.
+
+    Honors the `filter` and `sort` parameters of the list route but not
+    pagination. Rows are read from one open cursor on a dedicated
+    connection in `EXPORT_BATCH_SIZE` batches, each fetched and encoded in
+    the DB executor and written out before the next, so memory stays flat
+    regardless of table size.
+
+    Args:
+        table (str): Table name.
+
+    Returns:
+        Callable: Endpoint function.
+    """
+    async def route_func_export(
+            filter_param: str | None = Query('{}', alias='filter'),
+            sort_param: str | None = Query(None, alias='sort'),
+            fmt: ExportFormat = Query(ExportFormat.NDJSON, alias='format'),
+            db: DB = Depends(get_db)
+    ):
+        cqp = CommonQueryParams(filter_param=filter_param, range_param=None, sort_param=sort_param)
+        query_str, params = get_export_query(table, cqp)
+
+        # Run the query up to the first row before responding, so SQL errors
+        # and pool timeouts surface as a normal error response
+        batches = db.aio.iter_batches(query_str, params, transform=partial(encode_export_batch, fmt))
+        columns = await anext(batches)
+
+        return StreamingResponse(
+            iter_export(columns, batches, fmt),
+            media_type=fmt.media_type,
+            headers={'Content-Disposition': f'attachment; filename="{table}.{fmt.value}"'},
+        )
+
+    return route_func_export
+
+
 def get_route_id_function(table: str, table_model: BaseModel) -> Callable:
     """Generates an enpoint function to get an item by ID.
 
@@ -79,15 +308,22 @@ def get_route_id_function(table: str, table_model: BaseModel) -> Callable:
     Returns:
         Callable: Endpoint function.
     """
-    def route_id_function(id: int, db: DB = Depends(get_db)):
-        id_col = get_id_column_name(table)
-        with db.get_connection() as conn:
-            conn.row_factory = sqlite3.Row
-            cur = conn.cursor()
-            cur.execute(f'SELECT * FROM {table} WHERE {id_col} = {id};')
-            item = cur.fetchone()
+    async def route_id_function(
+            id: int,
+            response: Response,
+            etag: str | None = Depends(conditional_get(table)),
+            db: DB = Depends(get_db)
+    ):
+        query_str = get_id_query(table)
+
+        def fetch_item(conn: sqlite3.Connection):
+            with observe_query(query_str):
+                row = conn.execute(query_str, (id,)).fetchone()
+            return dict(zip(get_column_names(table), row)) if row else None
+
+        item = await db.aio.run(fetch_item)
         if item:
-            return table_model(**item)
+            return fast_json_response(item, headers=dict(response.headers)) if FAST_JSON_RESPONSES else item
         else:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
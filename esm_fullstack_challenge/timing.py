@@ -0,0 +1,162 @@
+import functools
+import inspect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class Timings:
+    """Time spent per phase (auth, sql, serialize, ...) during one request.
+
+    Phases may nest or overlap (e.g. `auth` includes its own `db_wait`),
+    and repeated phases add up. Thread-safe, since DB and hashing work
+    report from executor threads.
+    """
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.endpoint_done: float | None = None
+        self._lock = threading.Lock()
+        self._phases: Dict[str, float] = {}
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self._phases[phase] = self._phases.get(phase, 0.0) + seconds
+
+    def as_ms(self) -> Dict[str, float]:
+        with self._lock:
+            return {phase: round(seconds * 1000, 3) for phase, seconds in self._phases.items()}
+
+    def server_timing(self, total: float) -> str:
+        """Formats the phases, plus `total`, as a Server-Timing header value."""
+        metrics = [*self.as_ms().items(), ('total', round(total * 1000, 3))]
+        return ', '.join(f'{phase};dur={ms}' for phase, ms in metrics)
+
+
+# Timings of the current request; copied into executor threads with the context
+_current: ContextVar[Timings | None] = ContextVar('timings', default=None)
+
+
+def get_timings() -> Timings | None:
+    return _current.get()
+
+
+def record(phase: str, seconds: float):
+    """Adds `seconds` to a phase of the current request, if it is being timed."""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(phase, seconds)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Times the block as `phase` of the current request."""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+def _mark_endpoint_done():
+    timings = _current.get()
+    if timings is not None:
+        timings.endpoint_done = time.perf_counter()
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _mark_endpoint_done()
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            _mark_endpoint_done()
+    return wrapper
+
+
+class TimedRoute(APIRoute):
+    """APIRoute that reports FastAPI's response validation and serialization as `serialize`.
+
+    That is the time from the endpoint returning to the response being
+    built, which no code inside the endpoint can measure.
+    """
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable[[Request], Any]:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request: Request) -> Response:
+            response = await handler(request)
+            timings = _current.get()
+            if timings is not None and timings.endpoint_done is not None:
+                timings.add('serialize', time.perf_counter() - timings.endpoint_done)
+            return response
+
+        return timed_handler
+
+
+class TimingMiddleware:
+    """Times every HTTP request and reports where the time went.
+
+    Adds a `Server-Timing` header (shown by browser devtools) with the
+    phases recorded until the response starts, and logs one JSON line per
+    request, once the body is sent, with the status, total duration and
+    phases.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        timings = Timings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', timings.server_timing(time.perf_counter() - timings.start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if logger.isEnabledFor(logging.INFO):
+                entry = {
+                    'method': scope['method'],
+                    'path': scope['path'],
+                    'status': status_code,
+                    'duration_ms': round((time.perf_counter() - timings.start) * 1000, 3),
+                    'timings': timings.as_ms(),
+                }
+                logger.info(json.dumps(entry), extra={'request_timing': entry})
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Compares the default JSON path of the generated list routes (response_model
+validation + JSON encoder) with FAST_JSON_RESPONSES (orjson on DB rows).
+
+Requests go through the full app in-process, so timings include routing,
+auth and the DB query. Run from the repository root:
+
+    ./scripts/benchmark_json_responses.py [--paths /results /lap_times] [--repeat 50]
+"""
+import argparse
+import statistics
+import time
+from typing import List
+
+from fastapi.testclient import TestClient
+
+from esm_fullstack_challenge.main import app
+from esm_fullstack_challenge.routers import utils as route_utils
+
+
+def measure(client: TestClient, headers: dict, path: str, size: int, repeat: int):
+    params = {'range': f'[0, {size - 1}]'}
+    body = client.get(path, headers=headers, params=params).content
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.get(path, headers=headers, params=params)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, len(body)
+
+
+def main(paths: List[str], page_sizes: List[int], repeat: int):
+    with TestClient(app) as client:
+        token = client.post(
+            '/auth/login', json={'username': 'janedoe', 'password': 'password'},
+        ).json()['access_token']
+        headers = {'Authorization': f'Bearer {token}'}
+        print(f'{"path":>12} {"page":>6} {"mode":>8} {"median ms":>10} {"bytes":>10}')
+        for path in paths:
+            for size in page_sizes:
+                for name, fast in (('default', False), ('orjson', True)):
+                    route_utils.FAST_JSON_RESPONSES = fast
+                    ms, size_bytes = measure(client, headers, path, size, repeat)
+                    print(f'{path:>12} {size:>6} {name:>8} {ms:>10.2f} {size_bytes:>10}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paths', nargs='+', default=['/results', '/lap_times'])
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[25, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    main(args.paths, args.page_sizes, args.repeat)
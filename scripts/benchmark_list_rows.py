@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compares the pandas row pipeline of the generic list routes with the
+tuple row pipeline, for 25-row and 1,000-row pages.
+
+Both variants include the response validation/serialization FastAPI does
+for `response_model=List[table_model]`. Run from the repository root:
+
+    ./scripts/benchmark_list_rows.py [--table results] [--repeat 50]
+"""
+import argparse
+import sqlite3
+import statistics
+import time
+import tracemalloc
+from typing import List
+
+import pandas as pd
+from pydantic import TypeAdapter
+
+from esm_fullstack_challenge.config import DB_FILE
+from esm_fullstack_challenge.models import AutoGenModels
+from esm_fullstack_challenge.routers.utils import fetch_rows
+
+
+def pandas_pipeline(conn, table, table_model, adapter, query, params) -> bytes:
+    df = pd.read_sql_query(query, conn, params=params)
+    data = [table_model(**item) for item in df.to_dict(orient='records')]
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+def tuple_pipeline(conn, table, table_model, adapter, query, params) -> bytes:
+    data, _ = fetch_rows(conn, table, query, params)
+    return adapter.dump_json(adapter.validate_python(data))
+
+
+def measure(func, repeat: int, *args):
+    func(*args)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings) * 1000, peak / 1024
+
+
+def main(table: str, page_sizes: List[int], repeat: int):
+    conn = sqlite3.connect(DB_FILE)
+    table_model = AutoGenModels[table]
+    adapter = TypeAdapter(List[table_model])
+    print(f'{"page":>6} {"pipeline":>8} {"median ms":>10} {"peak KiB":>10}')
+    for size in page_sizes:
+        query, params = f'select * from {table} limit ? offset ?;', [size, 0]
+        for name, func in (('pandas', pandas_pipeline), ('tuples', tuple_pipeline)):
+            ms, kib = measure(func, repeat, conn, table, table_model, adapter, query, params)
+            print(f'{size:>6} {name:>8} {ms:>10.2f} {kib:>10.1f}')
+    conn.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--table', default='results')
+    parser.add_argument('--page-sizes', type=int, nargs='+', default=[25, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    main(args.table, args.page_sizes, args.repeat)
@@ -7,6 +7,10 @@ from tempfile import TemporaryDirectory
 import kagglehub
 import pandas as pd
 
+from esm_fullstack_challenge.db.analytics import ensure_analytics
+from esm_fullstack_challenge.db.indexes import ensure_indexes
+from esm_fullstack_challenge.db.tracking import ensure_change_tracking
+
 
 TABLE_ID_MAP = {
     'circuits': {
@@ -65,6 +69,15 @@ def download_data():
             print(table_name)
             df.to_sql(table_name, conn, if_exists="replace", index=False)
 
+    print("Creating indexes...")
+    for index_name in ensure_indexes(conn):
+        print(index_name)
+    ensure_change_tracking(conn)
+    print("Building analytics tables...")
+    for table in ensure_analytics(conn):
+        print(table)
+    conn.close()
+
 
 if __name__ == "__main__":
     print("Downloading data...")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Profiles the cold start of the API: total import time of
+`esm_fullstack_challenge.main`, the slowest imported modules (from
+`python -X importtime`) and the time to build the OpenAPI document.
+
+Each measurement runs in a fresh interpreter. With SCHEMA_SNAPSHOT_FILE
+set, the first run also stores the OpenAPI document in the snapshot, so
+running this at image build time precomputes it. Run from the repository
+root:
+
+    ./scripts/profile_startup.py [--top 15] [--repeat 5]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+from esm_fullstack_challenge.config import STARTUP_IMPORT_BUDGET
+
+MEASURE = '''
+import json, time
+start = time.perf_counter()
+from esm_fullstack_challenge.main import app
+imported = time.perf_counter()
+app.openapi()
+print(json.dumps({'import': imported - start, 'openapi': time.perf_counter() - imported}))
+'''
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], capture_output=True, text=True, check=True)
+
+
+def measure_startup(repeat: int):
+    runs = [json.loads(run_python('-c', MEASURE).stdout) for _ in range(repeat)]
+    return {key: statistics.median(run[key] for run in runs) for key in ('import', 'openapi')}
+
+
+def slowest_imports(top: int):
+    """Returns (cumulative seconds, module) of the slowest top-level imports."""
+    stderr = run_python('-X', 'importtime', '-c', 'import esm_fullstack_challenge.main').stderr
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Depth 0-1 only: the app package itself and what it imports directly
+        if len(name) - len(name.lstrip()) <= 3:
+            modules.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def main(top: int, repeat: int):
+    timings = measure_startup(repeat)
+    print(f'import esm_fullstack_challenge.main: {timings["import"]:.3f}s'
+          f' (budget {STARTUP_IMPORT_BUDGET:.3f}s, median of {repeat})')
+    print(f'first app.openapi():                {timings["openapi"]:.3f}s')
+    print()
+    print(f'{"cumulative s":>12}  module')
+    for seconds, module in slowest_imports(top):
+        print(f'{seconds:>12.3f}  {module}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    main(args.top, args.repeat)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""Writes a synthetic copy of the database scaled by an integer factor.
+
+Copy 0 is the source data unchanged. Every further copy appends another
+block of seasons, races and drivers (with shifted years, dates and ids)
+and replays every race-level table (results, standings, qualifying,
+lap_times, pit_stops, ...) for it, so all foreign keys stay valid:
+
+- Each copy gets its own drivers, assigned to the replayed rows through a
+  seeded permutation, so wins and points spread differently per copy.
+- Lap and pit stop times get seeded +-jitter around the source values.
+- Circuits, constructors, status and users are shared by all copies.
+
+The same source, factor and seed always produce the same database. The
+output is then indexed, change-tracked and its analytics tables built,
+like `initiate_db.py` does. Run from the repository root:
+
+    ./scripts/scale_db.py --factor 10 [--seed 0] [--source data.db] [--output data_10x.db]
+
+and point the test suite at the result with TEST_DB_SOURCE=data_10x.db.
+"""
+import argparse
+import os
+import random
+import re
+import sqlite3
+from typing import Any, Callable, Dict, List
+
+from esm_fullstack_challenge.db.analytics import ensure_analytics
+from esm_fullstack_challenge.db.indexes import ensure_indexes
+from esm_fullstack_challenge.db.tracking import ensure_change_tracking
+from esm_fullstack_challenge.db.utils import get_table_names
+
+# Tables with one block of rows per copy; every table with a race_id
+# column is replayed per copy as well.
+SCALED_TABLES = ('seasons', 'races', 'drivers')
+DATE_COLUMNS = {
+    'races': ('date', 'fp1_date', 'fp2_date', 'fp3_date', 'quali_date', 'sprint_date'),
+    'drivers': ('dob',),
+}
+TIME_JITTER = 0.02  # relative standard deviation of lap and pit stop times
+BATCH_SIZE = 10000
+
+_DATE = re.compile(r'^(\d{4})(-\d{2}-\d{2}.*)$')
+
+
+def shift_year(value: Any, years: int) -> Any:
+    """Moves an ISO date string `years` forward; other values are kept."""
+    match = _DATE.match(value) if isinstance(value, str) else None
+    if not match:
+        return value
+    year, rest = int(match[1]) + years, match[2]
+    if rest.startswith('-02-29') and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+        rest = '-02-28' + rest[6:]
+    return f'{year}{rest}'
+
+
+def format_lap_time(milliseconds: int) -> str:
+    minutes, remainder = divmod(milliseconds, 60000)
+    return f'{minutes}:{remainder / 1000:06.3f}'
+
+
+def jitter(rng: random.Random, milliseconds: Any) -> Any:
+    if not isinstance(milliseconds, int):
+        return milliseconds
+    return max(1, round(milliseconds * rng.gauss(1.0, TIME_JITTER)))
+
+
+def get_offsets(conn: sqlite3.Connection, tables: List[str]) -> Dict[str, int]:
+    """Returns the id (or year) step between two copies of each table."""
+    offsets = {}
+    for table in tables:
+        columns = [row[1] for row in conn.execute(f'PRAGMA table_info({table})')]
+        key = 'year' if table == 'seasons' else 'id' if 'id' in columns else None
+        if key:
+            low, high = conn.execute(f'SELECT min({key}), max({key}) FROM {table}').fetchone()
+            offsets[table] = (high - low + 1) if table == 'seasons' else (high or 0)
+    return offsets
+
+
+def make_transform(
+        table: str,
+        columns: List[str],
+        copy: int,
+        offsets: Dict[str, int],
+        drivers: Dict[int, int],
+        rng: random.Random,
+) -> Callable[[tuple], tuple]:
+    """Returns the function that maps a source row onto copy `copy`."""
+    years = copy * offsets['seasons']
+    steps = []
+    for i, column in enumerate(columns):
+        if column == 'id' and table in offsets:
+            step = copy * offsets[table]
+            steps.append((i, lambda v, step=step: v + step))
+        elif column == 'race_id':
+            step = copy * offsets['races']
+            steps.append((i, lambda v, step=step: v + step))
+        elif column == 'driver_id':
+            steps.append((i, lambda v: drivers.get(v, v)))
+        elif column == 'year' and table in ('seasons', 'races'):
+            steps.append((i, lambda v: v + years))
+        elif column in DATE_COLUMNS.get(table, ()):
+            steps.append((i, lambda v: shift_year(v, years)))
+        elif column in ('driver_ref', 'url') and table in SCALED_TABLES:
+            steps.append((i, lambda v: f'{v}-{copy}' if isinstance(v, str) else v))
+
+    def transform(row: tuple) -> tuple:
+        row = list(row)
+        for i, step in steps:
+            if row[i] is not None:
+                row[i] = step(row[i])
+        if table in ('lap_times', 'pit_stops') and 'milliseconds' in columns:
+            ms = columns.index('milliseconds')
+            row[ms] = jitter(rng, row[ms])
+            if table == 'lap_times' and isinstance(row[ms], int):
+                row[columns.index('time')] = format_lap_time(row[ms])
+            elif table == 'pit_stops' and isinstance(row[ms], int):
+                row[columns.index('duration')] = f'{row[ms] / 1000:.3f}'
+        return tuple(row)
+
+    return transform
+
+
+def scale_db(source: str, output: str, factor: int, seed: int = 0):
+    """Writes `source` scaled by `factor` to `output` (replaced if it exists)."""
+    tmp_output = output + '.tmp'
+    if os.path.exists(tmp_output):
+        os.remove(tmp_output)
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(tmp_output)
+    rng = random.Random(seed)
+
+    tables = get_table_names(src)
+    for (sql,) in src.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table'"
+        f' AND name IN ({", ".join("?" for _ in tables)})', tables,
+    ).fetchall():
+        dst.execute(sql)
+
+    offsets = get_offsets(src, tables)
+    driver_ids = [row[0] for row in src.execute('SELECT id FROM drivers ORDER BY id')]
+    table_columns = {
+        table: [row[1] for row in src.execute(f'PRAGMA table_info({table})')] for table in tables
+    }
+    scaled = [
+        table for table in tables
+        if table in SCALED_TABLES or 'race_id' in table_columns[table]
+    ]
+
+    for table in tables:
+        if table not in scaled:
+            dst.executemany(
+                f'INSERT INTO {table} VALUES ({", ".join("?" for _ in table_columns[table])})',
+                src.execute(f'SELECT * FROM {table}'),
+            )
+
+    for copy in range(factor):
+        shuffled = driver_ids[:]
+        if copy:
+            rng.shuffle(shuffled)
+        drivers = {
+            driver_id: new_id + copy * offsets['drivers']
+            for driver_id, new_id in zip(driver_ids, shuffled)
+        }
+        for table in scaled:
+            columns = table_columns[table]
+            transform = make_transform(table, columns, copy, offsets, drivers, rng)
+            insert = f'INSERT INTO {table} VALUES ({", ".join("?" for _ in columns)})'
+            cursor = src.execute(f'SELECT * FROM {table} ORDER BY rowid')
+            while rows := cursor.fetchmany(BATCH_SIZE):
+                dst.executemany(insert, [transform(row) for row in rows] if copy else rows)
+        dst.commit()
+        print(f'copy {copy + 1}/{factor}')
+
+    print('Creating indexes...')
+    ensure_indexes(dst)
+    ensure_change_tracking(dst)
+    print('Building analytics tables...')
+    ensure_analytics(dst)
+    src.close()
+    dst.close()
+    os.replace(tmp_output, output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--factor', type=int, required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--source', default='data.db')
+    parser.add_argument('--output', help='Defaults to data_<factor>x.db')
+    args = parser.parse_args()
+    if args.factor < 1:
+        parser.error('--factor must be at least 1')
+    output = args.output or f'data_{args.factor}x.db'
+    if os.path.abspath(output) == os.path.abspath(args.source):
+        parser.error('--output must differ from --source')
+    scale_db(args.source, output, args.factor, args.seed)
+    print(output)
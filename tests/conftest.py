@@ -2,36 +2,55 @@ import os
 import shutil
 import sqlite3
 
-import pytest
-from fastapi.testclient import TestClient
+TEST_DB = "test_data.db"
+# The app lifespan migrates DB_FILE (indexes, triggers, summary tables), so point it at
+# the test copy before the app is imported; the bundled data.db is only ever read
+os.environ["DB_FILE"] = TEST_DB
+# /metrics is only mounted once secured
+os.environ["METRICS_TOKEN"] = "test-metrics-token"
 
-from esm_fullstack_challenge.db import DB
-from esm_fullstack_challenge.db.init_auth import init_users_table
-from esm_fullstack_challenge.dependencies.db import get_db
-from esm_fullstack_challenge.main import app
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
 
-TEST_DB = "test_data.db"
+from esm_fullstack_challenge.db import DB  # noqa: E402
+from esm_fullstack_challenge.db.analytics import ensure_analytics  # noqa: E402
+from esm_fullstack_challenge.db.indexes import ensure_indexes  # noqa: E402
+from esm_fullstack_challenge.db.init_auth import init_users_table  # noqa: E402
+from esm_fullstack_challenge.db.tracking import ensure_change_tracking  # noqa: E402
+from esm_fullstack_challenge.dependencies.db import get_db  # noqa: E402
+from esm_fullstack_challenge.main import app  # noqa: E402
+
+# Database the suite copies; point it at a scripts/scale_db.py output (e.g. data_10x.db)
+# to run the benchmark or query plan tests at scale
+TEST_DB_SOURCE = os.environ.get("TEST_DB_SOURCE", "data.db")
 
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_db():
-    """Copy production DB and add users table for tests."""
-    shutil.copy("data.db", TEST_DB)
+    """Copy production DB (or TEST_DB_SOURCE) and add users table for tests."""
+    shutil.copy(TEST_DB_SOURCE, TEST_DB)
     conn = sqlite3.connect(TEST_DB)
     init_users_table(conn)
+    ensure_indexes(conn)
+    ensure_change_tracking(conn)
+    ensure_analytics(conn)
     conn.close()
     yield
-    os.remove(TEST_DB)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(TEST_DB + suffix):
+            os.remove(TEST_DB + suffix)
 
 
-def _get_test_db():
+@pytest.fixture(scope="session")
+def test_db(setup_test_db):
     db = DB(TEST_DB)
     yield db
+    db.close()
 
 
 @pytest.fixture
-def client():
-    app.dependency_overrides[get_db] = _get_test_db
+def client(test_db):
+    app.dependency_overrides[get_db] = lambda: test_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
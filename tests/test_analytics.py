@@ -0,0 +1,84 @@
+"""Tests for the trigger-maintained analytics summary tables."""
+import sqlite3
+
+import pytest
+
+from esm_fullstack_challenge.db.analytics import SUMMARIES, ensure_analytics, refresh_summary
+
+RAW_DRIVER_WINS = (
+    "SELECT r.driver_id, count(*) FROM results r JOIN status s ON r.status_id = s.id"
+    " WHERE s.status = 'Finished' AND r.position_order = 1 GROUP BY r.driver_id"
+)
+
+
+@pytest.fixture
+def conn(tmp_path, setup_test_db):
+    """A private copy of the test DB, so writes do not leak into other tests."""
+    src = sqlite3.connect("test_data.db")
+    dst = sqlite3.connect(tmp_path / "analytics.db")
+    src.backup(dst)
+    src.close()
+    yield dst
+    dst.close()
+
+
+def _rows(conn, table):
+    return sorted(conn.execute(f"SELECT * FROM {table}").fetchall(), key=repr)
+
+
+def test_summaries_match_sources(conn):
+    assert dict(conn.execute("SELECT driver_id, wins FROM _driver_wins")) == dict(conn.execute(RAW_DRIVER_WINS))
+    for summary in SUMMARIES:
+        before = _rows(conn, summary.table)
+        refresh_summary(conn, summary)
+        assert _rows(conn, summary.table) == before
+
+
+def test_ensure_analytics_is_idempotent(conn):
+    assert ensure_analytics(conn) == []
+    conn.execute("DROP TRIGGER _analytics_driver_wins_results_insert")
+    assert ensure_analytics(conn) == ["_driver_wins"]
+
+
+def test_results_writes_update_driver_wins(conn):
+    driver_id = conn.execute("SELECT driver_id FROM _driver_wins ORDER BY wins DESC").fetchone()[0]
+    wins = conn.execute("SELECT wins FROM _driver_wins WHERE driver_id = ?", (driver_id,)).fetchone()[0]
+    finished = conn.execute("SELECT id FROM status WHERE status = 'Finished'").fetchone()[0]
+
+    conn.execute(
+        "INSERT INTO results (id, race_id, driver_id, position_order, status_id) VALUES (-1, 1, ?, 1, ?)",
+        (driver_id, finished),
+    )
+    assert conn.execute("SELECT wins FROM _driver_wins WHERE driver_id = ?", (driver_id,)).fetchone()[0] == wins + 1
+
+    conn.execute("DELETE FROM results WHERE id = -1")
+    assert conn.execute("SELECT wins FROM _driver_wins WHERE driver_id = ?", (driver_id,)).fetchone()[0] == wins
+    assert dict(conn.execute("SELECT driver_id, wins FROM _driver_wins")) == dict(conn.execute(RAW_DRIVER_WINS))
+
+
+def test_driver_rename_updates_progression(conn):
+    driver_id = conn.execute("SELECT driver_id FROM _driver_progression").fetchone()[0]
+    conn.execute("UPDATE drivers SET forename = 'Renamed' WHERE id = ?", (driver_id,))
+    names = {
+        row[0] for row in
+        conn.execute("SELECT driver_name FROM _driver_progression WHERE driver_id = ?", (driver_id,))
+    }
+    assert len(names) == 1 and names.pop().startswith("Renamed ")
+
+
+def test_constructor_standings_update_season_wins(conn):
+    year, race_id, constructor_id = conn.execute(
+        "SELECT r.year, cs.race_id, cs.constructor_id FROM constructor_standings cs"
+        " JOIN races r ON cs.race_id = r.id ORDER BY r.year DESC LIMIT 1"
+    ).fetchone()
+    conn.execute(
+        "UPDATE constructor_standings SET wins = 99 WHERE race_id = ? AND constructor_id = ?",
+        (race_id, constructor_id),
+    )
+    name = conn.execute("SELECT name FROM constructors WHERE id = ?", (constructor_id,)).fetchone()[0]
+    assert conn.execute(
+        "SELECT wins FROM _constructor_season_wins WHERE year = ? AND constructor_name = ?", (year, name),
+    ).fetchone()[0] == 99
+    before = _rows(conn, "_constructor_season_wins")
+    refresh_summary(conn, SUMMARIES[2])
+    assert _rows(conn, "_constructor_season_wins") == before
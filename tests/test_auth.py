@@ -1,4 +1,12 @@
 """Tests for JWT authentication and user management."""
+import threading
+import time
+from datetime import timedelta
+
+from esm_fullstack_challenge.auth import (
+    auth_cache, create_access_token, get_user_by_username, invalidate_cached_users, password_hasher,
+)
+from esm_fullstack_challenge.auth import service as auth_service
 
 
 def test_login_success(client):
@@ -159,7 +167,11 @@ def test_create_user(client, auth_headers):
     assert login_resp.json()["must_change_password"] is True
 
 
-def test_create_duplicate_user(client, auth_headers):
+def test_create_duplicate_user(client, auth_headers, monkeypatch):
+    async def hash_password(password):
+        raise AssertionError("duplicates must be rejected before hashing")
+
+    monkeypatch.setattr(password_hasher, "hash", hash_password)
     response = client.post("/users", headers=auth_headers, json={
         "username": "janedoe",
         "full_name": "Duplicate",
@@ -274,3 +286,90 @@ def test_member_cannot_create_user(client, auth_headers):
         f"/users/{user_id}", headers=member_headers,
     )
     assert response.status_code == 403
+
+
+def test_current_user_is_cached(client, auth_headers):
+    client.get("/auth/me", headers=auth_headers)
+    hits = auth_cache.stats()["hits"]
+    response = client.get("/auth/me", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["username"] == "janedoe"
+    assert auth_cache.stats()["hits"] == hits + 1
+    assert 0 < auth_cache.stats()["hit_rate"] <= 1
+    assert "auth" in client.get("/stats/cache", headers=auth_headers).json()
+
+
+def test_cached_user_invalidated_by_profile_change(client, auth_headers):
+    assert client.get("/auth/me", headers=auth_headers).json()["full_name"] == "Jane Doe"
+    client.put("/auth/me/profile", headers=auth_headers, json={"full_name": "Jane Cached"})
+    assert client.get("/auth/me", headers=auth_headers).json()["full_name"] == "Jane Cached"
+    client.put("/auth/me/profile", headers=auth_headers, json={"full_name": "Jane Doe"})
+
+
+def test_cached_user_invalidated_by_role_change_and_delete(client, auth_headers):
+    resp = client.post("/users", headers=auth_headers, json={
+        "username": "cachedmember",
+        "full_name": "Cached Member",
+        "role": "member",
+    })
+    user_id = resp.json()["id"]
+    login_resp = client.post("/auth/login", json={
+        "username": "cachedmember",
+        "password": resp.json()["initial_password"],
+    })
+    member_headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    assert client.get("/auth/me", headers=member_headers).json()["role"] == "member"
+
+    client.put(f"/users/{user_id}", headers=auth_headers, json={"role": "admin"})
+    assert client.get("/auth/me", headers=member_headers).json()["role"] == "admin"
+
+    client.delete(f"/users/{user_id}", headers=auth_headers)
+    assert client.get("/auth/me", headers=member_headers).status_code == 401
+
+
+def test_deleted_user_token_rejected_despite_inflight_lookup(client, auth_headers, test_db, monkeypatch):
+    resp = client.post("/users", headers=auth_headers, json={
+        "username": "inflightmember",
+        "full_name": "In-flight Member",
+    })
+    user_id = resp.json()["id"]
+    login_resp = client.post("/auth/login", json={
+        "username": "inflightmember",
+        "password": resp.json()["initial_password"],
+    })
+    member_headers = {"Authorization": f"Bearer {login_resp.json()['access_token']}"}
+    auth_cache.clear()
+
+    def lookup_then_delete(conn, username):
+        # The user is deleted after this lookup read its row, before it is cached
+        user = get_user_by_username(conn, username)
+        with test_db.get_connection() as other:
+            other.execute("UPDATE users SET is_active = 0 WHERE id = ?", (user_id,))
+        invalidate_cached_users()
+        return user
+
+    monkeypatch.setattr(auth_service, "get_user_by_username", lookup_then_delete)
+    assert client.get("/auth/me", headers=member_headers).status_code == 200
+    monkeypatch.setattr(auth_service, "get_user_by_username", get_user_by_username)
+    assert client.get("/auth/me", headers=member_headers).status_code == 401
+
+
+def test_concurrent_invalidations_are_not_lost():
+    before = auth_service._users_generation
+    threads = [
+        threading.Thread(target=lambda: [invalidate_cached_users() for _ in range(500)])
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert auth_service._users_generation == before + 8 * 500
+
+
+def test_cached_user_respects_token_expiry(client):
+    token = create_access_token({"sub": "janedoe"}, expires_delta=timedelta(seconds=5))
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    entry = next(reversed(auth_cache._entries.values()))
+    assert entry.expires_at - time.monotonic() <= 5
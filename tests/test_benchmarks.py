@@ -0,0 +1,191 @@
+"""Endpoint micro-benchmarks with regression thresholds (opt-in).
+
+Runs representative calls against the test copy of data.db and records,
+per case, the median and p95 latency and the peak traced allocations
+of one call. Results are written to BENCHMARK_OUTPUT and compared with
+the stored baseline; a case fails when it is slower or allocates more
+than the baseline by both the relative and the absolute threshold.
+
+    make benchmark             # compare with tests/benchmarks/baseline.json
+    make benchmark-baseline    # (re)write the baseline
+
+Environment:
+    RUN_BENCHMARKS                  Set to 1 to run the suite (skipped otherwise).
+    TEST_DB_SOURCE                  Database to benchmark (see conftest), e.g. a scaled data_10x.db.
+    BENCHMARK_UPDATE_BASELINE       Set to 1 to write the results as the new baseline.
+    BENCHMARK_BASELINE              Baseline path. Defaults to tests/benchmarks/baseline.json.
+    BENCHMARK_OUTPUT                Results path. Defaults to tests/benchmarks/latest.json.
+    BENCHMARK_REPEAT                Timed calls per case (login uses a fifth). Defaults to 30.
+    BENCHMARK_MAX_REGRESSION        Allowed relative latency increase. Defaults to 0.25.
+    BENCHMARK_MIN_DELTA_MS          Latency increases below this never fail. Defaults to 0.5.
+    BENCHMARK_MAX_ALLOC_REGRESSION  Allowed relative peak allocation increase. Defaults to 0.25.
+    BENCHMARK_MIN_DELTA_KIB         Allocation increases below this never fail. Defaults to 64.
+"""
+import json
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, NamedTuple
+
+import pytest
+
+from esm_fullstack_challenge.auth import auth_cache
+from esm_fullstack_challenge.routers.dashboard import dashboard_cache
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(__file__), "benchmarks")
+RUN_BENCHMARKS = os.environ.get("RUN_BENCHMARKS", "") == "1"
+UPDATE_BASELINE = os.environ.get("BENCHMARK_UPDATE_BASELINE", "") == "1"
+BASELINE_FILE = os.environ.get("BENCHMARK_BASELINE", os.path.join(BENCHMARKS_DIR, "baseline.json"))
+OUTPUT_FILE = os.environ.get("BENCHMARK_OUTPUT", os.path.join(BENCHMARKS_DIR, "latest.json"))
+REPEAT = int(os.environ.get("BENCHMARK_REPEAT", "30"))
+MAX_REGRESSION = float(os.environ.get("BENCHMARK_MAX_REGRESSION", "0.25"))
+MIN_DELTA_MS = float(os.environ.get("BENCHMARK_MIN_DELTA_MS", "0.5"))
+MAX_ALLOC_REGRESSION = float(os.environ.get("BENCHMARK_MAX_ALLOC_REGRESSION", "0.25"))
+MIN_DELTA_KIB = float(os.environ.get("BENCHMARK_MIN_DELTA_KIB", "64"))
+
+requires_opt_in = pytest.mark.skipif(not RUN_BENCHMARKS, reason="set RUN_BENCHMARKS=1 to run benchmarks")
+
+
+class Case(NamedTuple):
+    name: str
+    method: str
+    path: str
+    params: dict | None = None
+    json: dict | None = None
+    authenticated: bool = True
+    setup: Callable[[], None] | None = None  # run before every call, untimed
+    repeat_divisor: int = 1
+
+
+CASES = [
+    Case("list_small_table", "GET", "/status", {"range": "[0, 24]"}),
+    Case("list_huge_table_page", "GET", "/lap_times", {"range": "[0, 999]"}),
+    Case("list_huge_table_deep_offset", "GET", "/lap_times", {"range": "[100000, 100024]"}),
+    Case("list_huge_table_filtered", "GET", "/lap_times", {"filter": '{"race_id": 1}', "range": "[0, 99]"}),
+    Case("id_lookup", "GET", "/results/1000"),
+    Case("dashboard_top_drivers_by_wins", "GET", "/dashboard/top_drivers_by_wins", setup=dashboard_cache.clear),
+    Case("dashboard_championship_progression", "GET", "/dashboard/championship_progression",
+         setup=dashboard_cache.clear),
+    Case("dashboard_championship_progression_matrix", "GET", "/dashboard/championship_progression",
+         {"shape": "matrix"}, setup=dashboard_cache.clear),
+    Case("dashboard_constructor_wins_by_era", "GET", "/dashboard/constructor_wins_by_era",
+         setup=dashboard_cache.clear),
+    Case("dashboard_bundle", "GET", "/dashboard/bundle", setup=dashboard_cache.clear),
+    Case("dashboard_bundle_cached", "GET", "/dashboard/bundle"),
+    Case("login", "POST", "/auth/login", json={"username": "janedoe", "password": "password"},
+         authenticated=False, repeat_divisor=5),
+    Case("current_user", "GET", "/auth/me", setup=auth_cache.clear),
+    Case("current_user_cached", "GET", "/auth/me"),
+]
+
+
+def load_json(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_json(path: str, data: dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+@pytest.fixture(scope="module")
+def results():
+    cases = {}
+    yield cases
+    if not cases:
+        return
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cases": cases,
+    }
+    write_json(OUTPUT_FILE, report)
+    if UPDATE_BASELINE:
+        write_json(BASELINE_FILE, report)
+
+
+def measure(client, headers: dict, case: Case) -> dict:
+    def call():
+        response = client.request(
+            case.method, case.path, params=case.params, json=case.json,
+            headers=headers if case.authenticated else None,
+        )
+        assert response.status_code == 200, response.text
+
+    repeat = max(1, REPEAT // case.repeat_divisor)
+    for _ in range(2):
+        if case.setup:
+            case.setup()
+        call()
+
+    timings = []
+    for _ in range(repeat):
+        if case.setup:
+            case.setup()
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+
+    if case.setup:
+        case.setup()
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 3),
+        "peak_kib": round(peak / 1024, 1),
+        "repeat": repeat,
+    }
+
+
+def regressions(result: dict, baseline: dict) -> list:
+    failures = []
+    checks = (
+        ("median_ms", MAX_REGRESSION, MIN_DELTA_MS),
+        ("peak_kib", MAX_ALLOC_REGRESSION, MIN_DELTA_KIB),
+    )
+    for key, max_regression, min_delta in checks:
+        if key not in baseline:
+            continue
+        delta = result[key] - baseline[key]
+        if delta > min_delta and result[key] > baseline[key] * (1 + max_regression):
+            failures.append(f"{key} {baseline[key]} -> {result[key]} (+{delta / baseline[key]:.0%})")
+    return failures
+
+
+@requires_opt_in
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+def test_benchmark(case, client, auth_headers, results):
+    result = measure(client, auth_headers, case)
+    results[case.name] = result
+
+    baseline = load_json(BASELINE_FILE).get("cases", {}).get(case.name)
+    if UPDATE_BASELINE or baseline is None:
+        return
+    failures = regressions(result, baseline)
+    assert not failures, f"{case.name} regressed: " + "; ".join(failures)
+
+
+def test_regressions():
+    baseline = {"median_ms": 10.0, "peak_kib": 1000.0}
+    assert regressions({"median_ms": 12.0, "peak_kib": 1200.0}, baseline) == []
+    assert len(regressions({"median_ms": 13.0, "peak_kib": 1000.0}, baseline)) == 1
+    assert len(regressions({"median_ms": 10.0, "peak_kib": 1300.0}, baseline)) == 1
+    # Small absolute changes never fail, whatever the ratio
+    assert regressions({"median_ms": 0.4, "peak_kib": 50.0}, {"median_ms": 0.1, "peak_kib": 10.0}) == []
@@ -0,0 +1,128 @@
+"""Tests for route class bulkheads and load shedding."""
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from esm_fullstack_challenge.bulkheads import Bulkhead, BulkheadFull, BulkheadMiddleware
+
+
+def test_bulkhead_queues_hands_over_and_sheds():
+    async def main():
+        bulkhead = Bulkhead("test-queue", limit=1, max_queue=1, queue_timeout=1)
+        await bulkhead.acquire()
+        waiting = asyncio.ensure_future(bulkhead.acquire())
+        await asyncio.sleep(0)
+        assert bulkhead.stats()["queued"] == 1
+        with pytest.raises(BulkheadFull):
+            await bulkhead.acquire()
+        bulkhead.release()
+        await waiting
+        assert bulkhead.stats()["active"] == 1 and bulkhead.stats()["queued"] == 0
+        bulkhead.release()
+        return bulkhead.stats()
+
+    stats = asyncio.run(main())
+    assert stats["active"] == 0
+    assert (stats["admitted"], stats["shed"]) == (2, 1)
+
+
+def test_bulkhead_queue_deadline():
+    async def main():
+        bulkhead = Bulkhead("test-deadline", limit=1, max_queue=4, queue_timeout=0.05)
+        await bulkhead.acquire()
+        with pytest.raises(BulkheadFull):
+            await bulkhead.acquire()
+        assert bulkhead.stats()["queued"] == 0
+        bulkhead.release()
+        return bulkhead.stats()
+
+    stats = asyncio.run(main())
+    assert stats["timed_out"] == 1 and stats["active"] == 0
+
+
+def test_bulkhead_sheds_when_expected_wait_misses_deadline():
+    async def main():
+        bulkhead = Bulkhead("test-expected", limit=1, max_queue=4, queue_timeout=0.5)
+        await bulkhead.acquire()
+        bulkhead.release(service_time=10.0)  # average service time is now 2s
+        await bulkhead.acquire()
+        with pytest.raises(BulkheadFull):
+            await bulkhead.acquire()
+        bulkhead.release()
+        return bulkhead.stats()
+
+    stats = asyncio.run(main())
+    assert stats["shed"] == 1 and stats["timed_out"] == 0
+
+
+def test_cancelled_waiter_leaves_queue():
+    async def main():
+        bulkhead = Bulkhead("test-cancel", limit=1, max_queue=4, queue_timeout=1)
+        await bulkhead.acquire()
+        waiting = asyncio.ensure_future(bulkhead.acquire())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert bulkhead.stats()["queued"] == 0
+        bulkhead.release()
+        return bulkhead.stats()
+
+    assert asyncio.run(main())["active"] == 0
+
+
+def test_middleware_isolates_route_classes():
+    app = FastAPI()
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return {}
+
+    @app.get("/fast")
+    async def fast():
+        return {}
+
+    bulkheads = {
+        "default": Bulkhead("test-mw-default", limit=4, max_queue=4, queue_timeout=1),
+        "analytics": Bulkhead("test-mw-analytics", limit=1, max_queue=0, queue_timeout=1),
+    }
+    app.add_middleware(BulkheadMiddleware, bulkheads=bulkheads, route_classes=[("/slow", "analytics")])
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.ensure_future(client.get("/slow"))
+            while bulkheads["analytics"].stats()["active"] == 0:
+                await asyncio.sleep(0.01)
+            shed = await client.get("/slow")
+            other = await client.get("/fast")
+            release.set()
+            return (await first).status_code, shed, other.status_code
+
+    first, shed, other = asyncio.run(main())
+    assert first == 200 and other == 200
+    assert shed.status_code == 503
+    assert "Retry-After" in shed.headers
+
+
+def test_exports_have_their_own_route_class(client, auth_headers):
+    from esm_fullstack_challenge.bulkheads import BULKHEADS
+
+    before = BULKHEADS["export"].admitted, BULKHEADS["analytics"].admitted
+    assert client.get("/export/status", headers=auth_headers).status_code == 200
+    assert (BULKHEADS["export"].admitted, BULKHEADS["analytics"].admitted) == (before[0] + 1, before[1])
+
+
+def test_bulkhead_stats_endpoint(client, auth_headers):
+    client.get("/drivers", headers=auth_headers)
+    response = client.get("/stats/bulkheads", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    # Only the app's route classes, not bulkheads built elsewhere (e.g. by these tests)
+    assert set(data) == {"default", "analytics", "auth", "export"}
+    assert {"active", "queued", "shed", "timed_out"} <= set(data["analytics"])
+    assert data["default"]["admitted"] > 0 and data["auth"]["admitted"] > 0
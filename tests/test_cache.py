@@ -0,0 +1,83 @@
+"""Tests for the in-process TTL/LRU cache and the dashboard result cache."""
+import time
+
+from esm_fullstack_challenge.cache import CACHES, MISSING, TTLCache, estimate_size
+from esm_fullstack_challenge.routers.dashboard import dashboard_cache
+
+
+def test_ttl_cache_hit_and_tag_invalidation():
+    cache = TTLCache("test_tags", max_bytes=1 << 20, ttl=60, register=False)
+    cache.set("k", [1, 2, 3], tag=(("results", 1),))
+    assert cache.get("k", tag=(("results", 1),)) == [1, 2, 3]
+    assert cache.get("k", tag=(("results", 2),)) is MISSING
+    assert cache.get("k", tag=(("results", 1),)) is MISSING
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["invalidations"], stats["entries"]) == (1, 2, 1, 0)
+
+
+def test_ttl_cache_expiry():
+    cache = TTLCache("test_ttl", max_bytes=1 << 20, ttl=0.01, register=False)
+    cache.set("k", "value")
+    time.sleep(0.02)
+    assert cache.get("k") is MISSING
+    cache.set("k", "value", ttl=60)
+    assert cache.get("k") == "value"
+
+
+def test_ttl_cache_evicts_lru_by_size():
+    value = [(i, f"driver {i}") for i in range(10)]
+    size = estimate_size(value)
+    cache = TTLCache("test_lru", max_bytes=size * 2, ttl=60, register=False)
+    cache.set("a", value)
+    cache.set("b", value)
+    cache.get("a")
+    cache.set("c", value)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == value
+    assert cache.get("c") == value
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+    cache.set("big", value * 3)
+    assert cache.get("big") is MISSING
+
+
+def test_dashboard_results_are_cached(client, auth_headers):
+    params = {"season": 2001}
+    first = client.get("/dashboard/championship_progression", headers=auth_headers, params=params)
+    hits = dashboard_cache.stats()["hits"]
+    second = client.get("/dashboard/championship_progression", headers=auth_headers, params=params)
+    assert second.json() == first.json()
+    assert dashboard_cache.stats()["hits"] == hits + 1
+
+
+def test_dashboard_cache_invalidated_by_writes(client, auth_headers, test_db):
+    path = "/dashboard/constructor_wins_by_era"
+    client.get(path, headers=auth_headers)
+    with test_db.get_connection() as conn:
+        conn.execute("UPDATE constructors SET name = name WHERE id = 1")
+    invalidations = dashboard_cache.stats()["invalidations"]
+    hits = dashboard_cache.stats()["hits"]
+    client.get(path, headers=auth_headers)
+    assert dashboard_cache.stats()["invalidations"] == invalidations + 1
+    assert dashboard_cache.stats()["hits"] == hits
+
+
+def test_cache_stats_endpoint(client, auth_headers):
+    response = client.get("/stats/cache", headers=auth_headers)
+    assert response.status_code == 200
+    assert {"entries", "bytes", "hits", "misses"} <= set(response.json()["dashboard"])
+
+
+def test_cache_stats_include_hit_rate():
+    cache = TTLCache("hit-rate-test", max_bytes=1024, ttl=60, register=False)
+    assert cache.stats()["hit_rate"] == 0.0
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("b")
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_unregistered_caches_stay_out_of_stats():
+    TTLCache("unregistered-test", max_bytes=1024, ttl=60, register=False)
+    assert "unregistered-test" not in CACHES
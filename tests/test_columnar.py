@@ -0,0 +1,89 @@
+"""Tests for Arrow IPC / Parquet content negotiation."""
+import io
+import threading
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+ARROW = "application/vnd.apache.arrow.stream"
+
+
+def _read_arrow(response):
+    assert response.status_code == 200
+    assert response.headers["content-type"] == ARROW
+    return pa.ipc.open_stream(response.content).read_all()
+
+
+def test_progression_arrow_matches_json(client, auth_headers):
+    json_rows = client.get("/dashboard/championship_progression", headers=auth_headers).json()
+    response = client.get(
+        "/dashboard/championship_progression", headers={**auth_headers, "Accept": ARROW},
+    )
+    table = _read_arrow(response)
+    assert response.headers["vary"] == "Accept"
+    assert table.num_rows == len(json_rows)
+    assert table.column_names == list(json_rows[0])
+    assert pa.types.is_dictionary(table.schema.field("driver_name").type)
+    assert table.column("driver_name").to_pylist() == [r["driver_name"] for r in json_rows]
+
+
+def test_constructor_wins_parquet(client, auth_headers):
+    response = client.get(
+        "/dashboard/constructor_wins_by_era", headers=auth_headers, params={"format": "parquet"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.parquet"
+    table = pq.read_table(io.BytesIO(response.content))
+    assert table.num_rows > 0
+    assert min(table.column("wins").to_pylist()) > 0
+
+
+def test_list_route_arrow_keeps_headers(client, auth_headers):
+    params = {"filter": '{"race_id": 1}', "range": "[0, 4]", "format": "arrow"}
+    response = client.get("/results", headers=auth_headers, params=params)
+    table = _read_arrow(response)
+    assert table.num_rows == 5
+    assert response.headers["content-range"].startswith("results 0-4/")
+    assert set(table.column("race_id").to_pylist()) == {1}
+
+
+def test_list_route_arrow_cursor(client, auth_headers):
+    params = {"range": "[0, 4]", "cursor": "", "format": "arrow"}
+    response = client.get("/results", headers=auth_headers, params=params)
+    table = _read_arrow(response)
+    assert "_cursor_rowid" not in table.column_names
+    assert response.headers["x-next-cursor"]
+
+
+def test_empty_result_arrow(client, auth_headers):
+    params = {"filter": '{"race_id": -1}', "format": "arrow"}
+    table = _read_arrow(client.get("/results", headers=auth_headers, params=params))
+    assert table.num_rows == 0
+    assert "race_id" in table.column_names
+
+
+def test_mixed_type_column_falls_back_to_strings():
+    from esm_fullstack_challenge.responses import to_arrow_table
+
+    table = to_arrow_table(("a", "b"), [(1, "x"), ("\\N", "x")])
+    assert table.column("a").to_pylist() == ["1", "\\N"]
+
+
+def test_columnar_encoding_runs_in_db_executor(client, auth_headers, monkeypatch):
+    from esm_fullstack_challenge.responses import encode_columnar
+    from esm_fullstack_challenge.routers import dashboard, utils
+
+    threads = []
+
+    def spy(*args):
+        threads.append(threading.current_thread().name)
+        return encode_columnar(*args)
+
+    monkeypatch.setattr(utils, "encode_columnar", spy)
+    monkeypatch.setattr(dashboard, "encode_columnar", spy)
+    for path in ("/races", "/dashboard/constructor_wins_by_era"):
+        _read_arrow(client.get(path, headers={**auth_headers, "Accept": ARROW}))
+    assert len(threads) == 2
+    assert all(name.startswith("db") for name in threads)
@@ -0,0 +1,137 @@
+"""Tests for the dashboard analytics endpoints."""
+from esm_fullstack_challenge.routers.dashboard import progression_matrix
+
+
+def test_top_drivers_by_wins(client, auth_headers):
+    response = client.get(
+        "/dashboard/top_drivers_by_wins",
+        headers=auth_headers,
+        params={"range": "[0, 9]"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert 0 < len(data) <= 10
+    wins = [d["number_of_wins"] for d in data]
+    assert wins == sorted(wins, reverse=True)
+
+
+def test_championship_progression(client, auth_headers):
+    response = client.get("/dashboard/championship_progression", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data
+    assert {"round", "race_name", "driver_name", "points", "season"} <= set(data[0])
+    assert len({d["season"] for d in data}) == 1
+
+
+def test_constructor_wins_by_era(client, auth_headers):
+    response = client.get("/dashboard/constructor_wins_by_era", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data
+    assert all(d["wins"] > 0 for d in data)
+
+
+def test_championship_progression_multiple_seasons(client, auth_headers):
+    response = client.get(
+        "/dashboard/championship_progression", headers=auth_headers, params={"seasons": "2001,2000"},
+    )
+    assert response.status_code == 200
+    assert {d["season"] for d in response.json()} == {2000, 2001}
+
+
+def test_championship_progression_matrix(client, auth_headers):
+    params = {"season": 2000}
+    rows = client.get("/dashboard/championship_progression", headers=auth_headers, params=params).json()
+    response = client.get(
+        "/dashboard/championship_progression", headers=auth_headers, params={**params, "shape": "matrix"},
+    )
+    assert response.status_code == 200
+    [matrix] = response.json()
+    assert matrix["season"] == 2000
+    assert matrix["rounds"] == sorted({r["round"] for r in rows})
+    assert len(matrix["race_names"]) == len(matrix["rounds"])
+    assert set(matrix["driver_ids"]) == {r["driver_id"] for r in rows}
+    assert len(matrix["drivers"]) == len(matrix["driver_ids"])
+    assert len(matrix["points"]) == len(matrix["drivers"])
+    assert all(len(line) == len(matrix["rounds"]) for line in matrix["points"])
+
+    by_key = {(r["driver_id"], r["round"]): r["points"] for r in rows}
+    for driver, line in zip(matrix["driver_ids"], matrix["points"]):
+        for round_, points in zip(matrix["rounds"], line):
+            if (driver, round_) in by_key:
+                assert points == by_key[(driver, round_)]
+    final = [line[-1] for line in matrix["points"] if line[-1] is not None]
+    assert final == sorted(final, reverse=True)
+
+
+def test_championship_progression_matrix_keeps_namesakes_apart():
+    columns = ("round", "race_name", "driver_id", "driver_name", "points", "season")
+    rows = [
+        (1, "GP 1", 1, "Same Name", 10.0, 2000),
+        (1, "GP 1", 2, "Same Name", 6.0, 2000),
+        (2, "GP 2", 1, "Same Name", 12.0, 2000),
+        (2, "GP 2", 2, "Same Name", 16.0, 2000),
+    ]
+    [matrix] = progression_matrix(columns, rows)
+    assert matrix["driver_ids"] == [2, 1]
+    assert matrix["drivers"] == ["Same Name", "Same Name"]
+    assert matrix["points"] == [[6.0, 16.0], [10.0, 12.0]]
+
+
+def test_championship_progression_matrix_multiple_seasons(client, auth_headers):
+    response = client.get(
+        "/dashboard/championship_progression", headers=auth_headers,
+        params={"seasons": "2000,2001,2002", "shape": "matrix"},
+    )
+    assert [m["season"] for m in response.json()] == [2000, 2001, 2002]
+
+
+def test_championship_progression_invalid_params(client, auth_headers):
+    path = "/dashboard/championship_progression"
+    assert client.get(path, headers=auth_headers, params={"seasons": "abc"}).status_code == 400
+    too_many = ",".join(str(year) for year in range(1990, 2005))
+    assert client.get(path, headers=auth_headers, params={"seasons": too_many}).status_code == 400
+    assert client.get(path, headers=auth_headers, params={"shape": "cube"}).status_code == 422
+    assert client.get(path, headers=auth_headers, params={"shape": "matrix", "format": "arrow"}).status_code == 400
+
+
+def test_dashboard_bundle(client, auth_headers):
+    response = client.get(
+        "/dashboard/bundle", headers=auth_headers, params={"range": "[0, 9]", "shape": "matrix"},
+    )
+    assert response.status_code == 200
+    body = response.json()
+    widgets = body["widgets"]
+    assert set(widgets) == {"top_drivers_by_wins", "championship_progression", "constructor_wins_by_era"}
+    assert all(set(w) == {"data"} for w in widgets.values())
+    assert "widget_top_drivers_by_wins;dur=" in response.headers["Server-Timing"]
+    assert len(widgets["top_drivers_by_wins"]["data"]) == 10
+    assert "points" in widgets["championship_progression"]["data"][0]
+    assert widgets["constructor_wins_by_era"]["data"] == client.get(
+        "/dashboard/constructor_wins_by_era", headers=auth_headers,
+    ).json()
+
+
+def test_dashboard_bundle_matches_its_etag(client, auth_headers):
+    # The ETag only covers table versions, so the body must not vary between requests
+    first = client.get("/dashboard/bundle", headers=auth_headers)
+    second = client.get("/dashboard/bundle", headers=auth_headers)
+    assert first.headers["ETag"] == second.headers["ETag"]
+    assert first.content == second.content
+
+
+def test_dashboard_bundle_partial_failure(client, auth_headers):
+    response = client.get(
+        "/dashboard/bundle", headers=auth_headers,
+        params={"widgets": "constructor_wins_by_era,championship_progression", "seasons": "abc"},
+    )
+    assert response.status_code == 200
+    widgets = response.json()["widgets"]
+    assert widgets["championship_progression"]["status"] == 400
+    assert "data" in widgets["constructor_wins_by_era"]
+
+
+def test_dashboard_bundle_unknown_widget(client, auth_headers):
+    response = client.get("/dashboard/bundle", headers=auth_headers, params={"widgets": "nope"})
+    assert response.status_code == 400
@@ -0,0 +1,103 @@
+"""Tests for the pooled SQLite connections."""
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+from esm_fullstack_challenge.db import DB, ConnectionPool, PoolTimeout
+
+
+def test_pool_reuses_connections(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=2)
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+    pool.release(conn)
+    assert pool.stats()["created"] == 1
+    pool.close()
+
+
+def test_pool_applies_pragmas(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), pragmas={
+        "journal_mode": "wal",
+        "busy_timeout": 1234,
+    })
+    conn = pool.acquire()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234
+    pool.release(conn)
+    pool.close()
+
+
+def test_pool_is_bounded(tmp_path):
+    pool = ConnectionPool(str(tmp_path / "pool.db"), max_size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeout):
+        pool.acquire()
+
+    released = threading.Timer(0.05, pool.release, args=(conn,))
+    pool.timeout = 2
+    released.start()
+    assert pool.acquire() is conn
+    assert pool.stats()["open"] == 1
+    pool.close()
+
+
+def test_release_resets_connection_state(tmp_path):
+    db = DB(str(tmp_path / "pool.db"), max_size=1)
+    with db.get_connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+    with pytest.raises(RuntimeError):
+        with db.get_connection() as conn:
+            conn.row_factory = dict
+            conn.execute("INSERT INTO t VALUES (1)")
+            raise RuntimeError("boom")
+    with db.get_connection() as conn:
+        assert conn.row_factory is None
+        assert conn.execute("SELECT count(*) FROM t").fetchone()[0] == 0
+    db.close()
+
+
+def test_async_db_runs_on_executor(tmp_path):
+    db = DB(str(tmp_path / "pool.db"), executor_workers=2)
+
+    def thread_name(conn):
+        conn.execute("SELECT 1")
+        return threading.current_thread().name
+
+    async def run():
+        names = await asyncio.gather(*(db.aio.run(thread_name) for _ in range(4)))
+        row = await db.aio.fetch_one("SELECT ? + 1", (41,))
+        return names, row
+
+    names, row = asyncio.run(run())
+    assert all(name.startswith("db") for name in names)
+    assert row == (42,)
+    assert db.pool.stats()["created"] <= 2
+    db.close()
+
+
+def test_db_stats_endpoint(client, auth_headers):
+    response = client.get("/stats/db", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] >= 1
+    assert data["in_use"] >= 0
+
+
+def test_pool_switches_to_wal_once(tmp_path):
+    path = str(tmp_path / "pool.db")
+    pool = ConnectionPool(path, pragmas={"journal_mode": "wal", "busy_timeout": 1234})
+    # WAL is persistent, so it is already set before any pooled connection opens
+    assert sqlite3.connect(path).execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conns = [pool.acquire() for _ in range(3)]
+    assert all(conn.execute("PRAGMA busy_timeout").fetchone()[0] == 1234 for conn in conns)
+    for conn in conns:
+        pool.release(conn)
+    pool.close()
+
+
+def test_app_lifespan_uses_test_copy(client):
+    # The lifespan migrates its DB; the bundled data.db must stay untouched
+    assert client.app.state.db.db_file == "test_data.db"
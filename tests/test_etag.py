@@ -0,0 +1,72 @@
+"""Tests for ETag / conditional GET support."""
+import pytest
+
+from esm_fullstack_challenge.dependencies.etag import etag_matches
+from esm_fullstack_challenge.routers import utils as route_utils
+
+
+def _revalidate(client, auth_headers, path, params=None):
+    first = client.get(path, headers=auth_headers, params=params)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    second = client.get(path, headers={**auth_headers, "If-None-Match": etag}, params=params)
+    return etag, second
+
+
+@pytest.mark.parametrize("path", [
+    "/results",
+    "/results/1",
+    "/drivers",
+    "/users",
+    "/dashboard/top_drivers_by_wins",
+    "/dashboard/championship_progression",
+    "/dashboard/constructor_wins_by_era",
+])
+def test_not_modified(client, auth_headers, path):
+    etag, response = _revalidate(client, auth_headers, path)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_etag_depends_on_query_and_accept(client, auth_headers):
+    etags = {
+        client.get("/results", headers=auth_headers, params=params).headers["etag"]
+        for params in ({}, {"range": "[0, 9]"}, {"filter": '{"race_id": 1}'}, {"format": "json"})
+    }
+    assert len(etags) == 4
+    arrow = client.get("/results", headers={**auth_headers, "Accept": "application/vnd.apache.arrow.stream"})
+    assert arrow.headers["etag"] not in etags
+
+
+def test_table_write_changes_etag(client, auth_headers, test_db):
+    etag = client.get("/results", headers=auth_headers).headers["etag"]
+    with test_db.get_connection() as conn:
+        conn.execute("UPDATE results SET points = points WHERE id = 1")
+    response = client.get("/results", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_users_write_changes_etag(client, auth_headers):
+    etag = client.get("/users", headers=auth_headers).headers["etag"]
+    created = client.post("/users", headers=auth_headers, json={
+        "username": "etaguser", "full_name": "ETag User", "role": "member",
+    })
+    assert created.status_code == 201
+    response = client.get("/users", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert any(u["username"] == "etaguser" for u in response.json())
+
+
+def test_fast_json_keeps_etag(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(route_utils, "FAST_JSON_RESPONSES", True)
+    etag, response = _revalidate(client, auth_headers, "/lap_times")
+    assert response.status_code == 304
+
+
+def test_etag_matches():
+    assert etag_matches('W/"abc"', '"xyz", W/"abc"')
+    assert etag_matches('W/"abc"', '"abc"')
+    assert etag_matches('W/"abc"', "*")
+    assert not etag_matches('W/"abc"', 'W/"abd"')
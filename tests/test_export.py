@@ -0,0 +1,91 @@
+"""Tests for the streaming /export routes."""
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+from esm_fullstack_challenge.db import DB, PoolTimeout
+
+
+def test_export_ndjson_matches_filtered_count(client, auth_headers, test_db):
+    response = client.get(
+        "/export/results", headers=auth_headers, params={"filter": '{"race_id": [1, 2]}'},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert 'filename="results.ndjson"' in response.headers["content-disposition"]
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    with test_db.get_connection() as conn:
+        expected = conn.execute("SELECT count(*) FROM results WHERE race_id IN (1, 2)").fetchone()[0]
+    assert len(rows) == expected > 0
+    assert {r["race_id"] for r in rows} == {1, 2}
+
+
+def test_export_csv_honors_sort(client, auth_headers):
+    response = client.get(
+        "/export/results", headers=auth_headers,
+        params={"format": "csv", "filter": '{"race_id": 1}', "sort": '["points", "DESC"]'},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    reader = csv.DictReader(io.StringIO(response.text))
+    assert reader.fieldnames[:2] == ["id", "race_id"]
+    points = [float(row["points"]) for row in reader]
+    assert points and points == sorted(points, reverse=True)
+
+
+def test_export_streams_in_batches(test_db):
+    async def main():
+        batches = test_db.aio.iter_batches("SELECT * FROM lap_times", batch_size=100)
+        columns = await anext(batches)
+        return columns, [len(rows) async for rows in batches]
+
+    columns, sizes = asyncio.run(main())
+    assert "milliseconds" in columns
+    assert max(sizes) == 100
+
+
+def test_export_uses_the_export_pool(test_db):
+    async def main():
+        batches = test_db.aio.iter_batches(
+            "SELECT * FROM lap_times", batch_size=10, transform=lambda columns, rows: len(rows),
+        )
+        await anext(batches)
+        assert await anext(batches) == 10
+        # Held outside the main pool, so slow downloads cannot exhaust it
+        assert test_db.pool.stats()["in_use"] == 0
+        assert test_db.export_pool.stats()["in_use"] == 1
+        await batches.aclose()
+        assert test_db.export_pool.stats()["in_use"] == 0
+
+    asyncio.run(main())
+
+
+def test_concurrent_exports_are_capped(tmp_path):
+    db = DB(str(tmp_path / "export.db"), export_connections=1, timeout=0.05)
+    with db.get_connection() as conn:
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(10)])
+
+    async def main():
+        first = db.aio.iter_batches("SELECT * FROM t", batch_size=1)
+        await anext(first)
+        second = db.aio.iter_batches("SELECT * FROM t", batch_size=1)
+        with pytest.raises(PoolTimeout):
+            await anext(second)
+        await first.aclose()
+
+    asyncio.run(main())
+    assert db.export_pool.stats()["open"] <= 1
+    db.close()
+
+
+def test_export_invalid_format(client, auth_headers):
+    response = client.get("/export/results", headers=auth_headers, params={"format": "xml"})
+    assert response.status_code == 422
+
+
+def test_export_requires_auth(client):
+    assert client.get("/export/results").status_code == 401
@@ -0,0 +1,33 @@
+"""Tests for the opt-in orjson path of the generated routes."""
+import pytest
+
+from esm_fullstack_challenge.routers import utils as route_utils
+
+
+@pytest.fixture
+def fast_json(monkeypatch):
+    monkeypatch.setattr(route_utils, "FAST_JSON_RESPONSES", True)
+
+
+@pytest.mark.parametrize("path", ["/results", "/lap_times", "/drivers", "/races"])
+def test_fast_json_matches_default(client, auth_headers, monkeypatch, path):
+    params = {"range": "[0, 49]"}
+    default = client.get(path, headers=auth_headers, params=params)
+    monkeypatch.setattr(route_utils, "FAST_JSON_RESPONSES", True)
+    fast = client.get(path, headers=auth_headers, params=params)
+    assert fast.status_code == 200
+    assert fast.json() == default.json()
+    assert fast.headers["content-range"] == default.headers["content-range"]
+
+
+def test_fast_json_id_route(client, auth_headers, fast_json):
+    response = client.get("/results/1", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == 1
+    assert client.get("/results/-1", headers=auth_headers).status_code == 404
+
+
+def test_fast_json_keeps_openapi_schema(client, fast_json):
+    schema = client.get("/openapi.json").json()
+    response_schema = schema["paths"]["/results"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+    assert response_schema["items"]["$ref"].endswith("/ResultsModel")
@@ -0,0 +1,132 @@
+"""Tests for the bounded password hashing pool."""
+import asyncio
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from esm_fullstack_challenge.auth import HashingBusy, PasswordHasher, password_hasher
+from esm_fullstack_challenge.auth.hashing import get_rounds
+
+
+def test_hash_verify_and_rehash():
+    hasher = PasswordHasher(max_workers=1, rounds=4)
+
+    async def main():
+        hashed = await hasher.hash("secret")
+        return hashed, await hasher.verify("secret", hashed), await hasher.verify("wrong", hashed)
+
+    hashed, ok, wrong = asyncio.run(main())
+    assert get_rounds(hashed) == 4
+    assert ok and not wrong
+    assert not hasher.needs_rehash(hashed)
+    assert PasswordHasher(max_workers=1, rounds=5).needs_rehash(hashed)
+    assert hasher.stats()["completed"] == 3
+
+
+def test_rejects_when_saturated():
+    hasher = PasswordHasher(max_workers=1, max_queue=0, queue_timeout=5)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(hasher.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(HashingBusy):
+            await hasher.run(lambda: None)
+        release.set()
+        await running
+
+    asyncio.run(main())
+    assert hasher.stats()["rejected"] == 1
+    assert hasher.stats()["queued"] == 0
+
+
+def test_queue_timeout():
+    hasher = PasswordHasher(max_workers=1, max_queue=1, queue_timeout=0.05)
+    release = threading.Event()
+
+    async def main():
+        running = asyncio.ensure_future(hasher.run(release.wait, 0.2))
+        await asyncio.sleep(0.01)
+        queued = asyncio.ensure_future(hasher.run(lambda: None))
+        await running
+        with pytest.raises(HashingBusy):
+            await queued
+
+    asyncio.run(main())
+    assert hasher.stats()["timed_out"] == 1
+
+
+def test_queue_timeout_does_not_wait_for_backlog():
+    hasher = PasswordHasher(max_workers=1, max_queue=1, queue_timeout=0.05)
+    release = threading.Event()
+    ran = []
+
+    async def main():
+        running = asyncio.ensure_future(hasher.run(release.wait))
+        await asyncio.sleep(0.01)
+        start = time.monotonic()
+        with pytest.raises(HashingBusy):
+            await hasher.run(ran.append, "queued")
+        waited = time.monotonic() - start
+        release.set()
+        await running
+        await asyncio.sleep(0.05)  # let the worker reach (and skip) the abandoned job
+        return waited
+
+    waited = asyncio.run(main())
+    assert waited < 1
+    assert ran == []
+    assert hasher.stats()["timed_out"] == 1
+    assert hasher.stats()["queued"] == 0
+
+
+def test_login_returns_503_when_hashing_busy(client, monkeypatch):
+    async def busy(*args):
+        raise HashingBusy("Too many password hashing requests")
+
+    monkeypatch.setattr(password_hasher, "verify", busy)
+    response = client.post("/auth/login", json={"username": "janedoe", "password": "password"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_login_rehashes_when_rounds_change(client, auth_headers, monkeypatch, test_db):
+    resp = client.post("/users", headers=auth_headers, json={
+        "username": "rehashuser",
+        "full_name": "Rehash User",
+    })
+    password = resp.json()["initial_password"]
+
+    def stored_rounds():
+        with test_db.get_connection() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT hashed_password FROM users WHERE username = 'rehashuser'").fetchone()
+        return get_rounds(row["hashed_password"])
+
+    assert stored_rounds() == password_hasher.rounds
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    login = {"username": "rehashuser", "password": password}
+    assert client.post("/auth/login", json=login).status_code == 200
+    assert stored_rounds() == 4
+    assert client.post("/auth/login", json=login).status_code == 200
+
+
+def test_rehash_does_not_overwrite_a_concurrent_password_change(test_db):
+    from esm_fullstack_challenge.auth.service import update_password_hash
+
+    with test_db.get_connection() as conn:
+        user_id, old_hash = conn.execute("SELECT id, hashed_password FROM users WHERE username = 'johndoe'").fetchone()
+        changed = password_hasher.hash_sync("changed")
+        conn.execute("UPDATE users SET hashed_password = ? WHERE id = ?", (changed, user_id))
+        # The rehash computed from the old password arrives after the change
+        assert not update_password_hash(conn, user_id, "rehashed-old-password", old_hash)
+        assert conn.execute("SELECT hashed_password FROM users WHERE id = ?", (user_id,)).fetchone()[0] == changed
+        assert update_password_hash(conn, user_id, old_hash, changed)
+
+
+def test_hashing_stats_endpoint(client, auth_headers):
+    response = client.get("/stats/hashing", headers=auth_headers)
+    assert response.status_code == 200
+    assert {"running", "queued", "rejected", "timed_out", "rounds"} <= set(response.json())
@@ -0,0 +1,43 @@
+"""Tests for the index manifest and advisor."""
+import logging
+import sqlite3
+
+from esm_fullstack_challenge.db.indexes import IndexAdvisor, ensure_indexes
+
+
+def _make_db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE results (id INTEGER, race_id INTEGER, driver_id INTEGER, points REAL)")
+    conn.execute("CREATE TABLE lap_times (race_id INTEGER, driver_id INTEGER, lap INTEGER)")
+    conn.execute("CREATE TABLE seasons (year INTEGER, url TEXT)")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT)")
+    conn.executemany("INSERT INTO results VALUES (?, ?, ?, ?)", [(i, i % 10, i % 7, 1.0) for i in range(100)])
+    return conn
+
+
+def test_ensure_indexes_is_idempotent():
+    conn = _make_db()
+    created = ensure_indexes(conn)
+    assert set(created) == {
+        "idx_results_race_id", "idx_results_driver_id", "idx_results_id",
+        "idx_lap_times_race_id_driver_id_lap",
+    }
+    assert ensure_indexes(conn) == []
+    assert conn.execute("SELECT count(*) FROM sqlite_stat1").fetchone()[0] > 0
+
+
+def test_id_lookup_uses_index():
+    conn = _make_db()
+    ensure_indexes(conn)
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM results WHERE id = ?", (5,)).fetchall()
+    assert "USING INDEX idx_results_id" in plan[0][3]
+
+
+def test_index_advisor_reports_unindexed_columns(caplog):
+    conn = _make_db()
+    ensure_indexes(conn)
+    advisor = IndexAdvisor()
+    with caplog.at_level(logging.WARNING):
+        assert advisor.check(conn, "results", ["race_id", "points"]) == ["points"]
+        advisor.check(conn, "results", ["points"])
+    assert len([r for r in caplog.records if "results.points" in r.getMessage()]) == 1
@@ -0,0 +1,72 @@
+"""Tests for the Prometheus /metrics endpoint."""
+import os
+
+from prometheus_client.parser import text_string_to_metric_families
+
+from esm_fullstack_challenge.metrics import normalize_query
+from esm_fullstack_challenge.routers import metrics as metrics_module
+
+
+def scrape(client, token: str | None = None) -> dict:
+    token = token or os.environ["METRICS_TOKEN"]  # set by conftest
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return {family.name: family for family in text_string_to_metric_families(response.text)}
+
+
+def samples(family, name: str, **labels) -> list:
+    return [
+        sample.value for sample in family.samples
+        if sample.name == name and all(sample.labels.get(k) == v for k, v in labels.items())
+    ]
+
+
+def test_normalize_query():
+    assert normalize_query(
+        "select * from results where driver_id in (?, ?, ?) and grid = 3 limit ? offset ?;"
+    ) == "select * from results where driver_id in (?+) and grid = ? limit ? offset ?"
+    assert normalize_query("SELECT *  FROM status\n WHERE status = 'Finished'") == \
+        "SELECT * FROM status WHERE status = ?"
+
+
+def test_request_latency_by_route_template(client, auth_headers):
+    client.get("/results/1", headers=auth_headers)
+    client.get("/results/2", headers=auth_headers)
+    families = scrape(client)
+    latency = families["http_request_duration_seconds"]
+    assert samples(latency, "http_request_duration_seconds_count", route="/results/{id}", status="200")[0] >= 2
+    assert not samples(latency, "http_request_duration_seconds_count", route="/results/1")
+    assert "http_requests_in_flight" in families
+
+
+def test_sql_latency_by_query_shape(client, auth_headers):
+    client.get("/results", headers=auth_headers, params={"filter": '{"driver_id": [1, 2]}'})
+    client.get("/results", headers=auth_headers, params={"filter": '{"driver_id": [3, 4, 5]}'})
+    sql = scrape(client)["db_query_duration_seconds"]
+    shape = "select * from results where driver_id in (?+) limit ? offset ?"
+    assert samples(sql, "db_query_duration_seconds_count", shape=shape)[0] >= 2
+
+
+def test_live_stats(client, auth_headers):
+    client.get("/auth/me", headers=auth_headers)
+    families = scrape(client)
+    assert samples(families["db_pool_connections"], "db_pool_connections", state="open")
+    assert samples(families["cache_hits"], "cache_hits_total", cache="auth")
+    assert samples(families["cache_misses"], "cache_misses_total", cache="totals")
+    assert samples(families["bulkhead_queued"], "bulkhead_queued", route_class="default") == [0.0]
+    assert "password_hashing_rejected" in families
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(metrics_module, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    scrape(client, token="scrape-secret")
+
+
+def test_metrics_require_a_token_unless_public(client, monkeypatch):
+    monkeypatch.setattr(metrics_module, "METRICS_TOKEN", "")
+    assert client.get("/metrics").status_code == 401
+    monkeypatch.setattr(metrics_module, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
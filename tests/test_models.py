@@ -0,0 +1,85 @@
+"""Tests for schema-driven model generation."""
+import json
+import sqlite3
+from typing import Any, Optional
+
+import pytest
+from pydantic import ValidationError
+
+from esm_fullstack_challenge.models import AutoGenModels
+from esm_fullstack_challenge.models.utils import autogen_models, get_python_type
+
+SCHEMA = """
+CREATE TABLE teams (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    founded DATE,
+    budget REAL,
+    logo BLOB,
+    extra
+);
+"""
+
+
+@pytest.fixture
+def small_db(tmp_path):
+    path = str(tmp_path / "small.db")
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    conn.close()
+    return path
+
+
+@pytest.mark.parametrize("declared, expected", [
+    ("INTEGER", int), ("BIGINT", int), ("TEXT", str), ("VARCHAR(20)", str), ("DATE", str),
+    ("REAL", float), ("DOUBLE PRECISION", float), ("NUMERIC", float), ("BLOB", bytes),
+    ("BOOLEAN", bool), ("", Any),
+])
+def test_get_python_type(declared, expected):
+    assert get_python_type(declared) is expected
+
+
+def test_models_follow_declared_types(small_db):
+    fields = autogen_models(small_db, snapshot_file="")["teams"].model_fields
+    assert fields["id"].annotation is int
+    assert fields["name"].annotation is str
+    assert fields["budget"].annotation == Optional[float]
+    assert fields["founded"].annotation == Optional[str]
+    assert all(field.is_required() for field in fields.values())
+
+
+def test_nullable_columns_accept_none(small_db):
+    model = autogen_models(small_db, snapshot_file="")["teams"]
+    row = model(id=1, name="A", founded=None, budget=None, logo=None, extra=None)
+    assert row.budget is None
+    with pytest.raises(ValidationError):
+        model(id=1, name=None, founded=None, budget=None, logo=None, extra=None)
+
+
+def test_schema_snapshot(small_db, tmp_path):
+    snapshot_file = str(tmp_path / "snapshot.json")
+    autogen_models(small_db, snapshot_file=snapshot_file)
+    with open(snapshot_file) as f:
+        snapshot = json.load(f)
+    assert [col[0] for col in snapshot["tables"]["teams"]][:2] == ["id", "name"]
+
+    # A matching snapshot is used as is
+    snapshot["tables"]["teams"].append(["from_snapshot", "TEXT", True])
+    with open(snapshot_file, "w") as f:
+        json.dump(snapshot, f)
+    assert "from_snapshot" in autogen_models(small_db, snapshot_file=snapshot_file)["teams"].model_fields
+
+    # A schema change invalidates it
+    conn = sqlite3.connect(small_db)
+    conn.execute("ALTER TABLE teams ADD COLUMN country TEXT")
+    conn.close()
+    fields = autogen_models(small_db, snapshot_file=snapshot_file)["teams"].model_fields
+    assert "country" in fields and "from_snapshot" not in fields
+
+
+def test_app_models_match_tables():
+    fields = AutoGenModels["results"].model_fields
+    assert fields["id"].annotation == Optional[int]
+    assert fields["points"].annotation == Optional[float]
+    assert fields["position"].annotation == Optional[str]
+    assert "_driver_wins" not in AutoGenModels
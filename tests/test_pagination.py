@@ -0,0 +1,89 @@
+"""Tests for keyset (cursor) pagination on the generated list routes."""
+from esm_fullstack_challenge.db import query_builder
+
+
+def test_query_builder_seek():
+    query, params = query_builder(
+        table='results',
+        filter_by=[('race_id', 1)],
+        order_by=[('points', 'desc'), ('rowid', 'desc')],
+        limit=10,
+        seek=(['points', 'rowid'], [10.0, 42], 'desc'),
+    )
+    assert query == (
+        'select * from results where race_id = ? and ((points, rowid) < (?, ?) or points is null)'
+        ' order by points desc, rowid desc limit ?;'
+    )
+    assert params == [1, 10.0, 42, 10]
+
+
+def _walk(client, auth_headers, params):
+    rows, cursor = [], ''
+    while cursor is not None:
+        response = client.get("/results", headers=auth_headers, params={**params, "cursor": cursor})
+        assert response.status_code == 200
+        rows.extend(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+    return rows
+
+
+def test_cursor_pages_match_offset_listing(client, auth_headers):
+    params = {"filter": '{"race_id": 1}', "sort": '["points", "DESC"]'}
+    expected = client.get(
+        "/results", headers=auth_headers, params={**params, "range": "[0, 999]"},
+    ).json()
+    rows = _walk(client, auth_headers, {**params, "range": "[0, 6]"})
+    assert len(rows) == len(expected)
+    assert sorted(r["id"] for r in rows) == sorted(r["id"] for r in expected)
+    points = [r["points"] for r in rows]
+    assert points == sorted(points, reverse=True)
+
+
+def test_cursor_without_sort_uses_rowid(client, auth_headers):
+    rows = _walk(client, auth_headers, {"filter": '{"race_id": 2}', "range": "[0, 4]"})
+    assert len({r["id"] for r in rows}) == len(rows) > 5
+
+
+def test_cursor_pages_report_their_position(client, auth_headers):
+    params = {"filter": '{"race_id": 1}', "range": "[0, 6]"}
+    ranges, cursor = [], ""
+    while cursor is not None:
+        response = client.get("/results", headers=auth_headers, params={**params, "cursor": cursor})
+        ranges.append(response.headers["Content-Range"])
+        cursor = response.headers.get("X-Next-Cursor")
+    total = ranges[0].rsplit("/", 1)[1]
+    assert ranges[:2] == [f"results 0-6/{total}", f"results 7-13/{total}"]
+
+
+def test_query_builder_seek_after_null():
+    query, params = query_builder(
+        table='results', order_by=[('position', 'asc'), ('rowid', 'asc')], limit=10,
+        seek=(['position', 'rowid'], [None, 42], 'asc'),
+    )
+    assert 'where ((position is null and (rowid) > (?)) or position is not null)' in query
+    assert params == [42, 10]
+
+
+def test_cursor_walks_nullable_sort_column_to_the_end(client, auth_headers, test_db):
+    with test_db.get_connection() as conn:
+        conn.execute("UPDATE results SET position = NULL WHERE race_id = 3 AND position_order > 15")
+    try:
+        for direction in ("ASC", "DESC"):
+            params = {"filter": '{"race_id": 3}', "sort": f'["position", "{direction}"]'}
+            expected = client.get(
+                "/results", headers=auth_headers, params={**params, "range": "[0, 999]"},
+            ).json()
+            assert any(r["position"] is None for r in expected)
+            rows = _walk(client, auth_headers, {**params, "range": "[0, 2]"})
+            assert sorted(r["id"] for r in rows) == sorted(r["id"] for r in expected)
+            assert [r["position"] for r in rows] == [r["position"] for r in expected]
+    finally:
+        with test_db.get_connection() as conn:
+            conn.execute(
+                "UPDATE results SET position = CAST(position_order AS TEXT) WHERE race_id = 3 AND position IS NULL"
+            )
+
+
+def test_invalid_cursor(client, auth_headers):
+    response = client.get("/results", headers=auth_headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
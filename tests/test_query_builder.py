@@ -0,0 +1,57 @@
+"""Tests for the parameterized `query_builder`."""
+import pytest
+
+from esm_fullstack_challenge.db import query_builder
+
+
+def test_values_are_bound_as_parameters():
+    query, params = query_builder(
+        table='drivers',
+        filter_by=[('nationality', 'British'), ('id', (1, 2, 3)), ('number', '>', 5)],
+        order_by=[('surname', 'asc')],
+        limit=25,
+        offset=50,
+    )
+    assert query == (
+        'select * from drivers'
+        ' where nationality = ? and id in (?, ?, ?) and number > ?'
+        ' order by surname asc limit ? offset ?;'
+    )
+    assert params == ['British', 1, 2, 3, 5, 25, 50]
+
+
+def test_same_shape_yields_same_sql():
+    first, first_params = query_builder(table='results', filter_by=[('race_id', 1)], limit=10)
+    second, second_params = query_builder(table='results', filter_by=[('race_id', 2)], limit=20)
+    assert first == second
+    assert first_params != second_params
+
+
+def test_count_only_ignores_limit_and_offset():
+    query, params = query_builder(
+        table='results', filter_by=[('driver_id', 1)], limit=10, offset=5, count_only=True,
+    )
+    assert query == 'select count(*) from results where driver_id = ?;'
+    assert params == [1]
+
+
+def test_quotes_in_values_are_not_interpolated():
+    query, params = query_builder(table='drivers', filter_by=[('surname', 'O"Brien')])
+    assert 'Brien' not in query
+    assert params == ['O"Brien']
+
+
+def test_invalid_operator():
+    with pytest.raises(ValueError):
+        query_builder(table='drivers', filter_by=[('id', 'like', 1)])
+
+
+def test_list_route_filters_with_bound_values(client, auth_headers):
+    response = client.get(
+        "/drivers",
+        headers=auth_headers,
+        params={"filter": '{"id": [1, 2, 3]}', "range": "[0, 9]"},
+    )
+    assert response.status_code == 200
+    assert sorted(d["id"] for d in response.json()) == [1, 2, 3]
+    assert response.headers["Content-Range"] == "drivers 0-2/3"
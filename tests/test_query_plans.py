@@ -0,0 +1,179 @@
+"""Query plan regression checks for every SQL shape the API issues.
+
+Plans are compared to `tests/query_plans.json`. After an intended change
+(new index, rewritten query) regenerate the baseline with:
+
+    UPDATE_QUERY_PLANS=1 pytest tests/test_query_plans.py
+"""
+import json
+import os
+import re
+from typing import Any, List, NamedTuple, Tuple
+
+import pytest
+
+from esm_fullstack_challenge.dependencies import CommonQueryParams, encode_cursor
+from esm_fullstack_challenge.models import AutoGenModels
+from esm_fullstack_challenge.routers import dashboard
+from esm_fullstack_challenge.routers.utils import (
+    get_count_query, get_export_query, get_id_column_name, get_id_query, get_list_query,
+)
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "query_plans.json")
+UPDATE_BASELINE = os.environ.get("UPDATE_QUERY_PLANS") == "1"
+
+# Tables big enough that a full scan or an unindexed sort is a regression
+LARGE_TABLES = {"results", "lap_times", "driver_standings"}
+
+
+class QueryShape(NamedTuple):
+    name: str
+    sql: str
+    params: Tuple[Any, ...]
+    allow_scan: bool = False
+    allow_temp_btree: bool = False
+
+
+def _cqp(filter_param="{}", range_param="[0, 24]", sort_param=None, cursor_param=None) -> CommonQueryParams:
+    return CommonQueryParams(
+        filter_param=filter_param, range_param=range_param,
+        sort_param=sort_param, cursor_param=cursor_param,
+    )
+
+
+def _shape(name: str, query: Tuple[str, List[Any]], **kwargs) -> QueryShape:
+    sql, params = query
+    return QueryShape(name, sql, tuple(params), **kwargs)
+
+
+def get_query_shapes() -> List[QueryShape]:
+    """Enumerates the queries of the generated routes and the dashboard."""
+    shapes = []
+    for table in sorted(AutoGenModels):
+        if table == "users":
+            continue
+        # Unfiltered pages and totals walk the table by design
+        shapes.append(_shape(f"{table}.list", get_list_query(table, _cqp()), allow_scan=True))
+        shapes.append(_shape(f"{table}.count", get_count_query(table, _cqp()), allow_scan=True))
+
+        id_col = get_id_column_name(table)
+        if id_col is None:
+            continue
+        filtered = _cqp(filter_param=json.dumps({id_col: 1}))
+        shapes.append(_shape(f"{table}.list_filtered", get_list_query(table, filtered)))
+        shapes.append(_shape(f"{table}.count_filtered", get_count_query(table, filtered)))
+        shapes.append(_shape(f"{table}.export_filtered", get_export_query(table, filtered)))
+        sorted_cqp = _cqp(sort_param=json.dumps([id_col, "ASC"]))
+        shapes.append(_shape(f"{table}.list_sorted", get_list_query(table, sorted_cqp), allow_scan=True))
+        shapes.append(QueryShape(f"{table}.id", get_id_query(table), (1,)))
+        cursor_cqp = _cqp(
+            sort_param=json.dumps([id_col, "ASC"]),
+            cursor_param=encode_cursor([id_col, "rowid"], [1, 1]),
+        )
+        # lap_times ties on race_id are ordered by rowid, which its composite index does
+        # not cover; the partial sort is bounded by a single race's laps
+        shapes.append(_shape(
+            f"{table}.list_cursor", get_list_query(table, cursor_cqp),
+            allow_temp_btree=table == "lap_times",
+        ))
+
+    # The dashboard reads the analytics summaries in index order
+    shapes.append(_shape(
+        "dashboard.top_drivers_by_wins",
+        dashboard.get_top_drivers_by_wins_query(_cqp(range_param="[0, 9]")),
+    ))
+    shapes.append(QueryShape("dashboard.latest_season", dashboard.LATEST_SEASON_QUERY, ()))
+    shapes.append(_shape(
+        "dashboard.championship_progression", dashboard.get_championship_progression_query([2000]),
+    ))
+    shapes.append(_shape(
+        "dashboard.championship_progression_seasons",
+        dashboard.get_championship_progression_query([2000, 2001]),
+    ))
+    shapes.append(QueryShape(
+        "dashboard.constructor_wins_by_era", dashboard.CONSTRUCTOR_WINS_BY_ERA_QUERY, (),
+    ))
+    return shapes
+
+
+def explain(conn, shape: QueryShape) -> List[str]:
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {shape.sql}", shape.params).fetchall()
+    depth = {0: -1}
+    plan = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        plan.append("  " * depth[node_id] + detail)
+    return plan
+
+
+def _scanned_tables(plan: List[str]) -> List[str]:
+    tables = []
+    for line in plan:
+        words = line.split()
+        if words[:1] == ["SCAN"] and len(words) > 1:
+            tables.append(words[1])
+    return tables
+
+
+@pytest.fixture(scope="module")
+def plans(test_db):
+    with test_db.get_connection() as conn:
+        result = {shape.name: explain(conn, shape) for shape in get_query_shapes()}
+    if UPDATE_BASELINE:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+    return result
+
+
+@pytest.fixture(scope="module")
+def baseline():
+    if not os.path.exists(BASELINE_FILE):
+        pytest.fail(f"Missing {BASELINE_FILE}; run with UPDATE_QUERY_PLANS=1 to create it")
+    with open(BASELINE_FILE) as f:
+        return json.load(f)
+
+
+@pytest.mark.parametrize("shape", get_query_shapes(), ids=lambda s: s.name)
+def test_query_plan_matches_baseline(shape, plans, baseline):
+    assert shape.name in baseline, f"New query shape {shape.name}; update the baseline"
+    assert plans[shape.name] == baseline[shape.name], (
+        f"Query plan for {shape.name} changed:\n" + "\n".join(plans[shape.name])
+    )
+
+
+def _mentions(sql: str, table: str, alias: str | None = None) -> bool:
+    """Whether `sql` names `table` as a whole word (optionally aliased as `alias`)."""
+    pattern = rf"\b{re.escape(table)}\b"
+    if alias is not None:
+        pattern += rf"\s+(?:as\s+)?{re.escape(alias)}\b"
+    return re.search(pattern, sql) is not None
+
+
+def test_mentions_matches_whole_table_names():
+    assert _mentions("select * from results where race_id = ?", "results")
+    assert not _mentions("select * from constructor_results", "results")
+    assert not _mentions("select * from sprint_results s", "results", alias="s")
+    assert _mentions("select * from results r join races", "results", alias="r")
+
+
+@pytest.mark.parametrize("shape", get_query_shapes(), ids=lambda s: s.name)
+def test_large_tables_are_not_scanned_or_sorted(shape, plans):
+    plan = plans[shape.name]
+    sql = shape.sql.lower()
+    if not any(_mentions(sql, table) for table in LARGE_TABLES):
+        return
+    if not shape.allow_scan:
+        scanned = [
+            t for t in _scanned_tables(plan)
+            if t in LARGE_TABLES or any(_mentions(sql, table, alias=t) for table in LARGE_TABLES)
+        ]
+        assert not scanned, f"{shape.name} scans {scanned}:\n" + "\n".join(plan)
+    if not shape.allow_temp_btree:
+        assert not any("USE TEMP B-TREE" in line for line in plan), \
+            f"{shape.name} sorts with a temp B-tree:\n" + "\n".join(plan)
+
+
+def test_baseline_has_no_stale_shapes(baseline):
+    names = {shape.name for shape in get_query_shapes()}
+    assert set(baseline) <= names, f"Stale shapes in baseline: {sorted(set(baseline) - names)}"
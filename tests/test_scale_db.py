@@ -0,0 +1,87 @@
+"""Synthetic database scaler (scripts/scale_db.py)."""
+import hashlib
+import importlib.util
+import os
+import sqlite3
+
+import pytest
+
+SOURCE_DB = "test_data.db"
+
+spec = importlib.util.spec_from_file_location(
+    "scale_db", os.path.join(os.path.dirname(__file__), "..", "scripts", "scale_db.py"),
+)
+scale_db = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(scale_db)
+
+FACT_TABLES = ("results", "driver_standings", "qualifying", "lap_times", "pit_stops")
+
+
+def digest(path):
+    conn = sqlite3.connect(path)
+    h = hashlib.sha256()
+    for table in ("drivers", "races") + FACT_TABLES:
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY rowid"):
+            h.update(repr(row).encode())
+    conn.close()
+    return h.hexdigest()
+
+
+@pytest.fixture(scope="module")
+def scaled(tmp_path_factory, setup_test_db):
+    path = str(tmp_path_factory.mktemp("scaled") / "data_2x.db")
+    scale_db.scale_db(SOURCE_DB, path, factor=2, seed=7)
+    return path
+
+
+def count(conn, table):
+    return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+
+def test_scaled_tables_are_multiplied(scaled):
+    src, dst = sqlite3.connect(SOURCE_DB), sqlite3.connect(scaled)
+    for table in ("seasons", "races", "drivers") + FACT_TABLES:
+        assert count(dst, table) == 2 * count(src, table), table
+    for table in ("circuits", "constructors", "status", "users"):
+        assert count(dst, table) == count(src, table), table
+    assert dst.execute("SELECT count(DISTINCT year) FROM races").fetchone()[0] == count(dst, "seasons")
+
+
+def test_first_copy_is_the_source_data(scaled):
+    src, dst = sqlite3.connect(SOURCE_DB), sqlite3.connect(scaled)
+    rows = src.execute("SELECT * FROM results ORDER BY rowid").fetchall()
+    assert dst.execute(f"SELECT * FROM results ORDER BY rowid LIMIT {len(rows)}").fetchall() == rows
+
+
+def test_referential_integrity(scaled):
+    conn = sqlite3.connect(scaled)
+    for table in FACT_TABLES:
+        orphans = conn.execute(
+            f"SELECT count(*) FROM {table} x"
+            " LEFT JOIN races r ON x.race_id = r.id LEFT JOIN drivers d ON x.driver_id = d.id"
+            " WHERE r.id IS NULL OR d.id IS NULL"
+        ).fetchone()[0]
+        assert orphans == 0, table
+    assert conn.execute("SELECT count(*) FROM results GROUP BY race_id, driver_id HAVING count(*) > 1").fetchall() == []
+
+
+def test_scaled_db_is_ready_to_serve(scaled):
+    conn = sqlite3.connect(scaled)
+    assert count(conn, "_driver_wins") > 0
+    assert conn.execute("SELECT row_count FROM _table_changes WHERE name = 'lap_times'").fetchone()[0] == count(
+        conn, "lap_times"
+    )
+
+
+def test_output_is_deterministic(scaled, tmp_path):
+    again, other_seed = str(tmp_path / "again.db"), str(tmp_path / "other.db")
+    scale_db.scale_db(SOURCE_DB, again, factor=2, seed=7)
+    scale_db.scale_db(SOURCE_DB, other_seed, factor=2, seed=8)
+    assert digest(again) == digest(scaled)
+    assert digest(other_seed) != digest(scaled)
+
+
+def test_shift_year():
+    assert scale_db.shift_year("1990-03-01", 35) == "2025-03-01"
+    assert scale_db.shift_year("1992-02-29", 1) == "1993-02-28"
+    assert scale_db.shift_year("\\N", 35) == "\\N"
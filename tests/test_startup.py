@@ -0,0 +1,87 @@
+"""Startup-time budget and the cached OpenAPI document."""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import FastAPI
+
+from esm_fullstack_challenge.config import STARTUP_IMPORT_BUDGET
+from esm_fullstack_challenge.main import app
+from esm_fullstack_challenge.openapi import get_cached_openapi
+
+COLD_IMPORT = """
+import json, sys, time
+start = time.perf_counter()
+import esm_fullstack_challenge.main
+print(json.dumps({
+    "seconds": time.perf_counter() - start,
+    "heavy": [m for m in ("pandas", "numpy", "pyarrow") if m in sys.modules],
+}))
+"""
+
+
+def cold_import():
+    result = subprocess.run([sys.executable, "-c", COLD_IMPORT], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(
+    os.environ.get("RUN_BENCHMARKS", "") != "1", reason="wall-clock budget; set RUN_BENCHMARKS=1 to run",
+)
+def test_cold_import_within_budget():
+    # Best of three, so one slow run on a busy machine does not fail the suite
+    runs = [cold_import() for _ in range(3)]
+    fastest = min(run["seconds"] for run in runs)
+    assert fastest <= STARTUP_IMPORT_BUDGET, f"cold import took {fastest:.3f}s (budget {STARTUP_IMPORT_BUDGET}s)"
+
+
+def test_heavy_modules_are_imported_lazily():
+    assert cold_import()["heavy"] == []
+
+
+def test_generated_routes_are_registered(client, auth_headers):
+    paths = {route.path for route in app.routes}
+    assert {"/results", "/results/{id}", "/export/results"} <= paths
+    assert "/users" in paths and "/export/users" not in paths
+    assert client.get("/results").status_code == 401
+    assert client.get("/export/results").status_code == 401
+    assert client.get("/results", headers=auth_headers).status_code == 200
+
+
+def test_openapi_is_cached_in_schema_snapshot(tmp_path, monkeypatch):
+    snapshot_file = tmp_path / "snapshot.json"
+    snapshot_file.write_text(json.dumps({"schema_hash": "abc", "tables": {}}))
+
+    document = get_cached_openapi(app, str(snapshot_file))
+    assert "/results" in document["paths"]
+    snapshot = json.loads(snapshot_file.read_text())
+    assert snapshot["schema_hash"] == "abc"
+    assert snapshot["openapi"]["document"] == document
+
+    def generate(self):
+        raise AssertionError("OpenAPI document was regenerated")
+
+    monkeypatch.setattr(FastAPI, "openapi", generate)
+    assert get_cached_openapi(app, str(snapshot_file)) == document
+
+
+def test_openapi_regenerated_when_routes_change(tmp_path):
+    snapshot_file = tmp_path / "snapshot.json"
+    snapshot_file.write_text(json.dumps({"schema_hash": "abc", "tables": {}}))
+    get_cached_openapi(app, str(snapshot_file))
+
+    other = FastAPI(title="other")
+
+    @other.get("/other")
+    def other_route():
+        return {}
+
+    assert list(get_cached_openapi(other, str(snapshot_file))["paths"]) == ["/other"]
+
+
+def test_openapi_without_snapshot(tmp_path):
+    assert "/results" in get_cached_openapi(app, "")["paths"]
+    assert "/results" in get_cached_openapi(app, str(tmp_path / "missing.json"))["paths"]
+    assert not (tmp_path / "missing.json").exists()
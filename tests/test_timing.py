@@ -0,0 +1,55 @@
+"""Tests for request timing (Server-Timing header and log line)."""
+import json
+import logging
+
+from esm_fullstack_challenge.timing import Timings, get_timings, timed
+
+
+def parse_server_timing(value: str) -> dict:
+    metrics = {}
+    for metric in value.split(","):
+        name, dur = metric.strip().split(";dur=")
+        metrics[name] = float(dur)
+    return metrics
+
+
+def test_server_timing_on_list_route(client, auth_headers):
+    response = client.get("/results", headers=auth_headers, params={"range": "[0, 9]"})
+    metrics = parse_server_timing(response.headers["Server-Timing"])
+    assert {"auth", "sql", "count", "serialize", "total"} <= set(metrics)
+    assert metrics["total"] >= metrics["sql"]
+
+
+def test_server_timing_on_id_route_and_errors(client, auth_headers):
+    metrics = parse_server_timing(client.get("/results/1", headers=auth_headers).headers["Server-Timing"])
+    assert {"auth", "sql", "total"} <= set(metrics)
+
+    # Phases are per request, and responses without a route still get a total
+    metrics = parse_server_timing(client.get("/does-not-exist").headers["Server-Timing"])
+    assert set(metrics) <= {"queue", "total"}
+
+
+def test_timing_log_line(client, auth_headers, caplog):
+    with caplog.at_level(logging.INFO, logger="esm_fullstack_challenge.timing"):
+        client.get("/dashboard/top_drivers_by_wins", headers=auth_headers)
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["method"] == "GET"
+    assert entry["path"] == "/dashboard/top_drivers_by_wins"
+    assert entry["status"] == 200
+    assert entry["duration_ms"] > 0
+    assert "auth" in entry["timings"]
+    assert caplog.records[-1].request_timing == entry
+
+
+def test_timed_outside_request_is_noop():
+    assert get_timings() is None
+    with timed("sql"):
+        pass
+
+
+def test_timings_accumulate_and_format():
+    timings = Timings()
+    timings.add("sql", 0.001)
+    timings.add("sql", 0.002)
+    assert timings.as_ms() == {"sql": 3.0}
+    assert timings.server_timing(0.005) == "sql;dur=3.0, total;dur=5.0"
@@ -0,0 +1,68 @@
+"""Tests for change tracking and cached/estimated Content-Range totals."""
+import sqlite3
+
+from esm_fullstack_challenge.db import totals
+from esm_fullstack_challenge.db.indexes import ensure_indexes
+from esm_fullstack_challenge.db.totals import TotalsCache
+from esm_fullstack_challenge.db.tracking import (
+    ensure_change_tracking, get_row_count, get_table_versions,
+)
+
+COUNT_QUERY = ("SELECT count(*) FROM results WHERE race_id = ?", [1])
+
+
+def _make_db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE results (id INTEGER, race_id INTEGER)")
+    conn.executemany("INSERT INTO results VALUES (?, ?)", [(i, i % 10) for i in range(1000)])
+    ensure_indexes(conn)
+    ensure_change_tracking(conn)
+    return conn
+
+
+def test_triggers_maintain_versions_and_row_counts():
+    conn = _make_db()
+    version = get_table_versions(conn, ["results"])["results"]
+    assert get_row_count(conn, "results") == 1000
+
+    conn.execute("INSERT INTO results VALUES (1000, 1)")
+    conn.execute("DELETE FROM results WHERE id < 10")
+    conn.execute("UPDATE results SET race_id = 2 WHERE id = 500")
+    assert get_row_count(conn, "results") == 991
+    assert get_table_versions(conn, ["results"])["results"] == version + 12
+    assert ensure_change_tracking(conn) == []
+
+
+def test_totals_are_cached_until_the_table_changes():
+    conn = _make_db()
+    cache = TotalsCache()
+    assert cache.get_total(conn, "results", COUNT_QUERY, [("race_id", 1)]) == (100, False)
+    assert cache.get_total(conn, "results", COUNT_QUERY, [("race_id", 1)]) == (100, False)
+    assert cache.stats()["hits"] == 1
+
+    conn.execute("INSERT INTO results VALUES (1000, 1)")
+    assert cache.get_total(conn, "results", COUNT_QUERY, [("race_id", 1)]) == (101, False)
+
+
+def test_unfiltered_total_uses_row_counter():
+    conn = _make_db()
+    query = ("SELECT 'not used'", [])
+    assert TotalsCache().get_total(conn, "results", query, []) == (1000, False)
+
+
+def test_estimated_totals(monkeypatch):
+    monkeypatch.setattr(totals, "ESTIMATED_TOTALS", True)
+    monkeypatch.setattr(totals, "ESTIMATED_TOTALS_MIN_ROWS", 500)
+    conn = _make_db()
+    assert TotalsCache().get_total(conn, "results", COUNT_QUERY, [("race_id", 1)]) == (100, True)
+
+
+def test_list_route_reports_total(client, auth_headers):
+    response = client.get("/results", headers=auth_headers, params={"filter": '{"race_id": 1}'})
+    assert response.status_code == 200
+    total = int(response.headers["Content-Range"].split("/")[-1])
+    assert total == len(client.get(
+        "/results", headers=auth_headers,
+        params={"filter": '{"race_id": 1}', "range": "[0, 999]"},
+    ).json())
+    assert "X-Total-Estimated" not in response.headers